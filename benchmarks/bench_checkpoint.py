@@ -0,0 +1,87 @@
+"""
+Benchmark for Phase 1 checkpointing against local stub HTTP servers
+Run from the repository root: python -m benchmarks.bench_checkpoint [rows]
+Times an uninterrupted run with and without the checkpoint journal, then kills a journaled run
+halfway through (SIGKILL, in a child process), resumes it, and checks that the resumed outputs
+are identical to the uninterrupted ones
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_website_checker import build_input
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from phase1_website_status_code import process_supplier_data_pragmatic
+
+ROWS = 2000
+HOSTS = 8
+LATENCY = 0.02
+CONCURRENCY = 20
+PER_HOST_CONCURRENCY = 4
+CHUNKSIZES = [None, 250]
+
+def run_phase(input_file, output_file, rejected_file, chunksize, checkpoint_file=None):
+    """Run Phase 1 quietly; returns (seconds, checkpoint journal report line)"""
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        process_supplier_data_pragmatic(
+            input_file, output_file, rejected_file, concurrency=CONCURRENCY,
+            per_host_concurrency=PER_HOST_CONCURRENCY, chunksize=chunksize, checkpoint_file=checkpoint_file
+        )
+    elapsed = time.perf_counter() - start
+    report = next((line for line in log.getvalue().splitlines() if line.startswith("Checkpoint journal:")), "")
+    return elapsed, report
+
+def read_outputs(output_file, rejected_file):
+    with open(output_file) as selected, open(rejected_file) as rejected:
+        return selected.read(), rejected.read()
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    servers, base_urls = start_stub_servers(HOSTS, LATENCY)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            input_file = os.path.join(workdir, "input.csv")
+            build_input(input_file, base_urls, rows)
+            print(f"{rows} rows, {HOSTS} stub hosts, {LATENCY * 1000:.0f} ms server latency")
+
+            for chunksize in CHUNKSIZES:
+                print(f"\nchunksize {chunksize}:")
+                paths = {label: (os.path.join(workdir, f"{label}_selected.csv"),
+                                 os.path.join(workdir, f"{label}_rejected.csv"))
+                         for label in ("plain", "journaled", "resumed")}
+                checkpoint_file = os.path.join(workdir, "checkpoint.jsonl")
+
+                plain_time, _ = run_phase(input_file, *paths["plain"], chunksize)
+                journaled_time, report = run_phase(input_file, *paths["journaled"], chunksize, checkpoint_file)
+                expected = read_outputs(*paths["plain"])
+                print(f"  uninterrupted          {plain_time:7.2f} s")
+                print(f"  with journal           {journaled_time:7.2f} s  "
+                      f"outputs identical: {read_outputs(*paths['journaled']) == expected}")
+                print(f"  {report}")
+
+                # Kill a journaled run halfway, then run it again to resume
+                context = multiprocessing.get_context('spawn')
+                child = context.Process(target=run_phase,
+                                        args=(input_file, *paths["resumed"], chunksize, checkpoint_file))
+                child.start()
+                time.sleep(plain_time / 2)
+                child.kill()
+                child.join()
+                with open(checkpoint_file) as journal_file:
+                    journaled = sum(1 for _ in journal_file) - 1
+                resumed_time, report = run_phase(input_file, *paths["resumed"], chunksize, checkpoint_file)
+                print(f"  killed after {plain_time / 2:.2f} s with {journaled} probe results journaled")
+                print(f"  resumed                {resumed_time:7.2f} s  "
+                      f"outputs identical: {read_outputs(*paths['resumed']) == expected}")
+                print(f"  {report}")
+    finally:
+        stop_stub_servers(servers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for the column role cache on wide inputs
+Run from the repository root: python -m benchmarks.bench_column_roles [columns]
+Times website, manufacturing and capability column detection on a file with hundreds of columns
+(and no website-named column, so phase 1a samples every text column for URLs) against lookups in
+a ColumnRoleCache already holding the file's schema, and checks that both give the same roles
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from column_roles import ColumnRoleCache, column_roles
+from phase1_rows_scoring_selection import find_website_columns
+from phase2_manufacturing_relevance import detect_manufacturing_columns
+from phase3_manufacturing_reliability import detect_capability_columns
+
+COLUMNS = 500
+ROWS = 1_000
+REPEATS = 20
+
+def build_frame(columns, rows):
+    """Wide frame of text columns with a few role columns, URLs only in 'contact_link'"""
+    frame = pd.DataFrame({f"attribute_{i}": [f"value {i} {row}" for row in range(rows)] for i in range(columns)},
+                         dtype=object)
+    frame['contact_link'] = pd.Series([f"www.company{row}.com" for row in range(rows)], dtype=object)
+    for name in ('naics_code', 'company_description', 'employee_count', 'year_founded', 'country'):
+        frame[name] = pd.Series([str(row) for row in range(rows)], dtype=object)
+    return frame
+
+def all_roles(frame, role_cache=None):
+    """Every role set for frame, quietly"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if role_cache is None:
+            website = find_website_columns(frame)
+        else:
+            website = find_website_columns(frame, role_cache)
+        manufacturing, _ = column_roles(role_cache, 'manufacturing', frame, detect_manufacturing_columns)
+        capability, _ = column_roles(role_cache, 'capability', frame, detect_capability_columns)
+    return list(website), [list(columns) for columns in manufacturing], capability
+
+def timed(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats, result
+
+def main():
+    columns = int(sys.argv[1]) if len(sys.argv) > 1 else COLUMNS
+    frame = build_frame(columns, ROWS)
+    print(f"{frame.shape[1]} columns, {ROWS} rows")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache_file = os.path.join(workdir, "column_roles.json")
+        detect_time, detected = timed(lambda: all_roles(frame), REPEATS)
+        first_time, first = timed(lambda: all_roles(frame, ColumnRoleCache(cache_file)), 1)
+        cached_time, cached = timed(lambda: all_roles(frame, ColumnRoleCache(cache_file)), REPEATS)
+        report = ColumnRoleCache(cache_file)
+        all_roles(frame, report)
+
+    print(f"  detection              {detect_time * 1000:8.2f} ms per run")
+    print(f"  first run (detect+store) {first_time * 1000:6.2f} ms")
+    print(f"  cached schema          {cached_time * 1000:8.2f} ms per run  x{detect_time / cached_time:.1f}")
+    print(f"  roles identical: {first == detected and cached == detected}")
+    print(f"  {report.report()}")
+
+if __name__ == "__main__":
+    main()
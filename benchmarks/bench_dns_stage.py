@@ -0,0 +1,97 @@
+"""
+Benchmark for the Phase 1 DNS pre-check stage, without network access
+Run from the repository root: python -m benchmarks.bench_dns_stage [urls]
+A stub resolver with a fixed lookup latency stands in for DNS: per-URL lookups (what every row's
+own request attempts pay) are compared with one batched, cached pass over the same URLs, then the
+same decisions are checked against a hosts-file fixture and TTL expiry is shown on a fake clock
+"""
+import os
+import sys
+import tempfile
+import time
+
+from dns_cache import CachingResolver, HostNotFound, hosts_file_lookup
+from phase1_website_status_code import get_dns_host
+
+URLS = 2000
+HOSTS = 500
+DEAD_SHARE = 0.3
+LATENCY = 0.01
+RECORD_TTL = 60
+
+def build_urls(count, hosts):
+    """URLs spread over hosts, the last DEAD_SHARE of which do not exist"""
+    live_hosts = int(hosts * (1 - DEAD_SHARE))
+    urls = []
+    for i in range(count):
+        host = i % hosts
+        name = f"supplier{host}.test" if host < live_hosts else f"gone{host}.test"
+        urls.append(f"https://{'www.' if i % 3 == 0 else ''}{name}/company/{i}")
+    return urls
+
+class StubLookup:
+    """Lookup answering *.test names after LATENCY seconds; names starting with 'gone' do not exist"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, host):
+        self.calls += 1
+        time.sleep(self.latency)
+        if host.removeprefix('www.').startswith('gone'):
+            raise HostNotFound(host)
+        return ['127.0.0.1'], RECORD_TTL
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else URLS
+    urls = build_urls(count, HOSTS)
+    hosts = [get_dns_host(url) for url in urls]
+    print(f"{count} URLs over {len(set(hosts))} host names, {DEAD_SHARE:.0%} of hosts missing, "
+          f"{LATENCY * 1000:.0f} ms per lookup")
+
+    lookup = StubLookup(LATENCY)
+    start = time.perf_counter()
+    per_url = {}
+    for host in hosts:
+        try:
+            lookup(host)
+            per_url[host] = True
+        except HostNotFound:
+            per_url[host] = False
+    print(f"  per-URL lookups        {time.perf_counter() - start:7.2f} s  {lookup.calls:6d} lookups")
+
+    for concurrency in (1, 8, 32):
+        lookup = StubLookup(LATENCY)
+        resolver = CachingResolver(lookup)
+        start = time.perf_counter()
+        batched = resolver.resolve_many(hosts, concurrency)
+        elapsed = time.perf_counter() - start
+        assert batched == per_url
+        print(f"  batched x{concurrency:<3d}           {elapsed:7.2f} s  {lookup.calls:6d} lookups")
+
+    start = time.perf_counter()
+    resolver.resolve_many(hosts, 32)
+    print(f"  batched again (cached) {time.perf_counter() - start:7.2f} s  {lookup.calls:6d} lookups in total")
+    print("  " + resolver.report())
+
+    with tempfile.TemporaryDirectory() as workdir:
+        hosts_path = os.path.join(workdir, "hosts")
+        with open(hosts_path, 'w') as hosts_file:
+            for host, resolves in per_url.items():
+                if resolves:
+                    hosts_file.write(f"127.0.0.1 {host}\n")
+        fixture = CachingResolver(hosts_file_lookup(hosts_path)).resolve_many(hosts, 8)
+    print(f"Hosts-file fixture gives the same decisions: {fixture == per_url}")
+
+    now = [0.0]
+    lookup = StubLookup(0.0)
+    resolver = CachingResolver(lookup, min_ttl=0, negative_ttl=30, clock=lambda: now[0])
+    for now[0] in (0.0, 29.0, 31.0, 59.0, 61.0):
+        resolver.resolve('supplier1.test')
+        resolver.resolve('gone499.test')
+    print(f"TTL expiry (record TTL {RECORD_TTL}s, negative TTL 30s, lookups at 0/29/31/59/61s): "
+          f"{lookup.calls} lookups for 10 resolutions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Micro-benchmark for KeywordMatcher on large description corpora
+Run from the repository root: python -m benchmarks.bench_keyword_matcher [descriptions]
+Compares the per-keyword `in` loop the phases used with the matcher backends
+"""
+import sys
+import time
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from keyword_matcher import KeywordMatcher, ahocorasick
+from phase2_manufacturing_relevance import get_manufacturing_keywords
+
+DESCRIPTIONS = 200_000
+DESCRIPTION_WORDS = [20, 60, 200]
+
+def naive_matches(texts, keywords):
+    """The original loop: one `keyword in text` test per keyword, per text"""
+    return [[keyword for keyword in keywords if keyword in text] for text in texts]
+
+def main():
+    descriptions = int(sys.argv[1]) if len(sys.argv) > 1 else DESCRIPTIONS
+    keywords = get_manufacturing_keywords()
+    backends = ['scan'] + (['automaton'] if ahocorasick is not None else [])
+    if ahocorasick is None:
+        print("pyahocorasick not installed: only the 'scan' backend is measured")
+
+    for words in DESCRIPTION_WORDS:
+        df = make_supplier_frame(descriptions, long_description_words=words)
+        texts = (df['long_description'] + " " + df['business_tags'].fillna("")).str.lower().tolist()
+        corpus_mb = sum(map(len, texts)) / 1_000_000
+        print(f"{descriptions:,} descriptions of ~{words} words ({corpus_mb:.0f} MB of text)")
+
+        start = time.perf_counter()
+        expected = naive_matches(texts, keywords)
+        naive_time = time.perf_counter() - start
+        print(f"  naive `in` loop   {naive_time:7.2f} s")
+
+        for backend in backends:
+            matcher = KeywordMatcher(keywords, backend=backend)
+            start = time.perf_counter()
+            found = [matcher.find_entries(text) for text in texts]
+            elapsed = time.perf_counter() - start
+            print(f"  {backend:<17} {elapsed:7.2f} s  speedup x{naive_time / elapsed:4.1f}  same matches: {found == expected}")
+
+if __name__ == "__main__":
+    main()
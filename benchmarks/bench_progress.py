@@ -0,0 +1,66 @@
+"""
+Benchmark for the progress output levels
+Run from the repository root: python -m benchmarks.bench_progress [rows]
+Runs phases 1a, 2 and 3 on a synthetic input at 'rows', 'progress' and 'quiet' verbosity, and
+quietly with a decision log, with their output going to a file as it would to a redirected
+terminal; checks that the outputs are identical, and shows the time per phase, the lines printed
+and the decision log records written
+"""
+import contextlib
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_rows_scoring_selection import process_companies
+from phase2_manufacturing_relevance import filter_manufacturing_companies
+from phase3_manufacturing_reliability import filter_suppliers_flexible
+
+ROWS = 100_000
+# (label, verbosity, with a decision log)
+SETTINGS = [('rows', 'rows', False), ('progress', 'progress', False), ('quiet', 'quiet', False),
+            ('quiet+log', 'quiet', True)]
+PHASES = [('1a', process_companies), ('2', filter_manufacturing_companies), ('3', filter_suppliers_flexible)]
+
+def run_phase(workdir, phase, run, input_file, label, verbosity, with_log):
+    """Run one phase with its printed output going to a file; returns (seconds, output path, lines printed, records logged)"""
+    output_file = os.path.join(workdir, f"{phase}_{label}.csv")
+    printed_file = os.path.join(workdir, f"{phase}_{label}.txt")
+    decision_log_file = os.path.join(workdir, f"{phase}_{label}.jsonl") if with_log else None
+    start = time.perf_counter()
+    with open(printed_file, 'w', encoding='utf-8') as printed, contextlib.redirect_stdout(printed):
+        run(input_file, output_file, verbosity=verbosity, decision_log_file=decision_log_file)
+    seconds = time.perf_counter() - start
+
+    with open(printed_file, encoding='utf-8') as printed:
+        lines = sum(1 for _ in printed)
+    records = 0
+    if decision_log_file:
+        with open(decision_log_file, encoding='utf-8') as decision_log:
+            records = sum(1 for _ in decision_log)
+    return seconds, output_file, lines, records
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    with tempfile.TemporaryDirectory() as workdir:
+        input_file = os.path.join(workdir, "input.csv")
+        make_supplier_frame(rows).to_csv(input_file, index=False)
+        print(f"{rows} rows")
+
+        for phase, run in PHASES:
+            results = {label: run_phase(workdir, phase, run, input_file, label, verbosity, with_log)
+                       for label, verbosity, with_log in SETTINGS}
+            outputs = [output_file for _, output_file, _, _ in results.values()]
+            identical = all(filecmp.cmp(outputs[0], output_file, shallow=False) for output_file in outputs[1:])
+            print(f"phase {phase}: outputs identical: {identical}")
+            baseline = results['rows'][0]
+            for label, (seconds, _, lines, records) in results.items():
+                log_text = f", {records} records logged" if records else ""
+                print(f"  {label:<10} {seconds:7.2f} s  x{baseline / seconds:.2f}  {lines} lines printed{log_text}")
+            # The next phase reads this phase's output
+            input_file = results['rows'][1]
+
+if __name__ == "__main__":
+    main()
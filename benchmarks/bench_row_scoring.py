@@ -0,0 +1,37 @@
+"""
+Benchmark for Phase 1a row scoring: row-wise calculate_row_score vs columnar calculate_row_scores
+Run from the repository root: python -m benchmarks.bench_row_scoring [rows]
+The row-wise scorer is timed on a sample and extrapolated to the full input
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_rows_scoring_selection import calculate_row_score, calculate_row_scores
+
+ROWS = 1_000_000
+ROW_WISE_SAMPLE = 50_000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    df = make_supplier_frame(rows)
+    print(f"{rows:,} synthetic rows")
+
+    start = time.perf_counter()
+    columnar_scores = calculate_row_scores(df)
+    columnar_time = time.perf_counter() - start
+
+    sample = df.head(min(ROW_WISE_SAMPLE, rows))
+    start = time.perf_counter()
+    row_wise_scores = np.array([calculate_row_score(row) for _, row in sample.iterrows()], dtype=np.int64)
+    row_wise_time = (time.perf_counter() - start) * rows / len(sample)
+
+    identical = np.array_equal(row_wise_scores, columnar_scores[:len(sample)])
+    print(f"  row-wise (extrapolated from {len(sample):,} rows): {row_wise_time:8.2f} s")
+    print(f"  columnar:                                     {columnar_time:8.2f} s")
+    print(f"  speedup: x{row_wise_time / columnar_time:.1f}   scores identical on sample: {identical}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark for the run metrics instrumentation
+Run from the repository root: python -m benchmarks.bench_run_metrics [rows]
+Runs phases 1a -> 1b -> 2 -> 3 on a synthetic input (websites served by local stub servers) with
+and without metrics files, checks that the outputs are identical, shows the time overhead of each
+phase and a few lines of every JSON report (stages, timed functions, HTTP latency histograms)
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_rows_scoring_selection import process_companies
+from phase1_website_status_code import process_supplier_data_pragmatic
+from phase2_manufacturing_relevance import filter_manufacturing_companies
+from phase3_manufacturing_reliability import filter_suppliers_flexible
+
+ROWS = 20_000
+HOSTS = 8
+LATENCY = 0.005
+
+def build_input(path, base_urls, rows):
+    """Synthetic supplier input whose websites point at the stub servers (every 10th one is missing)"""
+    frame = make_supplier_frame(rows)
+    company_ids = np.arange(rows) // 5
+    urls = [f"{base_urls[i % len(base_urls)]}/{'missing' if i % 10 == 7 else 'company'}/{i}" for i in company_ids]
+    frame['website_url'] = frame['website_url'].where(frame['website_url'].isna(), urls)
+    frame.to_csv(path, index=False)
+
+def run_phases(workdir, input_file, label, with_metrics):
+    """Run the four phases quietly; returns ({phase: seconds}, {phase: metrics file or None}, output paths)"""
+    paths = {name: os.path.join(workdir, f"{label}_{name}.csv") for name in ("1a", "1b", "2", "3")}
+    metrics_files = {name: os.path.join(workdir, f"{label}_{name}_metrics.json") if with_metrics else None
+                     for name in paths}
+    runs = {
+        "1a": lambda: process_companies(input_file, paths["1a"], metrics_file=metrics_files["1a"]),
+        "1b": lambda: process_supplier_data_pragmatic(paths["1a"], paths["1b"], concurrency=20,
+                                                      per_host_concurrency=4, metrics_file=metrics_files["1b"]),
+        "2": lambda: filter_manufacturing_companies(paths["1b"], paths["2"], metrics_file=metrics_files["2"]),
+        "3": lambda: filter_suppliers_flexible(paths["2"], paths["3"], metrics_file=metrics_files["3"]),
+    }
+    times = {}
+    for name, run in runs.items():
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+        times[name] = time.perf_counter() - start
+    return times, metrics_files, paths
+
+def read_outputs(paths):
+    outputs = []
+    for path in paths.values():
+        with open(path, 'rb') as output_file:
+            outputs.append(output_file.read())
+    return outputs
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    servers, base_urls = start_stub_servers(HOSTS, LATENCY)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            input_file = os.path.join(workdir, "input.csv")
+            build_input(input_file, base_urls, rows)
+            print(f"{rows} rows, {HOSTS} stub hosts, {LATENCY * 1000:.0f} ms server latency")
+
+            plain_times, _, plain_paths = run_phases(workdir, input_file, "plain", False)
+            metered_times, metrics_files, metered_paths = run_phases(workdir, input_file, "metered", True)
+            print(f"  outputs identical: {read_outputs(plain_paths) == read_outputs(metered_paths)}")
+            for name in plain_times:
+                print(f"  phase {name:<3} without metrics {plain_times[name]:7.2f} s   with metrics "
+                      f"{metered_times[name]:7.2f} s   ({metered_times[name] / plain_times[name] - 1:+.1%})")
+
+            for name, path in metrics_files.items():
+                with open(path) as report_file:
+                    report = json.load(report_file)
+                print(f"\nphase {name}: {report['run']['wall_seconds']:.2f} s wall, "
+                      f"{report['run']['cpu_seconds']:.2f} s CPU")
+                for stage_name, stage in report['stages'].items():
+                    rows_text = f", {stage['rows_in']} → {stage['rows_out']} rows" if 'rows_in' in stage else ""
+                    print(f"  stage {stage_name}: {stage['calls']} calls, {stage['wall_seconds']:.3f} s wall, "
+                          f"{stage['cpu_seconds']:.3f} s CPU{rows_text}")
+                for function_name, function in report['functions'].items():
+                    print(f"  function {function_name}: {function['calls']} calls, {function['mean_ms']:.3f} ms each")
+                for histogram_name, histogram in report['histograms'].items():
+                    print(f"  histogram {histogram_name}: {histogram['count']} latencies, mean "
+                          f"{histogram['mean_seconds'] * 1000:.1f} ms, max {histogram['max_seconds'] * 1000:.1f} ms")
+                if report['counters']:
+                    print(f"  counters: {report['counters']}")
+    finally:
+        stop_stub_servers(servers)
+
+if __name__ == "__main__":
+    main()
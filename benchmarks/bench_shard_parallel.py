@@ -0,0 +1,63 @@
+"""
+Benchmark for shard-parallel scoring of phases 1a, 2 and 3
+Run from the repository root: python -m benchmarks.bench_shard_parallel [rows]
+Runs phase 1a -> 2 -> 3 on a synthetic input (phase 1b is skipped: it is network bound and already
+concurrent) with 1, 2, 4, 8 and all available worker processes, times every phase and checks that
+the outputs are byte-identical to the single-process run
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_rows_scoring_selection import process_companies
+from phase2_manufacturing_relevance import filter_manufacturing_companies
+from phase3_manufacturing_reliability import filter_suppliers_flexible
+from table_io import derived_table_path
+
+ROWS = 200_000
+WORKERS = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+
+def timed(function, *args, **kwargs):
+    """Run function quietly; returns seconds"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(*args, **kwargs)
+    return time.perf_counter() - start
+
+def read_file(path):
+    with open(path, 'rb') as table_file:
+        return table_file.read()
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    with tempfile.TemporaryDirectory() as workdir:
+        input_file = os.path.join(workdir, "input.csv")
+        make_supplier_frame(rows).to_csv(input_file, index=False)
+        print(f"{rows} rows, {os.cpu_count()} CPUs")
+        print(f"  {'workers':>7}  {'phase 1a':>9}  {'phase 2':>9}  {'phase 3':>9}  {'total':>9}  speedup  identical")
+
+        baseline = None
+        baseline_total = None
+        for workers in WORKERS:
+            paths = {name: os.path.join(workdir, f"{name}_{workers}.csv")
+                     for name in ("phase1", "phase2", "phase3", "phase3_rejected")}
+            paths["phase2_rejected"] = derived_table_path(paths["phase2"], '_non_manufacturing')
+            times = [
+                timed(process_companies, input_file, paths["phase1"], workers=workers),
+                timed(filter_manufacturing_companies, paths["phase1"], paths["phase2"], workers=workers),
+                timed(filter_suppliers_flexible, paths["phase2"], paths["phase3"], paths["phase3_rejected"],
+                      workers=workers),
+            ]
+            outputs = [read_file(path) for path in paths.values() if os.path.exists(path)]
+            total = sum(times)
+            if baseline is None:
+                baseline, baseline_total = outputs, total
+            print(f"  {workers:>7}  " + "  ".join(f"{seconds:8.2f}s" for seconds in times) +
+                  f"  {total:8.2f}s  {baseline_total / total:6.2f}x  {outputs == baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark for multi-node sharded runs of the fused pipeline, with local processes as the nodes
+Run from the repository root: python -m benchmarks.bench_sharded_run [rows]
+Runs the whole input once as shard 0/1, then as N shards in N concurrent processes (each with its
+own output and manifest), merges the shards and checks that the merged output and summary are
+identical to the single run, for block-grouped and key-grouped, whole-file and streamed inputs
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from pipeline_runner import run_pipeline
+from shard_manifest import load_manifest, manifest_path, manifest_summary, merge_shards, shard_output_path
+
+ROWS = 20_000
+HOSTS = 8
+LATENCY = 0.005
+SHARD_COUNTS = [2, 4]
+# (group_key, chunksize) of every configuration
+CONFIGURATIONS = [(None, None), (None, 1_500), ('company_name', 1_500)]
+
+def build_input(path, base_urls, rows):
+    """Synthetic supplier input whose websites point at the stub servers (every 10th one is missing)"""
+    frame = make_supplier_frame(rows)
+    company_ids = np.arange(rows) // 5
+    urls = [f"{base_urls[i % len(base_urls)]}/{'missing' if i % 10 == 7 else 'company'}/{i}" for i in company_ids]
+    frame['website_url'] = frame['website_url'].where(frame['website_url'].isna(), urls)
+    frame.to_csv(path, index=False)
+
+def run_node(input_file, output_file, shard, group_key, chunksize):
+    """One node's run of the fused pipeline, quietly"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_pipeline(input_file, output_file, group_key=group_key, chunksize=chunksize,
+                     concurrency=20, per_host_concurrency=4, shard=shard)
+
+def run_nodes(input_file, output_file, shards, group_key, chunksize):
+    """Run shards 0..shards-1 in concurrent processes; returns (seconds, manifest paths)"""
+    context = multiprocessing.get_context('spawn')
+    nodes = [context.Process(target=run_node,
+                             args=(input_file, shard_output_path(output_file, (index, shards)), (index, shards),
+                                   group_key, chunksize))
+             for index in range(shards)]
+    start = time.perf_counter()
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, [manifest_path(shard_output_path(output_file, (index, shards))) for index in range(shards)]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    servers, base_urls = start_stub_servers(HOSTS, LATENCY)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            input_file = os.path.join(workdir, "input.csv")
+            build_input(input_file, base_urls, rows)
+            print(f"{rows} rows, {HOSTS} stub hosts, {LATENCY * 1000:.0f} ms server latency, {os.cpu_count()} CPUs")
+
+            for group_key, chunksize in CONFIGURATIONS:
+                print(f"\ngroup_key {group_key}, chunksize {chunksize}:")
+                single_file = os.path.join(workdir, "single.csv")
+                start = time.perf_counter()
+                run_node(input_file, single_file, (0, 1), group_key, chunksize)
+                print(f"  single node            {time.perf_counter() - start:7.2f} s")
+                single = manifest_summary(load_manifest(manifest_path(single_file)))
+
+                for shards in SHARD_COUNTS:
+                    output_file = os.path.join(workdir, f"sharded{shards}.csv")
+                    elapsed, manifests = run_nodes(input_file, output_file, shards, group_key, chunksize)
+                    start = time.perf_counter()
+                    merged = manifest_summary(merge_shards(manifests, output_file))
+                    merge_time = time.perf_counter() - start
+                    shard_rows = [load_manifest(path)['counts']['selected_rows'] for path in manifests]
+                    print(f"  {shards} nodes {elapsed:18.2f} s  merge {merge_time:5.2f} s  "
+                          f"rows per shard {shard_rows}  identical: {merged == single}")
+    finally:
+        stop_stub_servers(servers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark for the phase handoff formats: CSV vs Parquet vs Arrow IPC
+Run from the repository root: python -m benchmarks.bench_table_formats [rows]
+Writes a wide synthetic supplier file in each format, then loads it in a fresh process, once with
+every column and once projected onto the columns Phase 1b reads, and reports load time and the
+peak memory the load added
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_website_status_code import OUTPUT_COLUMNS
+from table_io import pa, read_table, write_table
+
+ROWS = 200_000
+LONG_DESCRIPTION_WORDS = 150
+FORMATS = [('csv', '.csv'), ('parquet', '.parquet'), ('arrow', '.arrow')]
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process in MB
+    VmHWM (Linux) starts afresh in a spawned process; ru_maxrss can keep the parent's peak
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def load_in_child(path, columns, results):
+    """Load path in this (fresh) process and report (seconds, peak RSS added in MB)"""
+    import pandas  # noqa: F401 - imported before measuring so only the load is counted
+    if pa is not None:
+        import pyarrow.parquet  # noqa: F401
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    df = read_table(path, columns=columns)
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, peak_rss_mb() - rss_before, df.shape))
+
+def measure(path, columns):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    child = context.Process(target=load_in_child, args=(path, columns, results))
+    child.start()
+    result = results.get()
+    child.join()
+    return result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    formats = FORMATS if pa is not None else FORMATS[:1]
+    if pa is None:
+        print("pyarrow is not installed (pip install pyarrow): only CSV is measured")
+
+    df = make_supplier_frame(rows, long_description_words=LONG_DESCRIPTION_WORDS)
+    print(f"{rows:,} synthetic rows, {len(df.columns)} columns, "
+          f"long_description of {LONG_DESCRIPTION_WORDS} words")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {}
+        for name, extension in formats:
+            paths[name] = os.path.join(workdir, "suppliers" + extension)
+            start = time.perf_counter()
+            write_table(df, paths[name])
+            print(f"  wrote {name:<8} {os.path.getsize(paths[name]) / 2**20:8.1f} MB "
+                  f"in {time.perf_counter() - start:6.2f} s")
+        del df
+
+        for label, columns in [("all columns", None), ("Phase 1b columns", OUTPUT_COLUMNS)]:
+            print(f"\nLoad, {label}:")
+            csv_time = None
+            for name, _ in formats:
+                elapsed, peak_mb, shape = measure(paths[name], columns)
+                csv_time = csv_time or elapsed
+                print(f"  {name:<8} {elapsed:7.2f} s  x{csv_time / elapsed:5.1f}  "
+                      f"peak memory +{peak_mb:8.1f} MB  shape {shape}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the Phase 1 website checker against local stub HTTP servers
+Run from the repository root: python -m benchmarks.bench_website_checker
+"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from phase1_website_status_code import process_supplier_data_pragmatic
+
+ROWS = 400
+HOSTS = 8
+LATENCY = 0.05
+SETTINGS = [
+    ("serial", 1, 1, 'asyncio'),
+    ("concurrent 10/2", 10, 2, 'asyncio'),
+    ("concurrent 50/4", 50, 4, 'asyncio'),
+    ("concurrent 100/8", 100, 8, 'asyncio'),
+    ("threads 10/2", 10, 2, 'threads'),
+    ("threads 50/4", 50, 4, 'threads'),
+]
+
+def build_input(path, base_urls, rows):
+    """Write a synthetic Phase 1 input with a mix of reachable, 404 and invalid URLs"""
+    records = []
+    for i in range(rows):
+        base = base_urls[i % len(base_urls)]
+        if i % 10 == 7:
+            url = f"{base}/missing/{i}"
+        elif i % 10 == 9:
+            url = "not available"
+        else:
+            url = f"{base}/company/{i}"
+        records.append({'company_name': f"Company {i}", 'website_url': url, 'main_country': 'Testland'})
+    pd.DataFrame(records).to_csv(path, index=False)
+
+def run_once(input_file, workdir, label, concurrency, per_host_concurrency, mode):
+    """Run Phase 1 once and return (seconds, selected csv text, rejected csv text, connection report)"""
+    output_file = os.path.join(workdir, f"{label}_selected.csv")
+    rejected_file = os.path.join(workdir, f"{label}_rejected.csv")
+    start = time.perf_counter()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        process_supplier_data_pragmatic(
+            input_file, output_file, rejected_file,
+            concurrency=concurrency, per_host_concurrency=per_host_concurrency, mode=mode
+        )
+    elapsed = time.perf_counter() - start
+    connections = next((line for line in log.getvalue().splitlines() if line.startswith("HTTP requests:")), "")
+    with open(output_file) as selected, open(rejected_file) as rejected:
+        return elapsed, selected.read(), rejected.read(), connections
+
+def main():
+    servers, base_urls = start_stub_servers(HOSTS, LATENCY)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            input_file = os.path.join(workdir, "input.csv")
+            build_input(input_file, base_urls, ROWS)
+
+            print(f"{ROWS} rows, {HOSTS} stub hosts, {LATENCY * 1000:.0f} ms server latency")
+            baseline = None
+            for label, concurrency, per_host, mode in SETTINGS:
+                elapsed, selected, rejected, connections = run_once(
+                    input_file, workdir, label.replace(' ', '_').replace('/', '-'), concurrency, per_host, mode
+                )
+                if baseline is None:
+                    baseline = (elapsed, selected, rejected)
+                identical = (selected, rejected) == baseline[1:]
+                print(f"  {label:<18} {elapsed:7.2f} s  {ROWS / elapsed:8.1f} rows/s  "
+                      f"speedup x{baseline[0] / elapsed:5.1f}  outputs identical: {identical}")
+                print(f"  {'':<18} {connections}")
+    finally:
+        stop_stub_servers(servers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every request after a fixed delay; paths starting with /missing return 404"""
+    protocol_version = 'HTTP/1.1'
+    latency = 0.05
+
+    def _respond(self, include_body):
+        time.sleep(self.latency)
+        status = 404 if self.path.startswith('/missing') else 200
+        body = b"<html><body>stub</body></html>"
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that ignores clients going away mid-request (e.g. a killed benchmark run)"""
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def start_stub_servers(count=4, latency=0.05):
+    """Start `count` stub servers on free local ports, returns (servers, base_urls)"""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'latency': latency})
+    servers = []
+    base_urls = []
+    for _ in range(count):
+        server = StubServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        base_urls.append(f"http://127.0.0.1:{server.server_address[1]}")
+    return servers, base_urls
+
+def stop_stub_servers(servers):
+    """Shut down servers started by start_stub_servers"""
+    for server in servers:
+        server.shutdown()
+        server.server_close()
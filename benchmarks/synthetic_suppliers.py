@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+PHONES = ["+1 555 0100", "+44 20 7946 0000", "", "   ", None]
+COUNTRIES = ["United States", "Germany", "China", "Romania", "not available", "", None]
+CITIES = ["Chicago", "Munich", "Shenzhen", "Cluj-Napoca", "", None]
+STREETS = ["1 Industrial Way", "Hauptstrasse 5", "", None]
+NAICS_CODES = [311111.0, 332710.0, 423830.0, 541330.0, 541611.0, 722511.0, 611310.0, 238210.0, 811310.0, np.nan]
+NAICS_LABELS = [
+    "Dog and Cat Food Manufacturing", "Machine Shops", "Industrial Machinery and Equipment Merchant Wholesalers",
+    "Engineering Services", "Administrative Management Consulting", "Full-Service Restaurants", None,
+]
+DESCRIPTION_WORDS = [
+    "we", "are", "a", "leading", "manufacturer", "of", "precision", "components", "and", "machinery",
+    "parts", "supplier", "for", "the", "automotive", "industry", "restaurant", "serving", "local", "food",
+    "consulting", "software", "cnc", "machining", "welding", "raw", "materials", "distribution", "wholesale",
+    "plant", "factory", "equipment", "tools", "services", "customers", "quality", "steel", "plastic",
+]
+TAGS = [
+    "Manufacturing | Industrial Equipment", "B2B | Wholesale", "Restaurants | Food Service",
+    "Software | SaaS", "CNC Machining | Metal Fabrication", "", None,
+]
+REVENUES = ["$10M", "5.5 million", "120000", "$2B", "not available", "1,250,000", None]
+EMPLOYEES = ["51-200", "1200", "12", "Large Enterprise", "small", "not available", None]
+YEARS = [1950.0, 1987.0, 2001.0, 2015.0, 2023.0, np.nan]
+LOCATIONS = [1.0, 2.0, 3.0, 7.0, np.nan]
+
+def _pick(rng, values, rows):
+    """Random choice over a list that may contain None"""
+    choices = np.empty(len(values), dtype=object)
+    choices[:] = values
+    return choices[rng.integers(0, len(values), rows)]
+
+def _descriptions(rng, rows, words):
+    """Random space-separated descriptions of roughly `words` words"""
+    vocabulary = np.array(DESCRIPTION_WORDS, dtype=object)
+    picks = vocabulary[rng.integers(0, len(vocabulary), (rows, words))]
+    return pd.Series([" ".join(row) for row in picks], dtype=object)
+
+def make_supplier_frame(rows, seed=0, long_description_words=60):
+    """Build a synthetic supplier DataFrame shaped like the presales input"""
+    rng = np.random.default_rng(seed)
+    company_ids = np.arange(rows) // 5
+    website = np.where(rng.random(rows) < 0.7, [f"https://company{i}.com" for i in company_ids], None)
+
+    return pd.DataFrame({
+        'company_name': [f"Company {i}" for i in company_ids],
+        'website_url': website,
+        'website_domain': np.where(rng.random(rows) < 0.5, [f"company{i}.com" for i in company_ids], None),
+        'primary_phone': _pick(rng, PHONES, rows),
+        'main_country': _pick(rng, COUNTRIES, rows),
+        'main_city': _pick(rng, CITIES, rows),
+        'main_street': _pick(rng, STREETS, rows),
+        'naics_2022_primary_code': np.array(NAICS_CODES)[rng.integers(0, len(NAICS_CODES), rows)],
+        'naics_2022_primary_label': _pick(rng, NAICS_LABELS, rows),
+        'short_description': _descriptions(rng, rows, 8),
+        'long_description': _descriptions(rng, rows, long_description_words),
+        'business_tags': _pick(rng, TAGS, rows),
+        'revenue': _pick(rng, REVENUES, rows),
+        'employee_count': _pick(rng, EMPLOYEES, rows),
+        'year_founded': np.array(YEARS)[rng.integers(0, len(YEARS), rows)],
+        'num_locations': np.array(LOCATIONS)[rng.integers(0, len(LOCATIONS), rows)],
+    })
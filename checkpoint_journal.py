@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines journal of the website probe results of one phase 1b run
+    Every result is appended as it completes (keyed by its canonical probe key), so a run that
+    crashes or is killed can be restarted: load() returns the results already journaled, and those
+    probes are not run again. The outputs are rebuilt from the same results, so they come out
+    identical to an uninterrupted run
+    Lines are flushed to the OS every flush_every results (they survive the process being killed)
+    and fsynced at most every sync_interval seconds (they survive a machine crash)
+    The first line describes the run (input file, size, modification time, probe key); a journal
+    left by a different run is discarded. finish() deletes the journal once the run is complete
+    """
+
+    def __init__(self, path, run_info, flush_every=1, sync_interval=1.0):
+        self.path = path
+        self.run_info = run_info
+        self.flush_every = flush_every
+        self.sync_interval = sync_interval
+        self.restored = 0
+        self.written = 0
+        self.seconds = 0.0
+        self._file = None
+        self._unflushed = 0
+        self._synced_at = time.monotonic()
+
+    @staticmethod
+    def describe_input(input_file, probe_key):
+        """run_info for a phase 1b run over input_file"""
+        stat = os.stat(input_file)
+        return {'input_file': os.path.abspath(input_file), 'size': stat.st_size,
+                'mtime': stat.st_mtime, 'probe_key': probe_key}
+
+    def load(self):
+        """
+        Open the journal for appending and return the results it already holds as {key: result}
+        A torn last line (the process died mid-write) is ignored; a journal of another run is discarded
+        """
+        started = time.perf_counter()
+        results = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as journal_file:
+                lines = journal_file.read().splitlines()
+            try:
+                header = json.loads(lines[0]) if lines else None
+            except ValueError:
+                header = None
+            if header == self.run_info:
+                for line in lines[1:]:
+                    try:
+                        key, is_accessible, status_code, error_message = json.loads(line)
+                    except ValueError:
+                        break
+                    results[key] = (is_accessible, status_code, error_message)
+
+        self.restored = len(results)
+        # Rewrite the valid part only, so a torn line never ends up in the middle of the journal
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(self.run_info) + '\n')
+        for key, result in results.items():
+            self._file.write(json.dumps([key, *result]) + '\n')
+        self._sync()
+        self.seconds += time.perf_counter() - started
+        return results
+
+    def record(self, key, result):
+        """Append one probe result"""
+        started = time.perf_counter()
+        self._file.write(json.dumps([key, *result]) + '\n')
+        self.written += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self._file.flush()
+            self._unflushed = 0
+            if time.monotonic() - self._synced_at >= self.sync_interval:
+                self._sync()
+        self.seconds += time.perf_counter() - started
+
+    def checkpoint(self):
+        """Make everything recorded so far durable (e.g. after each chunk)"""
+        started = time.perf_counter()
+        self._sync()
+        self.seconds += time.perf_counter() - started
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._synced_at = time.monotonic()
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def finish(self):
+        """Close and delete the journal: the run is complete, nothing is left to resume"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def report(self, total_seconds):
+        """One-line summary of the journal and its share of the run time"""
+        share = self.seconds / total_seconds if total_seconds else 0.0
+        return (f"Checkpoint journal: {self.restored} probe results restored, {self.written} written, "
+                f"{self.seconds:.2f} seconds journaling ({share:.2%} of the run)")
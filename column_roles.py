@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+
+# Bump when a detect_* function changes, so roles cached by the old one are detected again
+ROLE_CACHE_VERSION = 1
+
+def schema_fingerprint(df):
+    """sha256 hex digest of a frame's column names and dtypes, in order"""
+    schema = [[str(column), str(dtype)] for column, dtype in df.dtypes.items()]
+    return hashlib.sha256(json.dumps(schema).encode('utf-8')).hexdigest()
+
+def read_json_file(path, default):
+    """Contents of a JSON file, or default if it is missing or unreadable"""
+    try:
+        with open(path, encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return default
+
+def pinned_columns(roles):
+    """Every column named in a role set's roles (a list, a list of lists or a dict of lists)"""
+    if isinstance(roles, dict):
+        roles = list(roles.values())
+    if roles and all(isinstance(role, list) for role in roles):
+        return [column for role in roles for column in role]
+    return list(roles)
+
+class ColumnRoleCache:
+    """
+    Persistent JSON mapping of input schema (see schema_fingerprint) to the column roles detected
+    for it, so later runs over files with the same columns and dtypes skip the detect_* functions
+    (and phase 1a's URL sampling of text columns)
+    Role sets are named 'website' (list of columns detected by name), 'website_sampled' (list of
+    columns found by URL sampling), 'manufacturing' ([naics, description, tag] column lists) and
+    'capability' ({category: columns})
+    overrides_file pins roles by hand whatever the schema, as {role set: roles}; a 'capability' dict
+    only replaces the categories it names, e.g. {"website": ["homepage"], "capability": {"year": ["founded"]}}
+    Roles naming no column at all are never stored (nor used when an older cache holds them), so
+    a run over an input whose columns were missed detects them again
+    The cache file is re-read before every write and replaced atomically, so phases running at the
+    same time can share it
+    """
+
+    def __init__(self, path=None, overrides_file=None):
+        self.path = path
+        self.overrides = read_json_file(overrides_file, None) if overrides_file else {}
+        if self.overrides is None:
+            raise ValueError(f"Cannot read column role overrides from {overrides_file}")
+        self.hits = 0
+        self.misses = 0
+        self.pinned = 0
+        self._schemas = self._load()
+
+    def _load(self):
+        stored = read_json_file(self.path, {}) if self.path else {}
+        if stored.get('version') != ROLE_CACHE_VERSION:
+            return {}
+        return stored.get('schemas', {})
+
+    def _store(self, fingerprint, role_set, roles):
+        self._schemas.setdefault(fingerprint, {})[role_set] = roles
+        if not self.path:
+            return
+        schemas = self._load()
+        schemas.setdefault(fingerprint, {})[role_set] = roles
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as cache_file:
+            json.dump({'version': ROLE_CACHE_VERSION, 'schemas': schemas}, cache_file, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def roles(self, role_set, df, detect):
+        """
+        (roles, source) of role_set for df's schema; source is 'pinned' when the override file
+        sets them, 'cached' when they were stored for this schema, otherwise 'detected' by
+        detect(df) (and stored)
+        """
+        pinned = self.overrides.get(role_set)
+        if pinned is not None:
+            missing = [column for column in pinned_columns(pinned) if column not in df.columns]
+            if missing:
+                raise ValueError(f"Pinned {role_set} columns not in the input: {', '.join(missing)}")
+            if not isinstance(pinned, dict):
+                self.pinned += 1
+                return pinned, 'pinned'
+
+        fingerprint = schema_fingerprint(df)
+        cached = self._schemas.get(fingerprint, {}).get(role_set)
+        if cached is not None and pinned_columns(cached):
+            self.hits += 1
+            roles, source = cached, 'cached'
+        else:
+            self.misses += 1
+            roles = detect(df)
+            roles = list(roles) if isinstance(roles, tuple) else roles
+            if pinned_columns(roles):
+                self._store(fingerprint, role_set, roles)
+            source = 'detected'
+
+        if pinned is not None:
+            self.pinned += 1
+            roles = {**roles, **pinned}
+            source = 'pinned'
+        return roles, source
+
+    def report(self):
+        """One-line summary of the cache use"""
+        return (f"Column roles: {self.hits} cached, {self.misses} detected, {self.pinned} pinned"
+                f"{f' ({self.path})' if self.path else ''}")
+
+def open_column_role_cache(path=None, overrides_file=None):
+    """A ColumnRoleCache, or None when neither a cache file nor an override file is given"""
+    if path is None and overrides_file is None:
+        return None
+    return ColumnRoleCache(path, overrides_file)
+
+def column_roles(role_cache, role_set, df, detect):
+    """role_cache.roles(role_set, df, detect), or (detect(df), 'detected') without a cache"""
+    if role_cache is None:
+        return detect(df), 'detected'
+    return role_cache.roles(role_set, df, detect)
+
+def role_source_note(source):
+    """Suffix for the detected-columns headings: empty when the roles were just detected"""
+    if source == 'pinned':
+        return " (pinned in the override file)"
+    return " (cached for this schema)" if source == 'cached' else ""
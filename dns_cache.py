@@ -0,0 +1,155 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import dns.resolver
+except ImportError:  # optional: pip install dnspython (record TTLs); getaddrinfo is used without it
+    dns = None
+
+class HostNotFound(Exception):
+    """The host does not exist (NXDOMAIN) or has no addresses"""
+
+# A lookup is a callable host -> (addresses, ttl in seconds or None) that raises HostNotFound for
+# hosts that do not exist; any other exception is a transient failure (timeout, SERVFAIL, ...)
+
+def system_lookup(host):
+    """Resolve host with the system resolver (getaddrinfo, which reports no TTL)"""
+    try:
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+            raise HostNotFound(host) from e
+        raise
+    return sorted({info[4][0] for info in infos}), None
+
+def dnspython_lookup(host):
+    """Resolve host's A, then AAAA records with dnspython, which reports the records' TTL"""
+    for record_type in ('A', 'AAAA'):
+        try:
+            answer = dns.resolver.resolve(host, record_type)
+        except dns.resolver.NXDOMAIN as e:
+            raise HostNotFound(host) from e
+        except dns.resolver.NoAnswer:
+            continue
+        return sorted(record.to_text() for record in answer), answer.rrset.ttl
+    raise HostNotFound(host)
+
+def hosts_file_lookup(path):
+    """
+    Lookup that answers from a hosts-format file ('address name [aliases...]' per line) and
+    treats every other host as not existing, e.g. to run the DNS stage without network access
+    """
+    table = {}
+    with open(path) as hosts_file:
+        for line in hosts_file:
+            fields = line.split('#', 1)[0].split()
+            for name in fields[1:]:
+                table.setdefault(name.lower().rstrip('.'), []).append(fields[0])
+
+    def lookup(host):
+        if host not in table:
+            raise HostNotFound(host)
+        return table[host], None
+
+    return lookup
+
+def default_lookup():
+    """dnspython_lookup when dnspython is installed, otherwise system_lookup"""
+    return dnspython_lookup if dns is not None else system_lookup
+
+def is_ip_address(host):
+    try:
+        socket.inet_pton(socket.AF_INET6 if ':' in host else socket.AF_INET, host)
+        return True
+    except (OSError, ValueError):
+        return False
+
+class CachingResolver:
+    """
+    In-process DNS cache in front of a lookup (default_lookup() by default), shared by a whole run
+    Addresses are kept for the TTL of their records (default_ttl when the lookup reports none,
+    clamped to [min_ttl, max_ttl]); hosts that do not exist are kept for negative_ttl seconds
+    Transient lookup failures are not cached and count as resolvable, so the website check decides
+    resolve_many resolves a batch of hosts concurrently, each distinct host once
+    """
+
+    def __init__(self, lookup=None, default_ttl=300, min_ttl=30, max_ttl=24 * 3600, negative_ttl=600,
+                 clock=time.monotonic):
+        self.lookup = lookup or default_lookup()
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.lookups = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.not_found = 0
+        self.errors = 0
+        self.lookup_seconds = 0.0
+        self._entries = {}  # host -> (addresses or None if it does not exist, expires at)
+        self._lock = threading.Lock()
+
+    def _cached(self, host):
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry[1] <= self.clock():
+                return False, None
+            if entry[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[0]
+
+    def resolve(self, host):
+        """Addresses of host ([] when a transient failure leaves it unknown), or None if it does not exist"""
+        host = host.lower().rstrip('.')
+        if is_ip_address(host.strip('[]')):
+            return [host]
+        found, addresses = self._cached(host)
+        if found:
+            return addresses
+
+        started = time.monotonic()
+        try:
+            addresses, ttl = self.lookup(host)
+            ttl = min(self.max_ttl, max(self.min_ttl, ttl if ttl is not None else self.default_ttl))
+        except HostNotFound:
+            addresses, ttl = None, self.negative_ttl
+        except Exception:
+            addresses, ttl = [], None
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            self.lookups += 1
+            self.lookup_seconds += elapsed
+            if addresses is None:
+                self.not_found += 1
+            elif not addresses:
+                self.errors += 1
+            if ttl is not None:
+                self._entries[host] = (addresses, self.clock() + ttl)
+        return addresses
+
+    def resolves(self, host):
+        """Whether host may exist (it resolved, or its lookup failed transiently)"""
+        return self.resolve(host) is not None
+
+    def resolve_many(self, hosts, concurrency=32):
+        """Resolve a batch of hosts concurrently; returns {host: resolves(host)} for the distinct hosts"""
+        hosts = list(dict.fromkeys(hosts))
+        if len(hosts) <= 1 or concurrency <= 1:
+            return {host: self.resolves(host) for host in hosts}
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(hosts))) as executor:
+            return dict(zip(hosts, executor.map(self.resolves, hosts)))
+
+    def mean_lookup_seconds(self):
+        return self.lookup_seconds / self.lookups if self.lookups else 0.0
+
+    def report(self):
+        """One-line summary of the DNS stage"""
+        return (f"DNS: {self.lookups} lookups ({self.mean_lookup_seconds() * 1000:.1f} ms mean), "
+                f"{self.hits} cache hits, {self.negative_hits} negative cache hits, "
+                f"{self.not_found} hosts not found, {self.errors} transient failures")
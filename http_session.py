@@ -0,0 +1,100 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class ConnectionStats:
+    """
+    Thread-safe counts of HTTP requests made and TCP(+TLS) connections opened for them
+    connect_observer, if given, is called with the seconds every connection took to open
+    """
+
+    def __init__(self, connect_observer=None):
+        self.connections_opened = 0
+        self.requests_made = 0
+        self.connect_observer = connect_observer
+        self._lock = threading.Lock()
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def request_made(self):
+        with self._lock:
+            self.requests_made += 1
+
+    def requests_per_connection(self):
+        """Average number of requests each opened connection carried"""
+        return self.requests_made / self.connections_opened if self.connections_opened else 0.0
+
+def counting_pool_class(pool_class, stats):
+    """Subclass of a urllib3 connection pool class that counts every new connection in stats"""
+
+    class CountingConnectionPool(pool_class):
+        def _new_conn(self):
+            stats.connection_opened()
+            conn = super()._new_conn()
+            if stats.connect_observer is not None:
+                # Connections open lazily, on their first request: time that
+                connect = conn.connect
+
+                def timed_connect():
+                    started = time.monotonic()
+                    connect()
+                    stats.connect_observer(time.monotonic() - started)
+
+                conn.connect = timed_connect
+            return conn
+
+    return CountingConnectionPool
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report requests and new connections to a ConnectionStats"""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: counting_pool_class(pool_class, self.stats)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.request_made()
+        return super().send(request, **kwargs)
+
+class PooledSession(requests.Session):
+    """
+    requests.Session that keeps connections alive and reuses them for the whole run
+    One session is shared by every worker thread: each host gets a pool of up to pool_size open
+    connections (host_pool_sizes overrides it for given hosts, e.g. {'cdn.example.com': 8}), and
+    up to max_hosts host pools are kept open at once
+    stats counts the requests made and the connections opened for them; connect_observer is
+    called with the seconds each connection took to open (e.g. TimeoutPolicy.observe_connect)
+    """
+
+    def __init__(self, pool_size=2, host_pool_sizes=None, max_hosts=256, connect_observer=None):
+        super().__init__()
+        self.stats = ConnectionStats(connect_observer)
+        self.pool_size = pool_size
+
+        default_adapter = CountingHTTPAdapter(self.stats, pool_connections=max_hosts, pool_maxsize=pool_size)
+        self.mount('http://', default_adapter)
+        self.mount('https://', default_adapter)
+
+        # requests picks the adapter with the longest matching URL prefix, so these win for their hosts
+        for host, size in (host_pool_sizes or {}).items():
+            host = host.lower()
+            host_adapter = CountingHTTPAdapter(self.stats, pool_connections=4, pool_maxsize=size)
+            for name in {host, host[4:] if host.startswith('www.') else 'www.' + host}:
+                self.mount(f'http://{name}/', host_adapter)
+                self.mount(f'https://{name}/', host_adapter)
+
+    def report(self):
+        """One-line summary of connection reuse"""
+        return (f"HTTP requests: {self.stats.requests_made}, connections opened: {self.stats.connections_opened} "
+                f"({self.stats.requests_per_connection():.1f} requests per connection)")
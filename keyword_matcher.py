@@ -0,0 +1,103 @@
+import operator
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+class KeywordMatcher:
+    """
+    Substring matcher for a fixed keyword list, compiled once and shared by every row
+    Gives the same answer as testing `keyword in text` for each keyword of the list
+
+    Backends:
+    - 'automaton': Aho-Corasick automaton (needs pyahocorasick), one pass over the text finds every keyword
+    - 'scan': one C-level substring scan per keyword, with no bookkeeping around it, so it costs
+      the same as the `keyword in text` loop it replaces (install pyahocorasick to go faster)
+    - 'auto': 'automaton' when pyahocorasick is installed, otherwise 'scan'
+    """
+
+    def __init__(self, keywords, backend='auto'):
+        self.keywords = list(keywords)
+
+        if backend == 'auto':
+            backend = 'automaton' if ahocorasick is not None else 'scan'
+        if backend == 'automaton' and ahocorasick is None:
+            raise ImportError("The 'automaton' backend needs pyahocorasick (pip install pyahocorasick)")
+        if backend not in ('automaton', 'scan'):
+            raise ValueError(f"Unknown keyword matcher backend: {backend}")
+        self.backend = backend
+
+        # Positions of each distinct keyword in the original list (duplicates keep every position)
+        self._positions = {}
+        for position, keyword in enumerate(self.keywords):
+            self._positions.setdefault(keyword, []).append(position)
+        self._distinct_keywords = list(self._positions)
+
+        # The empty string is "in" every text
+        self._always_found = self._positions.get('', [])
+
+        self._automaton = None
+        if self.backend == 'automaton':
+            self._automaton = ahocorasick.Automaton()
+            for keyword, positions in self._positions.items():
+                if keyword != '':
+                    self._automaton.add_word(keyword, tuple(positions))
+            if len(self._automaton):
+                self._automaton.make_automaton()
+            else:
+                self._automaton = None
+
+    def find_indices(self, text):
+        """Sorted positions in the keyword list of every keyword found in text"""
+        if self._automaton is not None:
+            found = set(self._always_found)
+            for _, positions in self._automaton.iter(text):
+                found.update(positions)
+            return sorted(found)
+
+        return [position for position, keyword in enumerate(self.keywords) if keyword in text]
+
+    def find_entries(self, text):
+        """Keyword-list entries found in text, in list order (same as [kw for kw in keywords if kw in text])"""
+        if self._automaton is None:
+            return [keyword for keyword in self.keywords if keyword in text]
+        return [self.keywords[position] for position in self.find_indices(text)]
+
+    def find_all(self, text):
+        """Distinct keywords found in text, in keyword-list order"""
+        return list(dict.fromkeys(self.find_entries(text)))
+
+    def count(self, text):
+        """Number of keyword-list entries found in text (duplicates in the list count separately)"""
+        if self._automaton is None:
+            return len([keyword for keyword in self.keywords if keyword in text])
+        return len(self.find_indices(text))
+
+    def count_many(self, texts):
+        """count() for a whole column of texts, returned as an int64 NumPy array"""
+        texts = list(texts)
+        if self.backend == 'automaton':
+            return np.fromiter(map(self.count, texts), dtype=np.int64, count=len(texts))
+
+        counts = np.full(len(texts), len(self._always_found), dtype=np.int64)
+        for keyword in self._distinct_keywords:
+            if keyword == '':
+                continue
+            found = np.fromiter(map(operator.contains, texts, repeat(keyword)), dtype=bool, count=len(texts))
+            counts += found * len(self._positions[keyword])
+        return counts
+
+@lru_cache(maxsize=32)
+def _cached_matcher(keywords):
+    return KeywordMatcher(keywords)
+
+def get_keyword_matcher(keywords):
+    """Return a shared KeywordMatcher for a keyword list, compiling it only the first time"""
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+    return _cached_matcher(tuple(keywords))
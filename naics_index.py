@@ -0,0 +1,71 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+class NaicsPrefixIndex:
+    """
+    Precomputed lookup over a list of NAICS prefixes
+    A code is answered in O(code length) by looking up each of its own prefixes,
+    instead of calling startswith for every listed prefix
+    """
+
+    def __init__(self, prefixes):
+        self.prefixes = list(prefixes)
+
+        # First position of each prefix in the list: the phases report the earliest listed match
+        self._positions = {}
+        for position, prefix in enumerate(self.prefixes):
+            self._positions.setdefault(prefix, position)
+        self._max_length = max((len(prefix) for prefix in self._positions), default=0)
+
+    def matching_prefixes(self, code):
+        """Every listed prefix the code starts with, in list order"""
+        code = str(code)
+        matches = [code[:length] for length in range(min(len(code), self._max_length) + 1)
+                   if code[:length] in self._positions]
+        return sorted(matches, key=self._positions.__getitem__)
+
+    def first_match(self, code):
+        """The earliest listed prefix the code starts with (the one the phases report), or None"""
+        matches = self.matching_prefixes(code)
+        return matches[0] if matches else None
+
+    def longest_match(self, code):
+        """The longest listed prefix the code starts with, or None"""
+        code = str(code)
+        for length in range(min(len(code), self._max_length), -1, -1):
+            if code[:length] in self._positions:
+                return code[:length]
+        return None
+
+    def first_match_column(self, series):
+        """
+        first_match for every value of a column, compared as str(value).strip()
+        Missing values give None; each distinct value is looked up once
+        Returns an object NumPy array aligned with the series
+        """
+        return self._map_column(series, self.first_match)
+
+    def longest_match_column(self, series):
+        """longest_match for every value of a column (see first_match_column)"""
+        return self._map_column(series, self.longest_match)
+
+    def _map_column(self, series, lookup):
+        result = np.full(len(series), None, dtype=object)
+        present = series.notna().to_numpy()
+        if present.any():
+            codes, uniques = pd.factorize(series[present])
+            unique_matches = np.array([lookup(str(value).strip()) for value in uniques], dtype=object)
+            result[present] = unique_matches[codes]
+        return result
+
+@lru_cache(maxsize=32)
+def _cached_index(prefixes):
+    return NaicsPrefixIndex(prefixes)
+
+def get_naics_index(prefixes):
+    """Return a shared NaicsPrefixIndex for a prefix list, building it only the first time"""
+    if isinstance(prefixes, NaicsPrefixIndex):
+        return prefixes
+    return _cached_index(tuple(prefixes))
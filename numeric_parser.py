@@ -0,0 +1,131 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+# Values that mean "no number"
+MISSING_TEXTS = {"not available", "n/a", "none", "not applicable", "no data", "unknown", ""}
+
+NUMBER_PATTERN = re.compile(r'[\d,.]+')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d.-]')
+# A number with an optional unit right after it, for the strict rules
+UNIT_NUMBER_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(billion|bn|b|million|mn|m)?\b')
+UNIT_MULTIPLIERS = {'billion': 1_000_000_000, 'bn': 1_000_000_000, 'b': 1_000_000_000,
+                    'million': 1_000_000, 'mn': 1_000_000, 'm': 1_000_000}
+
+def parse_numeric_text(value, compat=True):
+    """
+    Number in a text such as "$10M", "€5.5 million" or "1,200", or None
+    compat keeps the historical multiplier rules: any value containing an 'm' (including words
+    such as "employees" or "medium") is read as millions, and any other value containing a 'b' as
+    billions. Without compat, the multipliers only apply to a unit written right after the number
+    ("10M", "5.5 million", "2 bn")
+    """
+    value = value.strip().lower()
+
+    # Handle "not available" type values
+    if value in MISSING_TEXTS:
+        return None
+
+    if compat:
+        # Handle currency formats like "$10M", "€5.5M", "10 million"
+        if 'm' in value:
+            num_match = NUMBER_PATTERN.search(value)
+            if num_match:
+                try:
+                    return float(num_match.group().replace(',', '')) * 1_000_000
+                except ValueError:
+                    return None
+
+        if 'b' in value:
+            num_match = NUMBER_PATTERN.search(value)
+            if num_match:
+                try:
+                    return float(num_match.group().replace(',', '')) * 1_000_000_000
+                except ValueError:
+                    return None
+    else:
+        unit_match = UNIT_NUMBER_PATTERN.search(value)
+        if unit_match and unit_match.group(2):
+            return float(unit_match.group(1).replace(',', '')) * UNIT_MULTIPLIERS[unit_match.group(2)]
+
+    # Handle simple numeric values: remove currency symbols and commas
+    clean_value = NON_NUMERIC_PATTERN.sub('', value)
+    if clean_value:
+        try:
+            return float(clean_value)
+        except ValueError:
+            pass
+
+    return None
+
+class NumericParser:
+    """
+    Parses numeric text columns (revenue, employee counts) into float arrays
+    Every distinct value of a column is parsed once, and parsed values are remembered across
+    columns and chunks in a memo of at most memo_size entries (cleared when it fills up)
+    Keeps counts of the values seen, the distinct values per column and the time spent, for report()
+    """
+
+    def __init__(self, compat=True, memo_size=100_000):
+        self.compat = compat
+        self.memo_size = memo_size
+        self.values = 0
+        self.distinct = 0
+        self.parsed = 0
+        self.seconds = 0.0
+        self._memo = {}
+
+    def parse(self, text):
+        """parse_numeric_text(text) through the memo"""
+        try:
+            return self._memo[text]
+        except KeyError:
+            pass
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        number = self._memo[text] = parse_numeric_text(text, self.compat)
+        self.parsed += 1
+        return number
+
+    def parse_column(self, series):
+        """
+        Number in str() of every value of a column as a float64 NumPy array, NaN where the value
+        is missing or holds no number
+        """
+        started = time.perf_counter()
+        result = np.full(len(series), np.nan)
+        present = series.notna().to_numpy()
+        if present.any():
+            values = series[present]
+            if values.dtype == object:
+                # Mixed objects such as 1 and 1.0 are equal but print differently: key them by their text
+                values = np.array([str(value) for value in values.to_numpy()], dtype=object)
+            codes, uniques = pd.factorize(values)
+            numbers = np.array([self.parse(str(value)) for value in uniques], dtype=object)
+            result[present] = pd.Series(numbers[codes], dtype=object).astype(np.float64).to_numpy()
+            self.values += len(codes)
+            self.distinct += len(uniques)
+        self.seconds += time.perf_counter() - started
+        return result
+
+    def counts(self):
+        """Counters of this parser, for add_counts (e.g. from worker processes)"""
+        return {'values': self.values, 'distinct': self.distinct, 'parsed': self.parsed, 'seconds': self.seconds}
+
+    def add_counts(self, counts):
+        self.values += counts['values']
+        self.distinct += counts['distinct']
+        self.parsed += counts['parsed']
+        self.seconds += counts['seconds']
+
+    def unique_ratio(self):
+        """Distinct values per column as a fraction of all values parsed"""
+        return self.distinct / self.values if self.values else 0.0
+
+    def report(self):
+        """One-line summary of the parsing"""
+        return (f"Numeric parsing: {self.values} values, {self.unique_ratio():.1%} distinct per column, "
+                f"{self.parsed} parsed (the rest from the memo), {self.seconds:.2f} seconds"
+                f"{'' if self.compat else ' (strict unit rules)'}")
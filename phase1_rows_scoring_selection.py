@@ -2,6 +2,47 @@ import pandas as pd
 import numpy as np
 import os
 import re
+from collections import Counter
+from itertools import chain
+
+from column_roles import column_roles, open_column_role_cache, role_source_note
+from keyword_matcher import get_keyword_matcher
+from naics_index import get_naics_index
+from progress import ProgressReporter, close_progress_reporter, open_progress_reporter
+from run_metrics import RunMetrics, save_metrics, stage_timer, timed, timed_chunks
+from shard_parallel import ShardPool
+from table_io import open_table_appender, open_table_reader, read_table, write_table
+
+# Obvious placeholder values that do not count as website data
+WEBSITE_PLACEHOLDER_VALUES = ["not available", "n/a", "none", "not applicable", "no website", "www."]
+
+# Company name columns used for reporting, in order of preference
+NAME_COLUMNS = ['company_name', 'input_company_name', 'name', 'business_name']
+
+# Columns and keyword lists used by the row scoring (shared by the row-wise and columnar scorers)
+PHONE_COLUMNS = ['primary_phone', 'phone_numbers', 'phone', 'contact_phone']
+ADDRESS_COLUMNS = ['main_country', 'main_city', 'main_street', 'country', 'city', 'street', 'address']
+NAICS_COLUMNS = ['naics_2022_primary_code', 'naics_code', 'primary_naics']
+DESCRIPTION_COLUMNS = [
+    'short_description', 'long_description', 'business_tags',
+    'naics_2022_primary_label', 'company_description', 'description'
+]
+
+# Manufacturing NAICS codes
+MANUFACTURING_NAICS = [
+    '31', '32', '33',  # Core manufacturing sectors
+    '42',              # Wholesale trade (suppliers)
+    '5413', '5416'     # Engineering and technical services
+]
+MANUFACTURING_NAICS_INDEX = get_naics_index(MANUFACTURING_NAICS)
+
+# Manufacturing keywords
+MANUFACTURING_KEYWORDS = [
+    'manufactur', 'supplier', 'raw material', 'components', 'parts', 'machinery',
+    'equipment', 'tool', 'fabrication', 'industrial', 'production', 'assembly',
+    'factory', 'plant', 'mill', 'processing', 'wholesale', 'distribution'
+]
+MANUFACTURING_KEYWORD_MATCHER = get_keyword_matcher(MANUFACTURING_KEYWORDS)
 
 def detect_website_fields(df):
     """Detect which columns might contain website information"""
@@ -33,8 +74,7 @@ def has_website_data_simple(row, website_columns):
             continue
 
         # Skip obvious placeholder values
-        placeholder_values = ["not available", "n/a", "none", "not applicable", "no website", "www."]
-        if cleaned_value.lower() in placeholder_values:
+        if cleaned_value.lower() in WEBSITE_PLACEHOLDER_VALUES:
             continue
 
         # Accept almost anything that looks like it could be a website
@@ -44,9 +84,7 @@ def has_website_data_simple(row, website_columns):
 
 def has_phone_data(row):
     """Check if a row has valid phone data"""
-    phone_columns = ['primary_phone', 'phone_numbers', 'phone', 'contact_phone']
-
-    for column in phone_columns:
+    for column in PHONE_COLUMNS:
         if column not in row.index:
             continue
 
@@ -58,10 +96,8 @@ def has_phone_data(row):
 
 def has_address_data(row):
     """Check if a row has valid address/location data"""
-    address_columns = ['main_country', 'main_city', 'main_street', 'country', 'city', 'street', 'address']
-
     valid_fields = 0
-    for column in address_columns:
+    for column in ADDRESS_COLUMNS:
         if column not in row.index:
             continue
 
@@ -75,43 +111,23 @@ def has_address_data(row):
 
 def check_manufacturing_relevance(row):
     """Check if a row has manufacturing relevance through NAICS codes or keywords"""
-    # Manufacturing NAICS codes
-    manufacturing_naics = [
-        '31', '32', '33',  # Core manufacturing sectors
-        '42',              # Wholesale trade (suppliers)
-        '5413', '5416'     # Engineering and technical services
-    ]
-
-    # Manufacturing keywords
-    manufacturing_keywords = [
-        'manufactur', 'supplier', 'raw material', 'components', 'parts', 'machinery',
-        'equipment', 'tool', 'fabrication', 'industrial', 'production', 'assembly',
-        'factory', 'plant', 'mill', 'processing', 'wholesale', 'distribution'
-    ]
-
     # Check NAICS code
-    naics_columns = ['naics_2022_primary_code', 'naics_code', 'primary_naics']
     naics_code = ""
 
-    for column in naics_columns:
+    for column in NAICS_COLUMNS:
         if column in row.index and pd.notna(row[column]):
             naics_code = str(row[column]).strip()
             break
 
-    naics_match = any(naics_code.startswith(code) for code in manufacturing_naics)
+    naics_match = MANUFACTURING_NAICS_INDEX.first_match(naics_code) is not None
 
     # Check keywords in descriptions
-    description_columns = [
-        'short_description', 'long_description', 'business_tags',
-        'naics_2022_primary_label', 'company_description', 'description'
-    ]
-
     combined_text = ""
-    for column in description_columns:
+    for column in DESCRIPTION_COLUMNS:
         if column in row.index and pd.notna(row[column]) and isinstance(row[column], str):
             combined_text += row[column].lower() + " "
 
-    keyword_matches = sum(1 for keyword in manufacturing_keywords if keyword in combined_text)
+    keyword_matches = MANUFACTURING_KEYWORD_MATCHER.count(combined_text)
 
     # Return True if either NAICS matches OR at least 2 keywords match
     return naics_match or keyword_matches >= 2
@@ -134,11 +150,101 @@ def calculate_row_score(row):
 
     return score
 
-def select_best_row_from_group(company_block, website_columns):
+def text_value_mask(series):
+    """Columnar `isinstance(value, str)`: boolean NumPy array aligned with the series"""
+    if series.dtype == object:
+        return np.fromiter((isinstance(value, str) for value in series), dtype=bool, count=len(series))
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.notna().to_numpy()
+
+    # Numeric, boolean and datetime columns never hold strings
+    return np.zeros(len(series), dtype=bool)
+
+def text_filled_mask(series):
+    """
+    Columnar version of `pd.notna(value) and isinstance(value, str) and value.strip() != ""`
+    Returns a boolean NumPy array aligned with the series
+    """
+    is_text = text_value_mask(series)
+    filled = np.zeros(len(series), dtype=bool)
+    if is_text.any():
+        text_values = series[is_text].astype(object)
+        filled[is_text] = (text_values.str.strip() != "").to_numpy(dtype=bool)
+    return filled
+
+def phone_data_mask(df):
+    """Columnar has_phone_data: True where any phone column holds a non-empty string"""
+    mask = np.zeros(len(df), dtype=bool)
+    for column in PHONE_COLUMNS:
+        if column in df.columns:
+            mask |= text_filled_mask(df[column])
+    return mask
+
+def address_data_mask(df):
+    """Columnar has_address_data: True where at least 2 address columns hold non-empty strings"""
+    valid_fields = np.zeros(len(df), dtype=np.int64)
+    for column in ADDRESS_COLUMNS:
+        if column in df.columns:
+            valid_fields += text_filled_mask(df[column])
+    return valid_fields >= 2
+
+def naics_relevance_mask(df):
+    """Columnar NAICS half of check_manufacturing_relevance (first non-null NAICS column decides)"""
+    mask = np.zeros(len(df), dtype=bool)
+    undecided = np.ones(len(df), dtype=bool)
+
+    for column in NAICS_COLUMNS:
+        if column not in df.columns:
+            continue
+
+        series = df[column]
+        present = series.notna().to_numpy() & undecided
+        if not present.any():
+            continue
+
+        # The prefix index looks up each distinct code once
+        mask[present] = pd.notna(MANUFACTURING_NAICS_INDEX.first_match_column(series[present]))
+        undecided &= ~present
+
+    return mask
+
+def combined_description_text(df):
+    """Columnar version of the lower-cased combined description text built in check_manufacturing_relevance"""
+    column_parts = []
+    for column in DESCRIPTION_COLUMNS:
+        if column in df.columns:
+            column_parts.append([value.lower() + " " if isinstance(value, str) else "" for value in df[column].tolist()])
+
+    if not column_parts:
+        return [""] * len(df)
+    return list(map("".join, zip(*column_parts)))
+
+def keyword_relevance_mask(df):
+    """Columnar keyword half of check_manufacturing_relevance (at least 2 keywords in the combined text)"""
+    combined_text = combined_description_text(df)
+
+    keyword_matches = MANUFACTURING_KEYWORD_MATCHER.count_many(combined_text)
+
+    return keyword_matches >= 2
+
+def calculate_row_scores(df):
+    """
+    Columnar calculate_row_score for a whole DataFrame
+    Returns an int64 NumPy array with the same score calculate_row_score gives each row
+    """
+    manufacturing_mask = naics_relevance_mask(df) | keyword_relevance_mask(df)
+    return (
+        phone_data_mask(df).astype(np.int64) * 1
+        + address_data_mask(df).astype(np.int64) * 2
+        + manufacturing_mask.astype(np.int64) * 3
+    )
+
+def select_best_row_from_group(company_block, website_columns, row_scores=None):
     """
     Select the best row from a group of 5 rows based on criteria:
     1. MUST have website data in any website-related field
     2. Among rows with website data, pick the one with highest score
+    row_scores can hold precomputed scores for the block (see calculate_row_scores)
     """
     valid_rows = []
 
@@ -147,7 +253,7 @@ def select_best_row_from_group(company_block, website_columns):
         has_website, website_col, website_val = has_website_data_simple(row, website_columns)
 
         if has_website:
-            row_score = calculate_row_score(row)
+            row_score = int(row_scores[idx]) if row_scores is not None else calculate_row_score(row)
             valid_rows.append((row_score, idx, row, website_col, website_val))
 
     # If no rows have website data, return None
@@ -167,124 +273,397 @@ def select_best_row_from_group(company_block, website_columns):
 
     return best_row
 
-def process_companies(input_file, output_file):
-    """Main function to process companies with robust website detection"""
-    print("Starting Phase 1a: ROBUST Company Selection")
-    print("=" * 70)
+def assign_group_ids(df, group_size=5, group_key=None):
+    """
+    Assign every row a company group id and its 0-based position inside the group
+    Groups are consecutive blocks of group_size rows, or all rows sharing a group_key value
+    (numbered in order of first appearance). Rows of an incomplete trailing block get group id -1
+    """
+    if group_key is not None:
+        group_ids, _ = pd.factorize(df[group_key], use_na_sentinel=False)
+        group_ids = group_ids.astype(np.int64)
+        positions = pd.Series(group_ids).groupby(group_ids).cumcount().to_numpy()
+        return group_ids, positions
+
+    row_numbers = np.arange(len(df))
+    group_ids = row_numbers // group_size
+    positions = row_numbers % group_size
+    group_ids[(len(df) // group_size) * group_size:] = -1
+    return group_ids, positions
+
+def detect_website_values(df, website_columns):
+    """
+    Columnar has_website_data_simple
+    Returns (has_website mask, detected column per row, cleaned website value per row)
+    """
+    has_website = np.zeros(len(df), dtype=bool)
+    detected_columns = np.full(len(df), None, dtype=object)
+    detected_values = np.full(len(df), None, dtype=object)
 
-    # Load the data
-    df = pd.read_csv(input_file)
-    print(f"Loaded {len(df)} rows from input file")
+    for column in website_columns:
+        if column not in df.columns:
+            continue
 
-    # Detect website columns
-    website_columns = detect_website_fields(df)
-    print(f"\nDetected website-related columns: {', '.join(website_columns) if website_columns else 'None'}")
+        series = df[column]
+        is_text = text_value_mask(series) & ~has_website
+        if not is_text.any():
+            continue
 
-    if not website_columns:
+        cleaned = series[is_text].astype(object).str.strip()
+        usable = (cleaned != "") & ~cleaned.str.lower().isin(WEBSITE_PLACEHOLDER_VALUES)
+        rows = np.flatnonzero(is_text)[usable.to_numpy(dtype=bool)]
+
+        has_website[rows] = True
+        detected_columns[rows] = column
+        detected_values[rows] = cleaned[usable].to_numpy()
+
+    return has_website, detected_columns, detected_values
+
+def select_best_rows(df, website_columns, row_scores=None, group_size=5, group_key=None):
+    """
+    Columnar select_best_row_from_group over every company group of the DataFrame
+    Rows without website data are skipped; the highest score wins and the first row wins ties
+    Returns (selected_df, groups): selected_df holds the winning rows with the selection metadata,
+    groups has one row per group with its first row position and the selected position (-1 if none)
+    """
+    if row_scores is None:
+        row_scores = calculate_row_scores(df)
+
+    group_ids, positions = assign_group_ids(df, group_size, group_key)
+    has_website, detected_columns, detected_values = detect_website_values(df, website_columns)
+
+    # Rows without website data can never win: give them a score below every real one
+    grouped_rows = np.flatnonzero(group_ids >= 0)
+    candidate_scores = pd.Series(np.where(has_website, row_scores, -1)[grouped_rows], index=grouped_rows)
+    grouped = candidate_scores.groupby(group_ids[grouped_rows], sort=True)
+
+    # idxmax returns the first row among equal maxima, like the stable sort in select_best_row_from_group
+    best_positions = grouped.idxmax().to_numpy(dtype=np.int64)
+    first_positions = pd.Series(grouped_rows).groupby(group_ids[grouped_rows], sort=True).min().to_numpy(dtype=np.int64)
+    selected_positions = np.where(has_website[best_positions], best_positions, -1)
+
+    winners = selected_positions[selected_positions >= 0]
+    selected_df = df.iloc[winners].copy()
+    selected_df['selection_score'] = np.asarray(row_scores, dtype=np.int64)[winners]
+    selected_df['source_row_index'] = positions[winners] + 1  # 1-based index for human readability
+    selected_df['detected_website_column'] = detected_columns[winners]
+    selected_df['detected_website_value'] = detected_values[winners]
+
+    groups = pd.DataFrame({'first_position': first_positions, 'selected_position': selected_positions})
+    return selected_df, groups
+
+def get_group_company_names(df, first_positions):
+    """Company name of each group, read from its first row like the row-wise selection report"""
+    names = np.full(len(first_positions), "Unknown", dtype=object)
+    unresolved = np.ones(len(first_positions), dtype=bool)
+
+    for col in NAME_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy(dtype=object)[first_positions]
+        for i in np.flatnonzero(unresolved):
+            if pd.notna(values[i]):
+                name_val = str(values[i]).strip()
+                if name_val != "":
+                    names[i] = name_val
+                    unresolved[i] = False
+
+    return names
+
+def sample_url_columns(df):
+    """Text columns with URL patterns in their first 10 non-empty values"""
+    url_pattern = r'https?://|www\.|[a-zA-Z0-9\-]+\.(com|org|net|io|co|edu|gov|biz|info|me|dev|ai|app)'
+
+    # Find columns that might contain URLs
+    website_columns = []
+    text_columns = [col for col in df.columns if df[col].dtype == 'object']
+    for column in text_columns:
+        sample_values = df[column].dropna().head(10).tolist()
+        url_count = sum(1 for val in sample_values if isinstance(val, str) and re.search(url_pattern, val, re.IGNORECASE))
+        if url_count > 0:
+            print(f"  Found potential URLs in column '{column}' ({url_count}/10 sample rows)")
+            website_columns.append(column)
+    return website_columns
+
+def find_website_columns(df, role_cache=None):
+    """
+    Detect website columns by name, falling back to sampling text columns for URL patterns
+    With a ColumnRoleCache, columns detected by name are cached for df's schema (or pinned) under
+    'website', and columns found by sampling under 'website_sampled', so later runs over the same
+    schema skip the sampling too; a sample that finds nothing is never cached
+    """
+    website_columns, source = column_roles(role_cache, 'website', df, detect_website_fields)
+    print(f"\nDetected website-related columns{role_source_note(source)}: "
+          f"{', '.join(website_columns) if website_columns else 'None'}")
+
+    if not website_columns and source != 'pinned':
         print("⚠️  No website-related columns detected! Searching for URL patterns in all text fields...")
         # Fallback: search all string columns for URL patterns
-        url_pattern = r'https?://|www\.|[a-zA-Z0-9\-]+\.(com|org|net|io|co|edu|gov|biz|info|me|dev|ai|app)'
+        website_columns, source = column_roles(role_cache, 'website_sampled', df, sample_url_columns)
+        if source == 'cached' and website_columns:
+            print(f"  URL columns found by an earlier sample of this schema: {', '.join(website_columns)}")
+
+    return list(website_columns)
 
-        # Find columns that might contain URLs
-        text_columns = [col for col in df.columns if df[col].dtype == 'object']
-        for column in text_columns:
-            sample_values = df[column].dropna().head(10).tolist()
-            url_count = sum(1 for val in sample_values if isinstance(val, str) and re.search(url_pattern, val, re.IGNORECASE))
-            if url_count > 0:
-                print(f"  Found potential URLs in column '{column}' ({url_count}/10 sample rows)")
-                website_columns.append(column)
+def split_complete_groups(df, group_size=5, group_key=None):
+    """
+    Split a chunk of rows into (rows of complete groups, trailing rows whose group may continue
+    in the next chunk). With group_key the trailing run of rows sharing the last key is held
+    back, so streaming by key assumes each company's rows are contiguous
+    """
+    if group_key is not None:
+        if len(df) == 0:
+            return df, df
+        keys = df[group_key]
+        last_key = keys.iloc[-1]
+        same_key = keys.isna() if pd.isna(last_key) else keys.eq(last_key)
+        other_key_rows = np.flatnonzero(~same_key.to_numpy(dtype=bool))
+        run_start = other_key_rows[-1] + 1 if len(other_key_rows) else 0
+        return df.iloc[:run_start], df.iloc[run_start:]
+
+    complete_rows = (len(df) // group_size) * group_size
+    return df.iloc[:complete_rows], df.iloc[complete_rows:]
+
+def report_company_selection(df, result_df, groups, sample_rejections, reporter=None):
+    """
+    Report the SELECTED/DISQUALIFIED decision of every company in file order to a ProgressReporter
+    (without one, the lines are printed), returns the disqualified count
+    """
+    if reporter is None:
+        reporter = ProgressReporter('1a')
+    first_positions = groups['first_position'].to_numpy()
+    selected_positions = groups['selected_position'].to_numpy()
+
+    if not reporter.wants_decisions:
+        # Only the count and the names of the first rejections (for analysis) are needed
+        disqualified = selected_positions < 0
+        rejected_positions = first_positions[disqualified][:10 - len(sample_rejections)]
+        sample_rejections.extend(get_group_company_names(df, rejected_positions))
+        return int(disqualified.sum())
+
+    disqualified_companies = 0
+    lines = []
+    records = []
+
+    company_names = get_group_company_names(df, first_positions)
+    selected_rows = iter(result_df.itertuples(index=False))
+    score_column = result_df.columns.get_loc('selection_score')
+    website_column = result_df.columns.get_loc('detected_website_column')
+    value_column = result_df.columns.get_loc('detected_website_value')
+
+    for company_name, selected_position in zip(company_names, selected_positions):
+        if selected_position >= 0:
+            best_row = next(selected_rows)
+            website_info = f"{best_row[website_column]}: {best_row[value_column][:50]}"
+            lines.append(f"✅ SELECTED: {company_name} (Score: {best_row[score_column]}, {website_info})")
+            records.append({'company': company_name, 'decision': 'selected', 'score': int(best_row[score_column]),
+                            'website_column': best_row[website_column], 'website': best_row[value_column]})
+        else:
+            disqualified_companies += 1
+            if len(sample_rejections) < 10:  # Only collect first 10 rejections for analysis
+                sample_rejections.append(company_name)
+            lines.append(f"❌ DISQUALIFIED: {company_name} (No website data found)")
+            records.append({'company': company_name, 'decision': 'disqualified', 'reason': "No website data found"})
+
+    reporter.decide_many(lines, records)
+    return disqualified_companies
+
+def select_shard(shard, website_columns, group_size=5, group_key=None, reporter=None):
+    """
+    Score, select and report the companies of one shard of a ShardPool run
+    Returns (selected rows, number of companies, number disqualified, first 10 rejected names)
+    """
+    row_scores = calculate_row_scores(shard)
+    shard_result, groups = select_best_rows(shard, website_columns, row_scores, group_size, group_key)
+    sample_rejections = []
+    disqualified = report_company_selection(shard, shard_result, groups, sample_rejections, reporter)
+    return shard_result, len(groups), disqualified, sample_rejections
+
+def process_companies(input_file, output_file, group_size=5, group_key=None, chunksize=None, workers=1,
+                      column_roles_file=None, column_overrides_file=None, metrics_file=None,
+                      verbosity='rows', decision_log_file=None):
+    """
+    Main function to process companies with robust website detection
+    Companies are blocks of group_size consecutive rows, or rows sharing the group_key column
+    With chunksize set, the input is streamed in chunks of that many rows and selected rows are
+    appended to the output as they are produced (memory stays flat); groups that straddle a chunk
+    boundary are carried over to the next chunk. The number of selected rows written is returned
+    instead of a DataFrame
+    With workers > 1, every chunk is split into shards of whole companies selected in parallel by
+    a pool of that many processes (see ShardPool); the output is the same as with one. With
+    group_key, a frame in which some company's rows are not contiguous is selected in one process
+    column_roles_file caches the detected website columns per input schema, and column_overrides_file
+    pins them by hand (see ColumnRoleCache)
+    With metrics_file set, the wall and CPU time of every stage and scoring function and the rows
+    in and out are written there as a JSON report at the end (see RunMetrics)
+    verbosity 'rows' prints the decision of every company, 'progress' a progress line every few
+    seconds instead and 'quiet' neither; with decision_log_file set, every decision is also saved
+    there as a JSON line (see ProgressReporter)
+    """
+    print("Starting Phase 1a: ROBUST Company Selection")
+    print("=" * 70)
+    metrics = RunMetrics() if metrics_file else None
+    reporter = open_progress_reporter('1a', verbosity, decision_log_file)
+
+    # Load the data
+    with stage_timer(metrics, 'read'):
+        if chunksize:
+            reader = open_table_reader(input_file, chunksize)
+            chunk_iter = iter(reader)
+            first_chunk = next(chunk_iter, pd.DataFrame(columns=reader.columns))
+            chunks = chain([first_chunk], timed_chunks(metrics, chunk_iter))
+            total_rows = reader.total_rows
+            print(f"Streaming {total_rows} rows from input file in chunks of {chunksize} rows")
+        else:
+            first_chunk = read_table(input_file)
+            chunks = [first_chunk]
+            total_rows = len(first_chunk)
+            print(f"Loaded {total_rows} rows from input file")
+    reporter.total_rows = total_rows
+
+    # Detect website columns
+    with stage_timer(metrics, 'detect_columns'):
+        website_columns = find_website_columns(first_chunk, open_column_role_cache(column_roles_file, column_overrides_file))
 
     if not website_columns:
         print("❌ No columns with website information found. Cannot proceed with selection.")
+        close_progress_reporter(reporter)
         return None
 
     # Verify structure
-    total_rows = len(df)
     print(f"\nTotal data rows: {total_rows}")
 
-    if total_rows % 5 != 0:
-        print(f"⚠️  Warning: Row count ({total_rows}) not divisible by 5")
-        print(f"   Expected format: multiples of 5 company rows")
-
-    total_companies = total_rows // 5
-    print(f"Processing {total_companies} companies (5 rows per company)")
+    if group_key is not None:
+        print(f"Processing companies grouped by column '{group_key}'")
+    else:
+        if total_rows % group_size != 0:
+            print(f"⚠️  Warning: Row count ({total_rows}) not divisible by {group_size}")
+            print(f"   Expected format: multiples of {group_size} company rows")
+        print(f"Processing {total_rows // group_size} companies ({group_size} rows per company)")
 
-    selected_companies = []
+    total_companies = 0
+    selected_count = 0
     disqualified_companies = 0
     sample_rejections = []
-
-    # Process companies in blocks of 5 rows
-    for i in range(0, total_rows, 5):
-        if i + 5 > total_rows:
-            print(f"⚠️  Incomplete company block starting at row {i+2}, skipping")
-            continue
-
-        # Extract the 5 rows for this company
-        company_block = df.iloc[i:i+5]
-
-        # Get company name for reporting
-        company_name = "Unknown"
-        name_columns = ['company_name', 'input_company_name', 'name', 'business_name']
-        for col in name_columns:
-            if col in company_block.columns and pd.notna(company_block.iloc[0][col]):
-                name_val = str(company_block.iloc[0][col]).strip()
-                if name_val != "":
-                    company_name = name_val
-                    break
-
-        # Select the best row
-        best_row = select_best_row_from_group(company_block, website_columns)
-
-        if best_row is not None:
-            selected_companies.append(best_row)
-            website_info = f"{best_row['detected_website_column']}: {best_row['detected_website_value'][:50]}"
-            print(f"✅ SELECTED: {company_name} (Score: {best_row['selection_score']}, {website_info})")
+    score_counts = Counter()
+    selected_frames = []
+    output_writer = open_table_appender(output_file)
+    pool = None
+    if workers > 1:
+        pool = ShardPool(select_shard, {'website_columns': website_columns, 'group_size': group_size,
+                                        'group_key': group_key}, workers, metrics, reporter)
+    score_rows = timed(metrics, calculate_row_scores)
+    select_rows = timed(metrics, select_best_rows)
+    report_selection = timed(metrics, report_company_selection)
+
+    def select_from(frame):
+        nonlocal total_companies, selected_count, disqualified_companies
+
+        with stage_timer(metrics, 'select'):
+            if pool is not None and len(frame):
+                shard_results = []
+                for shard_result, shard_companies, shard_disqualified, shard_rejections in pool.map(frame, group_size, group_key):
+                    shard_results.append(shard_result)
+                    total_companies += shard_companies
+                    disqualified_companies += shard_disqualified
+                    sample_rejections.extend(shard_rejections[:10 - len(sample_rejections)])
+                frame_result = pd.concat(shard_results)
+            else:
+                # Score every row and pick the best row of every company in one columnar pass
+                row_scores = score_rows(frame)
+                frame_result, groups = select_rows(frame, website_columns, row_scores, group_size, group_key)
+                disqualified_companies += report_selection(frame, frame_result, groups, sample_rejections, reporter)
+                total_companies += len(groups)
+                reporter.advance(len(frame))
+        if metrics is not None:
+            metrics.add_rows('select', len(frame), len(frame_result))
+
+        selected_count += len(frame_result)
+        score_counts.update(frame_result['selection_score'].value_counts().to_dict())
+
+        if chunksize:
+            # Streaming: write this chunk's selections and let them go
+            with stage_timer(metrics, 'write'):
+                output_writer.append(frame_result)
         else:
-            disqualified_companies += 1
-            if len(sample_rejections) < 10:  # Only collect first 10 rejections for analysis
-                sample_rejections.append(company_name)
-            print(f"❌ DISQUALIFIED: {company_name} (No website data found)")
-
-    # Create output dataframe
-    if selected_companies:
-        result_df = pd.DataFrame(selected_companies)
+            selected_frames.append(frame_result)
+
+    pending = first_chunk.iloc[0:0]
+    for chunk in chunks:
+        if chunksize:
+            if len(pending):
+                chunk = pd.concat([pending, chunk])
+            chunk, pending = split_complete_groups(chunk, group_size, group_key)
+        select_from(chunk)
+
+    # The last company of a key-grouped stream is complete once the input ends
+    if group_key is not None and len(pending):
+        select_from(pending)
+    if pool is not None:
+        pool.close()
+    output_writer.close()
+    close_progress_reporter(reporter)
+
+    run_info = {'phase': '1a', 'input_file': input_file, 'output_file': output_file, 'rows': total_rows,
+                'companies': total_companies, 'chunksize': chunksize, 'workers': workers}
+
+    if group_key is None and total_rows % group_size != 0:
+        incomplete_start = (total_rows // group_size) * group_size
+        print(f"⚠️  Incomplete company block starting at row {incomplete_start+2}, skipping")
+
+    # Save the output dataframe
+    if selected_count:
+        if chunksize:
+            result = selected_count
+        else:
+            result = pd.concat(selected_frames)
 
-        # Save the result
-        result_df.to_csv(output_file, index=False)
+            # Save the result
+            with stage_timer(metrics, 'write'):
+                write_table(result, output_file)
 
         print("\n" + "=" * 70)
         print("PHASE 1a COMPLETE")
         print("=" * 70)
         print(f"Total companies processed: {total_companies}")
-        print(f"Companies SELECTED: {len(selected_companies)}")
+        print(f"Companies SELECTED: {selected_count}")
         print(f"Companies DISQUALIFIED: {disqualified_companies}")
-        print(f"Selection rate: {len(selected_companies)/total_companies:.1%}")
+        print(f"Selection rate: {selected_count/total_companies:.1%}")
         print(f"\nOutput saved to: {output_file}")
 
         # Show summary statistics
-        if not result_df.empty:
-            print(f"\nScoring distribution:")
-            score_counts = result_df['selection_score'].value_counts().sort_index()
-            for score, count in score_counts.items():
-                print(f"  • Score {score}: {count} companies")
-
-            # Show sample of rejected companies for debugging
-            if sample_rejections:
-                print(f"\nSample of rejected companies (first 10):")
-                for company in sample_rejections:
-                    print(f"  • {company}")
-
-        return result_df
+        print(f"\nScoring distribution:")
+        for score in sorted(score_counts):
+            print(f"  • Score {score}: {score_counts[score]} companies")
+
+        # Show sample of rejected companies for debugging
+        if sample_rejections:
+            print(f"\nSample of rejected companies (first 10):")
+            for company in sample_rejections:
+                print(f"  • {company}")
+        save_metrics(metrics, metrics_file, run_info)
+
+        return result
     else:
         print("❌ NO COMPANIES MET THE SELECTION CRITERIA!")
         print("This is unusual - even major companies like Cloudera, Google, Cisco should have been selected.")
         print("Please check if the data contains website information in unexpected formats or columns.")
+        save_metrics(metrics, metrics_file, run_info)
         return None
 
 if __name__ == "__main__":
     # Configuration
     INPUT_FILE = "presales_data_sample.csv"
     OUTPUT_FILE = "phase1_selected_rows.csv"
+    GROUP_SIZE = 5     # Rows per company block
+    GROUP_KEY = None   # Or the name of a column identifying each row's company
+    CHUNKSIZE = None   # Set to e.g. 50_000 to stream large inputs in chunks
+    WORKERS = 1        # Processes selecting shards of companies in parallel (e.g. os.cpu_count())
+    COLUMN_ROLES_FILE = "column_roles_cache.json"  # Detected columns per input schema, or None to detect every run
+    COLUMN_OVERRIDES_FILE = None  # Or a JSON file pinning columns, e.g. {"website": ["homepage"]}
+    METRICS_FILE = "phase1_selected_rows_metrics.json"  # JSON timing report of the run, or None
+    VERBOSITY = 'progress'  # 'rows' prints every company's decision, 'quiet' only the summary
+    DECISION_LOG_FILE = "phase1_selected_rows_decisions.jsonl"  # Every company's decision as JSON lines, or None
 
     # Verify input file exists
     if not os.path.exists(INPUT_FILE):
@@ -292,4 +671,6 @@ if __name__ == "__main__":
         print("Please ensure the file is in the current directory or provide the correct path.")
     else:
         # Run the processing
-        result = process_companies(INPUT_FILE, OUTPUT_FILE)
+        result = process_companies(INPUT_FILE, OUTPUT_FILE, group_size=GROUP_SIZE, group_key=GROUP_KEY, chunksize=CHUNKSIZE, workers=WORKERS,
+                                    column_roles_file=COLUMN_ROLES_FILE, column_overrides_file=COLUMN_OVERRIDES_FILE,
+                                    metrics_file=METRICS_FILE, verbosity=VERBOSITY, decision_log_file=DECISION_LOG_FILE)
@@ -4,11 +4,24 @@ import requests
 from urllib.parse import urlparse, urljoin
 import time
 import os
+import asyncio
 import re
 from datetime import datetime
+from collections import Counter
 import logging
 import warnings
 
+from checkpoint_journal import CheckpointJournal
+from dns_cache import CachingResolver, hosts_file_lookup
+from http_session import PooledSession
+from politeness import DomainScheduler
+from progress import ProgressReporter, close_progress_reporter, open_progress_reporter
+from rate_limiter import TokenBucket
+from run_metrics import RunMetrics, save_metrics, stage_timer, timed, timed_chunks
+from table_io import open_table_appender, open_table_reader, read_table, write_table
+from timeout_policy import DeadlineExceeded, TimeoutPolicy
+from website_cache import WebsiteCheckCache, classify_check_error
+
 # Suppress urllib3 warning about LibreSSL compatibility
 warnings.filterwarnings("ignore", category=UserWarning, message="urllib3 v2 only supports OpenSSL 1.1.1+")
 
@@ -16,10 +29,34 @@ warnings.filterwarnings("ignore", category=UserWarning, message="urllib3 v2 only
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ways check_websites_concurrently can run the checks
+CHECK_MODES = ('asyncio', 'threads')
+# Result of a check whose host does not resolve
+DNS_FAILURE = (False, None, "DNS resolution failed")
+# What rows must share to share one website probe: the same page ('url') or the same host ('site')
+PROBE_KEYS = ('url', 'site')
+
+# Columns written for selected companies, in output order
+OUTPUT_COLUMNS = [
+    'company_name', 'main_country', 'main_city', 'main_street',
+    'website_url', 'website_url_normalized', 'primary_phone', 'primary_email',
+    'naics_2022_primary_code', 'naics_2022_primary_label',
+    'short_description', 'business_tags',
+    'revenue', 'employee_count', 'year_founded',
+    'selection_status', 'website_status', 'last_updated_at'
+]
+
 def is_valid_url(url):
     """Check if a URL is valid and properly formatted"""
+    return clean_website_url(url) is not None
+
+def clean_website_url(url):
+    """
+    Clean up a website URL (fix 'https//', add a missing protocol) and validate it
+    Returns the cleaned URL, or None if it is not a valid, properly formatted URL
+    """
     if not isinstance(url, str) or url.strip() == "" or url.lower() in ["not available", "n/a", "none", "not applicable"]:
-        return False
+        return None
 
     url = url.strip()
 
@@ -38,22 +75,100 @@ def is_valid_url(url):
     try:
         parsed = urlparse(url)
         if not parsed.netloc or len(parsed.netloc) < 3:  # Must have a valid domain
-            return False
+            return None
 
         # Check for obviously invalid patterns
         invalid_patterns = ['example.com', 'test.com', 'demo.com', 'placeholder', 'notavailable']
         if any(pattern in parsed.netloc.lower() for pattern in invalid_patterns):
-            return False
+            return None
 
-        return True
+        return url
     except:
-        return False
+        return None
 
-def check_website_accessibility(url, timeout=10):
+def canonical_probe_key(url, by_site=False):
+    """
+    Key under which a cleaned URL is probed: URLs with the same key get a single probe
+    Scheme, letter case of the host, a 'www.' prefix, default ports, fragments and trailing slashes
+    do not change the key; with by_site the path and query are ignored too (one probe per site)
+    """
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().rsplit('@', 1)[-1]
+    for default_port in (':80', ':443'):
+        if host.endswith(default_port):
+            host = host[:-len(default_port)]
+    if host.startswith('www.'):
+        host = host[4:]
+
+    if by_site:
+        return host
+    key = host + parsed.path.rstrip('/')
+    if parsed.query:
+        key += '?' + parsed.query
+    return key
+
+def check_website_accessibility(url, timeout=10, cache=None, session=None, rate_limiter=None, timeout_policy=None,
+                                resolver=None, metrics=None):
     """
     Check if a website is accessible and returns a successful response
+    If a WebsiteCheckCache is given it is consulted before any network I/O
+    session is an optional requests.Session (e.g. a PooledSession) the requests are sent through
+    rate_limiter is an optional TokenBucket every network check takes a token from (cache hits are free)
+    timeout_policy is an optional TimeoutPolicy used instead of the fixed timeout
+    resolver is an optional CachingResolver: hosts that do not resolve are rejected before any token
+    or HTTP request (unless the request goes through a proxy, which resolves the host itself)
+    With a RunMetrics, every network probe's latency goes to the 'http_probe' histogram (and each of
+    its requests' to 'http_request'), and its outcome is counted by error class
+    Returns: (is_accessible, status_code, error_message)
+    """
+    if cache is not None:
+        cached_result = cache.get(url)
+        if cached_result is not None:
+            return cached_result
+
+    if resolver is not None and not uses_proxy(url) and not resolver.resolves(get_dns_host(url)):
+        result = DNS_FAILURE
+    else:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        started = time.perf_counter()
+        result = probe_website(url, timeout, session, timeout_policy, metrics)
+        if metrics is not None:
+            metrics.observe('http_probe', time.perf_counter() - started)
+            metrics.count(f"probe_{'ok' if result[0] else classify_check_error(result[2])}")
+
+    if cache is not None:
+        cache.put(url, result)
+    return result
+
+def probe_website(url, timeout=10, session=None, timeout_policy=None, metrics=None):
+    """
+    Probe a website over the network (HEAD, then GET, then GET without SSL verification)
+    Requests go through session when one is given, so its open connections are reused
+    With a TimeoutPolicy, each attempt takes its timeouts from the policy (which also enforces the
+    probe's deadline) and reports its latency back to it
+    With a RunMetrics, the latency of every request attempt goes to its 'http_request' histogram
     Returns: (is_accessible, status_code, error_message)
     """
+    http = session if session is not None else requests
+    started = time.monotonic()
+
+    def request(method, **kwargs):
+        attempt_timeout = timeout if timeout_policy is None else timeout_policy.attempt_timeouts(started)
+        attempt_started = time.perf_counter()
+        try:
+            response = method(url, headers=headers, timeout=attempt_timeout, allow_redirects=True, **kwargs)
+        except requests.exceptions.Timeout as e:
+            if timeout_policy is not None:
+                timeout_policy.attempt_timed_out(attempt_timeout, isinstance(e, requests.exceptions.ConnectTimeout))
+            raise
+        finally:
+            if metrics is not None:
+                metrics.observe('http_request', time.perf_counter() - attempt_started)
+        if timeout_policy is not None:
+            timeout_policy.observe_response(response.elapsed.total_seconds())
+        return response
+
     try:
         # Clean and normalize the URL
         if not url.startswith(('http://', 'https://')):
@@ -69,14 +184,14 @@ def check_website_accessibility(url, timeout=10):
 
         # Try HEAD request first
         try:
-            head_response = requests.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+            head_response = request(http.head)
             if head_response.status_code in [200, 301, 302, 307, 308]:
                 return True, head_response.status_code, None
         except requests.exceptions.RequestException:
             pass  # Fall back to GET request if HEAD fails
 
         # Try GET request if HEAD failed
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        response = request(http.get)
 
         # Consider status codes 200-399 as successful
         if 200 <= response.status_code < 400:
@@ -84,6 +199,8 @@ def check_website_accessibility(url, timeout=10):
         else:
             return False, response.status_code, f"Status code: {response.status_code}"
 
+    except DeadlineExceeded:
+        return False, None, "Probe deadline exceeded"
     except requests.exceptions.Timeout:
         return False, None, "Request timed out"
     except requests.exceptions.ConnectionError:
@@ -91,7 +208,7 @@ def check_website_accessibility(url, timeout=10):
     except requests.exceptions.SSLError:
         # Try with verify=False as a fallback for SSL issues
         try:
-            response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True, verify=False)
+            response = request(http.get, verify=False)
             if 200 <= response.status_code < 400:
                 return True, response.status_code, "SSL verification bypassed"
             return False, response.status_code, f"SSL error, status: {response.status_code}"
@@ -102,51 +219,290 @@ def check_website_accessibility(url, timeout=10):
     except Exception as e:
         return False, None, f"Unexpected error: {str(e)}"
 
-def process_supplier_data_pragmatic(input_file, output_file, rejected_file=None):
+def get_url_host(url):
+    """Return the lower-cased host (including any port) a URL points to, without 'www.'"""
+    url = str(url).strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    try:
+        host = urlparse(url).netloc.lower()
+    except ValueError:
+        host = url.lower()
+
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+def get_dns_host(url):
+    """Return the host name a URL's connection would look up (no port, 'www.' kept)"""
+    url = str(url).strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    try:
+        return urlparse(url).hostname or ''
+    except ValueError:
+        return ''
+
+def uses_proxy(url):
+    """True if requests would send url through a proxy from the environment (HTTP(S)_PROXY)"""
+    url = str(url).strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    try:
+        return bool(requests.utils.get_environ_proxies(url))
+    except ValueError:
+        return False
+
+def check_websites_concurrently(urls, concurrency=20, per_host_concurrency=2, timeout=10, cache=None,
+                                session=None, on_result=None, mode='asyncio', rate_limiter=None, scheduler=None,
+                                timeout_policy=None, resolver=None, metrics=None):
     """
-    Main function with pragmatic filtering criteria focusing on website validation
-    Processes each row individually instead of in blocks of 5
+    Check a list of websites concurrently
+    mode 'asyncio' drives the checks from an event loop; mode 'threads' runs them on a plain
+    concurrent.futures thread pool of `concurrency` workers, for environments without asyncio
+    (and is used whatever the mode when called from a running event loop)
+    Checks are started by a DomainScheduler: at most `concurrency` run at once, at most
+    `per_host_concurrency` against the same registered domain, domains take turns, and a scheduler
+    shared by several calls also spaces each domain's checks by its min_interval
+    Returns a list of (is_accessible, status_code, error_message) in the same order as urls
+    on_result(position, result) is called as each check finishes (in completion order)
+    cache is an optional WebsiteCheckCache shared by all checks; cached results are returned
+    straight away, without waiting for a turn of their domain
+    session is an optional requests.Session shared by all checks (see PooledSession)
+    rate_limiter is an optional TokenBucket and timeout_policy an optional TimeoutPolicy shared by all checks
+    With a CachingResolver, the hosts of all uncached URLs are first resolved as one concurrent batch,
+    and URLs whose host does not resolve are rejected without being scheduled or requested (URLs
+    requests would send through a proxy from the environment are left to the proxy)
+    metrics is an optional RunMetrics timing every check_website_accessibility call (see there)
     """
-    print("Starting Phase 1: PRAGMATIC Company Selection")
-    print("=" * 60)
-    print("Selection criteria:")
-    print("1. Company must have a valid website URL")
-    print("2. Website must be accessible and load properly")
-    print("(Processing each row individually, no grouping required)")
-    print("-" * 60)
+    if mode not in CHECK_MODES:
+        raise ValueError(f"mode must be one of {CHECK_MODES}, got {mode!r}")
+    if not urls:
+        return []
+
+    concurrency = max(1, int(concurrency))
+    if scheduler is None:
+        scheduler = DomainScheduler(per_domain_concurrency=per_host_concurrency)
+
+    results = [None] * len(urls)
+
+    def finish(position, result):
+        results[position] = result
+        if on_result is not None:
+            on_result(position, result)
+
+    pending = []
+    for position, url in enumerate(urls):
+        cached_result = cache.get(url) if cache is not None else None
+        if cached_result is not None:
+            finish(position, cached_result)
+            if metrics is not None:
+                metrics.count('probe_cached')
+        else:
+            pending.append((position, get_url_host(url)))
+
+    if resolver is not None and pending:
+        # Proxied requests are resolved by the proxy, so their hosts need not resolve here
+        dns_hosts = {position: get_dns_host(urls[position]) for position, _ in pending
+                     if not uses_proxy(urls[position])}
+        host_resolves = resolver.resolve_many(dns_hosts.values(), concurrency)
+        unresolved = [item for item in pending if item[0] in dns_hosts and not host_resolves[dns_hosts[item[0]]]]
+        pending = [item for item in pending if item[0] not in dns_hosts or host_resolves[dns_hosts[item[0]]]]
+        for position, _ in unresolved:
+            if cache is not None:
+                cache.put(urls[position], DNS_FAILURE)
+            finish(position, DNS_FAILURE)
+        if metrics is not None:
+            metrics.count('probe_dns_rejected', len(unresolved))
+        if timeout_policy is not None:
+            timeout_policy.record_dns_failures(len(unresolved), resolver.mean_lookup_seconds())
+
+    check_website = timed(metrics, check_website_accessibility)
+
+    def check(position):
+        result = check_website(urls[position], timeout, None, session, rate_limiter, timeout_policy, metrics=metrics)
+        if cache is not None:
+            cache.put(urls[position], result)
+        return result
+
+    if mode == 'threads' or event_loop_running():
+        # asyncio.run cannot start a loop inside a running one (a notebook, an async caller)
+        scheduler.run_threads(pending, concurrency, check, finish)
+    else:
+        asyncio.run(scheduler.run_async(pending, concurrency, check, finish))
+    return results
 
-    # Load the data
+def event_loop_running():
+    """True if this thread is already running an asyncio event loop"""
     try:
-        df = pd.read_csv(input_file)
-        print(f"Loaded {len(df)} rows from input file")
-    except Exception as e:
-        print(f"❌ Error loading file: {e}")
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def estimate_remaining_time(progress):
+    """
+    Seconds left for the website checks, from the check rate so far
+    Rows without a URL to check cost nothing, so only checks are timed: the checks still to run are
+    the ones already queued plus the unseen rows times the share of rows that needed a check so far
+    Returns None until the first check has finished
+    """
+    checks_done = progress['checks_done']
+    if not checks_done:
         return None
 
+    elapsed_time = time.time() - progress['start_time']
+    rows_unseen = progress['total_rows'] - progress['rows_seen']
+    check_share = progress['checks_seen'] / progress['rows_seen'] if progress['rows_seen'] else 0.0
+    checks_left = progress['checks_seen'] - checks_done + rows_unseen * check_share
+    return elapsed_time / checks_done * checks_left
+
+def new_check_progress(total_rows):
+    """Progress counters for check_company_websites (see estimate_remaining_time and dedup_report)"""
+    return {'rows_done': 0, 'rows_seen': 0, 'urls_seen': 0, 'checks_seen': 0, 'checks_done': 0,
+            'total_rows': total_rows, 'start_time': time.time()}
+
+def dedup_report(urls_seen, probes):
+    """One-line summary of how many website probes URL deduplication saved"""
+    saved = 1.0 - probes / urls_seen if urls_seen else 0.0
+    return (f"URL dedup: {urls_seen} rows with a URL → {probes} unique probe keys "
+            f"(dedup ratio {urls_seen / probes if probes else 1.0:.2f}x, {saved:.1%} of probes saved)")
+
+def print_check_reports(urls_seen, probes, session, scheduler, timeout_policy, concurrency=1, cache=None,
+                        resolver=None, rate_limiter=None, journal=None, run_seconds=0.0):
+    """
+    Print the end-of-run reports of the website checks: cache hit rate, URL dedup, connection reuse,
+    politeness scheduler, timeouts (when adaptive or with a deadline), DNS, rate limit and journal
+    The optional parts are skipped when None; run_seconds is the run time the journal's share is of
+    """
+    if cache is not None:
+        print(f"Website cache hit rate: {cache.hit_rate():.1%} ({cache.hits} hits, {cache.misses} misses)")
+    print(dedup_report(urls_seen, probes))
+    print(session.report())
+    print(scheduler.report())
+    if timeout_policy.enabled():
+        print(timeout_policy.report(concurrency))
+    if resolver is not None:
+        print(resolver.report())
+    if rate_limiter is not None:
+        print(rate_limiter.report())
+    if journal is not None:
+        print(journal.report(run_seconds))
+
+def report_website_decision(reporter, row_number, company_name, result):
+    """Report one row's website check result to a ProgressReporter"""
+    is_accessible, status_code, error_msg = result
+    if is_accessible:
+        reporter.decide(f"✅ SELECTED: {company_name} - Website accessible",
+                        {'row': row_number, 'company': company_name, 'decision': 'selected',
+                         'status_code': status_code})
+    else:
+        reporter.decide(f"❌ REJECTED: {company_name} - {error_msg}",
+                        {'row': row_number, 'company': company_name, 'decision': 'rejected',
+                         'status_code': status_code, 'reason': error_msg})
+
+def check_company_websites(df, concurrency=20, per_host_concurrency=2, timeout=10, cache=None, session=None,
+                           progress=None, mode='asyncio', rate_limiter=None, scheduler=None,
+                           probe_key='url', probe_results=None, timeout_policy=None, resolver=None,
+                           journal=None, metrics=None, reporter=None):
+    """
+    Run the website selection for one frame of companies
+    Returns (selected rows as a DataFrame with OUTPUT_COLUMNS, rejected records) in input row order
+    Every valid URL is cleaned and reduced to a canonical probe key (see canonical_probe_key; with
+    probe_key 'site' rows of the same host share a key), and each unique key is probed once, using
+    the URL of its first row; the result is fanned back out to every row with that key
+    probe_results is an optional dict of key -> result shared by the frames of one run, so a key
+    probed in an earlier frame is not probed again; journal is an optional CheckpointJournal every
+    new probe result is appended to as it completes
+    progress is an optional dict from new_check_progress shared by the frames of one run, updated as rows finish
+    mode, rate_limiter, scheduler, timeout_policy, resolver and metrics are passed to check_websites_concurrently
+    Every row's decision goes to reporter, a ProgressReporter (without one, the lines are printed);
+    the every-10-checks progress lines are printed at its 'rows' verbosity only
+    """
+    if probe_key not in PROBE_KEYS:
+        raise ValueError(f"probe_key must be one of {PROBE_KEYS}, got {probe_key!r}")
+    if progress is None:
+        progress = new_check_progress(len(df))
+    if reporter is None:
+        reporter = ProgressReporter('1b')
+    if probe_results is None:
+        probe_results = {}
+
     selected_companies = []
     rejected_companies = []
-    total_companies = len(df)
-
-    print(f"\nProcessing {total_companies} companies with PRAGMATIC criteria")
-    print("This will take some time as we're checking live websites...")
-    print("-" * 60)
-
-    # Process each row individually
-    start_time = time.time()
 
+    # First pass: find the rows that have a valid website URL to check
+    candidates = []
+    key_rows = {}  # probe key -> (row number, company name) of the rows sharing it, for keys probed in this frame
+    urls_to_check = []
+    keys_to_check = []
     for idx, row in df.iterrows():
         company_name = row.get('company_name', f"Unnamed_{idx}")
-        print(f"Processing company {idx + 1}/{total_companies}: {company_name}")
 
         # Get website URL
         website_url = row.get('website_url', '')
 
-        # Check if website exists and is valid
-        if pd.notna(website_url) and is_valid_url(str(website_url)):
+        # Check if website exists and is valid, and find the probe it shares with other rows
+        normalized_url = None
+        key = None
+        cleaned_url = clean_website_url(str(website_url)) if pd.notna(website_url) else None
+        if cleaned_url is not None:
             normalized_url = str(website_url).strip()
+            key = canonical_probe_key(cleaned_url, by_site=probe_key == 'site')
+            if key not in probe_results:
+                if key not in key_rows:
+                    key_rows[key] = []
+                    urls_to_check.append(cleaned_url)
+                    keys_to_check.append(key)
+                key_rows[key].append((idx + 1, company_name))
+
+        candidates.append((idx, row, company_name, website_url, normalized_url, key))
+
+    # Rows without a valid URL, or whose key was probed in an earlier frame, need no network check
+    rows_to_check = sum(len(rows) for rows in key_rows.values())
+    progress['rows_done'] += len(candidates) - rows_to_check
+    reporter.advance(len(candidates) - rows_to_check)
+    progress['rows_seen'] += len(candidates)
+    progress['urls_seen'] += sum(1 for candidate in candidates if candidate[5] is not None)
+    progress['checks_seen'] += len(urls_to_check)
+    completed_checks = [0]
+
+    def report_check(position, result):
+        if journal is not None:
+            journal.record(keys_to_check[position], result)
+        rows = key_rows[keys_to_check[position]]
+        if reporter.wants_decisions:
+            for row_number, company_name in rows:
+                report_website_decision(reporter, row_number, company_name, result)
+        progress['rows_done'] += len(rows)
+        reporter.advance(len(rows))
+
+        progress['checks_done'] += 1
+        completed_checks[0] += 1
+        if reporter.print_rows and completed_checks[0] % 10 == 0:
+            print(f"Progress: {progress['rows_done']}/{progress['total_rows']} companies processed")
+            print(f"Estimated remaining time: {estimate_remaining_time(progress):.1f} seconds")
+            print("-" * 60)
 
-            # Check if website is accessible
-            is_accessible, status_code, error_msg = check_website_accessibility(normalized_url)
+    # Check if websites are accessible, once per probe key
+    check_results = check_websites_concurrently(
+        urls_to_check, concurrency=concurrency, per_host_concurrency=per_host_concurrency,
+        timeout=timeout, cache=cache, session=session, on_result=report_check,
+        mode=mode, rate_limiter=rate_limiter, scheduler=scheduler, timeout_policy=timeout_policy,
+        resolver=resolver, metrics=metrics
+    )
+    probe_results.update(zip(keys_to_check, check_results))
+
+    # Second pass: build the outputs in the original row order
+    for idx, row, company_name, website_url, normalized_url, key in candidates:
+        if normalized_url is not None:
+            is_accessible, status_code, error_msg = probe_results[key]
+            if key not in key_rows and reporter.wants_decisions:
+                # Decided by the probe of an earlier frame's row with the same key
+                report_website_decision(reporter, idx + 1, company_name, probe_results[key])
 
             if is_accessible:
                 # Create a copy of the row with selection metadata
@@ -155,7 +511,6 @@ def process_supplier_data_pragmatic(input_file, output_file, rejected_file=None)
                 selected_row['website_status'] = f'Accessible (Status: {status_code})'
                 selected_row['website_url_normalized'] = normalized_url
                 selected_companies.append(selected_row)
-                print(f"✅ SELECTED: {company_name} - Website accessible")
             else:
                 rejected_companies.append({
                     'company_name': company_name,
@@ -163,7 +518,6 @@ def process_supplier_data_pragmatic(input_file, output_file, rejected_file=None)
                     'rejection_reason': f"Website not accessible: {error_msg}",
                     'row_number': idx + 1  # 1-indexed for readability
                 })
-                print(f"❌ REJECTED: {company_name} - {error_msg}")
         else:
             rejected_companies.append({
                 'company_name': company_name,
@@ -171,50 +525,194 @@ def process_supplier_data_pragmatic(input_file, output_file, rejected_file=None)
                 'rejection_reason': "No valid website URL",
                 'row_number': idx + 1
             })
-            print(f"❌ REJECTED: {company_name} - No valid website URL")
+            if reporter.wants_decisions:
+                reporter.decide(f"❌ REJECTED: {company_name} - No valid website URL",
+                                {'row': idx + 1, 'company': company_name, 'decision': 'rejected',
+                                 'reason': "No valid website URL"})
+
+    selected_df = pd.DataFrame(selected_companies)
+
+    # Clean up and organize columns: ensure all columns exist and reorder
+    for col in OUTPUT_COLUMNS:
+        if col not in selected_df.columns:
+            selected_df[col] = np.nan
+
+    return selected_df[OUTPUT_COLUMNS], rejected_companies
+
+def process_supplier_data_pragmatic(input_file, output_file, rejected_file=None,
+                                    concurrency=20, per_host_concurrency=2, timeout=10,
+                                    cache_file=None, cache_ttl=24 * 3600,
+                                    cache_positive_ttl=None, cache_negative_ttl=None,
+                                    chunksize=None, pool_size=None, host_pool_sizes=None,
+                                    mode='asyncio', rate_limit=None, rate_burst=None, domain_min_interval=0.0,
+                                    probe_key='url', connect_timeout=None, adaptive_timeouts=False,
+                                    row_deadline=None, resolve_first=False, dns_hosts_file=None,
+                                    checkpoint_file=None, metrics_file=None, verbosity='rows', decision_log_file=None):
+    """
+    Main function with pragmatic filtering criteria focusing on website validation
+    Processes each row individually instead of in blocks of 5
+    Websites are checked concurrently (see check_websites_concurrently); outputs keep the input row order
+    If cache_file is given, check results are reused from (and saved to) a persistent WebsiteCheckCache
+    All checks share one PooledSession, so connections are kept alive and reused across hosts' checks
+    and worker threads; pool_size (default per_host_concurrency) is the number of open connections
+    kept per host, host_pool_sizes overrides it for given hosts
+    mode 'threads' runs the checks on a concurrent.futures pool of `concurrency` worker threads
+    instead of asyncio; rate_limit caps network checks per second for the whole run with a shared
+    token bucket that allows bursts of rate_burst checks
+    Checks are spread over registered domains by one DomainScheduler for the run: at most
+    per_host_concurrency in flight per domain, and starts at least domain_min_interval seconds apart
+    Rows whose URLs reduce to the same canonical probe key share one probe for the whole run
+    (probe_key 'url': same page, 'site': same host); the report shows the dedup ratio
+    Dead hosts can fail fast (see TimeoutPolicy): connect_timeout sets a separate connect timeout,
+    adaptive_timeouts tunes both timeouts from the latencies seen so far (timeout stays the ceiling),
+    row_deadline caps the seconds one probe may take over all its attempts, and the report estimates
+    the time saved. With resolve_first, every batch's hosts are resolved first through one
+    CachingResolver for the run (record TTLs, NXDOMAIN cached as well), and hosts that do not
+    resolve are rejected before any HTTP request; dns_hosts_file resolves from a hosts-format file
+    instead of DNS
+    With chunksize set, the input is streamed in chunks of that many rows and results are appended
+    to the output files as they are produced (memory stays flat); the number of selected
+    companies written is returned instead of a DataFrame
+    With checkpoint_file set, probe results are journaled as they complete (see CheckpointJournal):
+    a run that was interrupted is resumed by running it again, only the probes not journaled yet
+    are run, and the outputs come out the same as those of an uninterrupted run
+    With metrics_file set, the wall and CPU time of every stage and website check, the rows in and
+    out, probe outcomes and HTTP latency histograms are written there as a JSON report at the end
+    (see RunMetrics)
+    verbosity 'rows' prints the decision of every row, 'progress' a progress line every few seconds
+    instead and 'quiet' neither; with decision_log_file set, every decision is also saved there as a
+    JSON line (see ProgressReporter)
+    """
+    print("Starting Phase 1: PRAGMATIC Company Selection")
+    print("=" * 60)
+    print("Selection criteria:")
+    print("1. Company must have a valid website URL")
+    print("2. Website must be accessible and load properly")
+    print("(Processing each row individually, no grouping required)")
+    print("-" * 60)
+    metrics = RunMetrics() if metrics_file else None
+    # Website checks finish one at a time, so the progress line may be due after any of them
+    reporter = open_progress_reporter('1b', verbosity, decision_log_file, check_rows=1)
 
-        # Rate limiting - be respectful to servers
-        if (idx + 1) % 10 == 0:
-            elapsed_time = time.time() - start_time
-            avg_time_per_company = elapsed_time / (idx + 1)
-            remaining_companies = total_companies - (idx + 1)
-            estimated_remaining_time = avg_time_per_company * remaining_companies
+    # Load the data
+    try:
+        with stage_timer(metrics, 'read'):
+            if chunksize:
+                reader = open_table_reader(input_file, chunksize, columns=OUTPUT_COLUMNS)
+                chunks = timed_chunks(metrics, reader)
+                total_companies = reader.total_rows
+                print(f"Streaming {total_companies} rows from input file in chunks of {chunksize} rows")
+            else:
+                df = read_table(input_file, columns=OUTPUT_COLUMNS)
+                chunks = [df]
+                total_companies = len(df)
+                print(f"Loaded {len(df)} rows from input file")
+    except Exception as e:
+        print(f"❌ Error loading file: {e}")
+        close_progress_reporter(reporter)
+        return None
+    reporter.total_rows = total_companies
 
-            print(f"Progress: {idx + 1}/{total_companies} companies processed")
-            print(f"Estimated remaining time: {estimated_remaining_time:.1f} seconds")
-            print("-" * 60)
+    selected_frames = []
+    rejected_companies = []
+    selected_count = 0
+    rejected_count = 0
+    country_counts = Counter()
+    industry_counts = Counter()
 
-            # Brief pause every 10 companies to avoid overwhelming servers
-            time.sleep(1)
+    output_writer = open_table_appender(output_file)
+    rejected_writer = open_table_appender(rejected_file) if rejected_file else None
+
+    print(f"\nProcessing {total_companies} companies with PRAGMATIC criteria")
+    print(f"Checking live websites ({concurrency} concurrent, {per_host_concurrency} per domain, {mode})...")
+    print("-" * 60)
+
+    # Process each row individually
+    start_time = time.time()
+    progress = new_check_progress(total_companies)
+    progress['start_time'] = start_time
+    rate_limiter = TokenBucket(rate_limit, rate_burst) if rate_limit else None
+    scheduler = DomainScheduler(per_domain_concurrency=per_host_concurrency, min_interval=domain_min_interval)
+    probe_results = {}
+    journal = None
+    if checkpoint_file:
+        journal = CheckpointJournal(checkpoint_file, CheckpointJournal.describe_input(input_file, probe_key))
+        probe_results = journal.load()
+        if journal.restored:
+            print(f"Resuming from {checkpoint_file}: {journal.restored} probe results already done")
+    timeout_policy = TimeoutPolicy(timeout, connect_timeout, adaptive=adaptive_timeouts,
+                                   deadline=row_deadline)
+    resolver = None
+    if resolve_first:
+        resolver = CachingResolver(hosts_file_lookup(dns_hosts_file) if dns_hosts_file else None)
+
+    cache = None
+    if cache_file:
+        cache = WebsiteCheckCache(cache_file, ttl=cache_ttl,
+                                  positive_ttl=cache_positive_ttl, negative_ttl=cache_negative_ttl)
+    session = PooledSession(pool_size=pool_size or per_host_concurrency, host_pool_sizes=host_pool_sizes,
+                            connect_observer=timeout_policy.observe_connect)
+    try:
+        for chunk in chunks:
+            with stage_timer(metrics, 'check'):
+                chunk_selected, chunk_rejected = check_company_websites(
+                    chunk, concurrency=concurrency, per_host_concurrency=per_host_concurrency,
+                    timeout=timeout, cache=cache, session=session, progress=progress,
+                    mode=mode, rate_limiter=rate_limiter, scheduler=scheduler,
+                    probe_key=probe_key, probe_results=probe_results, timeout_policy=timeout_policy,
+                    resolver=resolver, journal=journal, metrics=metrics, reporter=reporter
+                )
+            if metrics is not None:
+                metrics.add_rows('check', len(chunk), len(chunk_selected))
+            if journal is not None:
+                journal.checkpoint()
+            selected_count += len(chunk_selected)
+            rejected_count += len(chunk_rejected)
+            country_counts.update(chunk_selected['main_country'].value_counts().to_dict())
+            industry_counts.update(chunk_selected['naics_2022_primary_label'].value_counts().to_dict())
+
+            if chunksize:
+                # Streaming: write this chunk's results and let them go
+                with stage_timer(metrics, 'write'):
+                    output_writer.append(chunk_selected)
+                    if rejected_writer is not None:
+                        rejected_writer.append(pd.DataFrame(chunk_rejected))
+            else:
+                selected_frames.append(chunk_selected)
+                rejected_companies.extend(chunk_rejected)
+    finally:
+        if cache is not None:
+            cache.close()
+        session.close()
+        output_writer.close()
+        if rejected_writer is not None:
+            rejected_writer.close()
+        if journal is not None:
+            journal.close()
+        close_progress_reporter(reporter)
+
+    run_info = {'phase': '1b', 'input_file': input_file, 'output_file': output_file, 'rows': total_companies,
+                'chunksize': chunksize, 'concurrency': concurrency, 'mode': mode}
 
     # Create output dataframe
-    if selected_companies:
-        result_df = pd.DataFrame(selected_companies)
-
-        # Clean up and organize columns
-        column_order = [
-            'company_name', 'main_country', 'main_city', 'main_street',
-            'website_url', 'website_url_normalized', 'primary_phone', 'primary_email',
-            'naics_2022_primary_code', 'naics_2022_primary_label',
-            'short_description', 'business_tags',
-            'revenue', 'employee_count', 'year_founded',
-            'selection_status', 'website_status', 'last_updated_at'
-        ]
-
-        # Ensure all columns exist and reorder
-        for col in column_order:
-            if col not in result_df.columns:
-                result_df[col] = np.nan
-
-        result_df = result_df[column_order]
-
-        # Save the result
-        result_df.to_csv(output_file, index=False)
-
-        # Save rejected companies if requested
-        if rejected_file and rejected_companies:
-            rejected_df = pd.DataFrame(rejected_companies)
-            rejected_df.to_csv(rejected_file, index=False)
+    if selected_count:
+        if chunksize:
+            result = selected_count
+        else:
+            result = pd.concat(selected_frames)
+
+            with stage_timer(metrics, 'write'):
+                # Save the result
+                write_table(result, output_file)
+
+                # Save rejected companies if requested
+                if rejected_file and rejected_companies:
+                    rejected_df = pd.DataFrame(rejected_companies)
+                    write_table(rejected_df, rejected_file)
+
+        # The outputs are complete, nothing is left to resume
+        if journal is not None:
+            journal.finish()
 
         total_time = time.time() - start_time
         print("\n" + "=" * 60)
@@ -222,39 +720,45 @@ def process_supplier_data_pragmatic(input_file, output_file, rejected_file=None)
         print("=" * 60)
         print(f"Total processing time: {total_time:.1f} seconds")
         print(f"Total companies processed: {total_companies}")
-        print(f"Companies SELECTED: {len(selected_companies)}")
-        print(f"Companies REJECTED: {len(rejected_companies)}")
-        print(f"Selection rate: {len(selected_companies)/total_companies:.1%}")
+        print(f"Companies SELECTED: {selected_count}")
+        print(f"Companies REJECTED: {rejected_count}")
+        print(f"Selection rate: {selected_count/total_companies:.1%}")
+        print_check_reports(progress['urls_seen'], len(probe_results), session, scheduler, timeout_policy,
+                            concurrency, cache, resolver, rate_limiter, journal, time.time() - start_time)
         print(f"\nOutput saved to: {output_file}")
-        if rejected_file and rejected_companies:
+        if rejected_file and rejected_count:
             print(f"Rejected companies saved to: {rejected_file}")
 
-        if selected_companies:
-            print(f"\nSummary of selected companies:")
-            print(f"- Average processing time per company: {total_time/total_companies:.2f} seconds")
+        print(f"\nSummary of selected companies:")
+        print(f"- Average processing time per company: {total_time/total_companies:.2f} seconds")
 
-            if 'main_country' in result_df.columns:
-                top_countries = result_df['main_country'].value_counts().head(5).index.tolist()
-                print(f"- Countries represented: {', '.join(top_countries)}")
+        top_countries = [country for country, _ in country_counts.most_common(5)]
+        print(f"- Countries represented: {', '.join(top_countries)}")
 
-            if 'naics_2022_primary_label' in result_df.columns:
-                print(f"- Top industries (NAICS):")
-                for industry, count in result_df['naics_2022_primary_label'].value_counts().head(3).items():
-                    print(f"  • {industry}: {count} companies")
+        print(f"- Top industries (NAICS):")
+        for industry, count in industry_counts.most_common(3):
+            print(f"  • {industry}: {count} companies")
+        save_metrics(metrics, metrics_file, run_info)
 
-        return result_df
+        return result
     else:
         print("❌ NO COMPANIES MET THE PRAGMATIC SELECTION CRITERIA!")
         print("This could mean:")
         print("1. Many companies don't have website information in the data")
         print("2. Many websites are not accessible (down, blocked, or slow)")
         print("3. The website format in the data needs cleaning")
+        print_check_reports(progress['urls_seen'], len(probe_results), session, scheduler, timeout_policy,
+                            concurrency, cache, resolver, rate_limiter, journal, time.time() - start_time)
 
         # Save all rejections for analysis
-        if rejected_file and rejected_companies:
-            rejected_df = pd.DataFrame(rejected_companies)
-            rejected_df.to_csv(rejected_file, index=False)
+        if rejected_file and rejected_count:
+            if not chunksize:
+                rejected_df = pd.DataFrame(rejected_companies)
+                write_table(rejected_df, rejected_file)
             print(f"All rejections saved to: {rejected_file} for analysis")
+        if journal is not None:
+            journal.finish()
+        save_metrics(metrics, metrics_file, run_info)
 
         return None
 
@@ -263,6 +767,29 @@ if __name__ == "__main__":
     INPUT_FILE = "phase1_selected_rows.csv"
     OUTPUT_FILE = "phase1_pragmatic_selected_rows.csv"
     REJECTED_FILE = "phase1_pragmatic_rejected_rows.csv"
+    CONCURRENCY = 20           # Website checks in flight at once
+    PER_HOST_CONCURRENCY = 2   # Checks in flight against the same registered domain
+    CACHE_FILE = "phase1_website_cache.sqlite"
+    CACHE_POSITIVE_TTL = 7 * 24 * 3600   # Reachable sites are re-checked weekly
+    CACHE_NEGATIVE_TTL = 24 * 3600       # Unreachable sites are re-checked daily
+    CHUNKSIZE = None  # Set to e.g. 50_000 to stream large inputs in chunks
+    POOL_SIZE = None           # Open connections kept per host (default: PER_HOST_CONCURRENCY)
+    HOST_POOL_SIZES = {}       # Larger pools for hosts many suppliers share, e.g. {'sites.google.com': 8}
+    MODE = 'asyncio'           # Or 'threads' where asyncio cannot be used (CONCURRENCY worker threads)
+    RATE_LIMIT = 10            # Website checks per second, shared by all workers (the old pace), or None for no cap
+    RATE_BURST = None          # Checks allowed at once before the cap applies (default: RATE_LIMIT)
+    DOMAIN_MIN_INTERVAL = 0.5  # Seconds between check starts against the same registered domain
+    PROBE_KEY = 'url'          # Or 'site' to probe each host once, whatever page the rows link to
+    TIMEOUT = 10               # Seconds a request attempt may wait for a response (the adaptive ceiling)
+    CONNECT_TIMEOUT = 5        # Seconds a connection may take to open
+    ADAPTIVE_TIMEOUTS = False  # Or True to lower both timeouts to 3x the p95 latency seen so far
+    ROW_DEADLINE = 20          # Seconds one website probe may take over HEAD, GET and the SSL retry
+    RESOLVE_FIRST = False      # Or True to resolve hosts in batches first and reject those that do not resolve
+    DNS_HOSTS_FILE = None      # Or a hosts-format file to resolve from instead of DNS (offline runs)
+    CHECKPOINT_FILE = "phase1_pragmatic_checkpoint.jsonl"  # Rerun after a crash to resume from here
+    METRICS_FILE = "phase1_pragmatic_selected_rows_metrics.json"  # JSON timing report of the run, or None
+    VERBOSITY = 'progress'     # 'rows' prints every row's decision, 'quiet' only the summary
+    DECISION_LOG_FILE = "phase1_pragmatic_decisions.jsonl"  # Every row's decision as JSON lines, or None
 
     # Verify input file exists
     if not os.path.exists(INPUT_FILE):
@@ -270,4 +797,14 @@ if __name__ == "__main__":
         print("Please ensure the file is in the current directory or provide the correct path.")
     else:
         # Run the pragmatic processing
-        result = process_supplier_data_pragmatic(INPUT_FILE, OUTPUT_FILE, REJECTED_FILE)
+        result = process_supplier_data_pragmatic(
+            INPUT_FILE, OUTPUT_FILE, REJECTED_FILE,
+            concurrency=CONCURRENCY, per_host_concurrency=PER_HOST_CONCURRENCY,
+            cache_file=CACHE_FILE, cache_positive_ttl=CACHE_POSITIVE_TTL, cache_negative_ttl=CACHE_NEGATIVE_TTL,
+            chunksize=CHUNKSIZE, pool_size=POOL_SIZE, host_pool_sizes=HOST_POOL_SIZES,
+            mode=MODE, rate_limit=RATE_LIMIT, rate_burst=RATE_BURST, domain_min_interval=DOMAIN_MIN_INTERVAL,
+            probe_key=PROBE_KEY, timeout=TIMEOUT, connect_timeout=CONNECT_TIMEOUT,
+            adaptive_timeouts=ADAPTIVE_TIMEOUTS, row_deadline=ROW_DEADLINE, resolve_first=RESOLVE_FIRST,
+            dns_hosts_file=DNS_HOSTS_FILE, checkpoint_file=CHECKPOINT_FILE, metrics_file=METRICS_FILE,
+            verbosity=VERBOSITY, decision_log_file=DECISION_LOG_FILE
+        )
@@ -3,6 +3,15 @@ import numpy as np
 import os
 import re
 from datetime import datetime
+from collections import Counter
+
+from column_roles import column_roles, open_column_role_cache, role_source_note
+from keyword_matcher import get_keyword_matcher
+from naics_index import get_naics_index
+from progress import ProgressReporter, close_progress_reporter, open_progress_reporter
+from run_metrics import RunMetrics, save_metrics, stage_timer, timed, timed_chunks
+from shard_parallel import ShardPool, merge_counts
+from table_io import derived_table_path, open_table_appender, open_table_reader, read_table, write_table
 
 def detect_manufacturing_columns(df):
     """Detect columns that might contain manufacturing relevance information"""
@@ -95,14 +104,17 @@ def get_manufacturing_keywords():
 
 def check_naics_manufacturing_relevance(row, naics_columns, manufacturing_naics):
     """Check if any NAICS code in the row indicates manufacturing relevance"""
+    # manufacturing_naics may be a list of prefixes or a prebuilt NaicsPrefixIndex
+    naics_index = get_naics_index(manufacturing_naics)
+
     for column in naics_columns:
         if column in row.index and pd.notna(row[column]):
             naics_value = str(row[column]).strip()
             if naics_value != "":
-                # Check if the NAICS code starts with any manufacturing prefix
-                for code in manufacturing_naics:
-                    if naics_value.startswith(code):
-                        return True, code, naics_value
+                # Report the earliest listed manufacturing prefix the code starts with
+                code = naics_index.first_match(naics_value)
+                if code is not None:
+                    return True, code, naics_value
 
     return False, None, None
 
@@ -120,11 +132,8 @@ def check_keyword_manufacturing_relevance(row, description_columns, tag_columns,
         if column in row.index and pd.notna(row[column]) and isinstance(row[column], str):
             combined_text += row[column].lower() + " "
 
-    # Count keyword matches
-    found_keywords = []
-    for keyword in manufacturing_keywords:
-        if keyword in combined_text and keyword not in found_keywords:
-            found_keywords.append(keyword)
+    # Find the distinct keyword matches (manufacturing_keywords may be a list or a compiled KeywordMatcher)
+    found_keywords = get_keyword_matcher(manufacturing_keywords).find_all(combined_text)
 
     # Require at least 2 distinct manufacturing keywords
     if len(found_keywords) >= 2:
@@ -158,7 +167,7 @@ def calculate_manufacturing_score(row, naics_columns, description_columns, tag_c
             break
 
     if company_name:
-        name_keywords = [kw for kw in manufacturing_keywords if kw in company_name]
+        name_keywords = get_keyword_matcher(manufacturing_keywords).find_entries(company_name)
         if name_keywords:
             score += 1
             evidence.append(f"Name contains: {', '.join(name_keywords[:2])}")
@@ -171,36 +180,21 @@ def is_strictly_manufacturing_relevant(score):
     # Score threshold: 2+ points required for manufacturing relevance
     return score >= 2
 
-def filter_manufacturing_companies(input_file, output_file):
-    """Main function to filter companies for manufacturing relevance"""
-    print("Starting Phase 2: STRICT Manufacturing Relevance Filtering")
-    print("=" * 70)
-
-    # Load the Phase 1a results
-    df = pd.read_csv(input_file)
-    print(f"Loaded {len(df)} companies from Phase 1a output")
-
-    # Get manufacturing criteria
-    manufacturing_naics = get_manufacturing_naics_codes()
-    manufacturing_keywords = get_manufacturing_keywords()
-
-    # Detect relevant columns
-    naics_columns, description_columns, tag_columns = detect_manufacturing_columns(df)
-
-    print(f"\nDetected columns:")
-    print(f"NAICS columns: {', '.join(naics_columns) if naics_columns else 'None'}")
-    print(f"Description columns: {', '.join(description_columns) if description_columns else 'None'}")
-    print(f"Tag columns: {', '.join(tag_columns) if tag_columns else 'None'}")
-
-    # Prepare for filtering
+def score_manufacturing_companies(df, naics_columns, description_columns, tag_columns,
+                                  manufacturing_naics, manufacturing_keywords, score_distribution, metrics=None,
+                                  reporter=None):
+    """
+    Score one frame of companies for manufacturing relevance
+    Updates score_distribution in place and returns (manufacturing rows, non-manufacturing records)
+    With a RunMetrics, every calculate_manufacturing_score call is timed
+    Every company's decision goes to reporter, a ProgressReporter (without one, the lines are printed)
+    """
+    if reporter is None:
+        reporter = ProgressReporter('2')
+    score_company = timed(metrics, calculate_manufacturing_score)
     manufacturing_companies = []
     non_manufacturing_companies = []
-    score_distribution = {}
 
-    print(f"\nProcessing {len(df)} companies for manufacturing relevance...")
-    print("-" * 70)
-
-    # Process each company
     for idx, row in df.iterrows():
         # Get company name for reporting
         company_name = "Unknown"
@@ -210,7 +204,7 @@ def filter_manufacturing_companies(input_file, output_file):
                 break
 
         # Calculate manufacturing score
-        score, evidence = calculate_manufacturing_score(
+        score, evidence = score_company(
             row, naics_columns, description_columns, tag_columns,
             manufacturing_naics, manufacturing_keywords
         )
@@ -226,31 +220,184 @@ def filter_manufacturing_companies(input_file, output_file):
             row_copy['manufacturing_score'] = score
             row_copy['manufacturing_evidence'] = '; '.join(evidence) if evidence else 'Score threshold met'
             manufacturing_companies.append(row_copy)
-            print(f"✅ MANUFACTURING: {company_name} (Score: {score}/6)")
+            if reporter.wants_decisions:
+                reporter.decide(f"✅ MANUFACTURING: {company_name} (Score: {score}/6)",
+                                {'row': idx + 1, 'company': company_name, 'decision': 'manufacturing',
+                                 'score': score, 'evidence': row_copy['manufacturing_evidence']})
         else:
-            non_manufacturing_companies.append({
+            non_manufacturing = {
                 'company_name': company_name,
                 'manufacturing_score': score,
                 'reason': 'Insufficient manufacturing relevance evidence' if score < 2 else 'Failed strict criteria',
                 'naics_codes': ', '.join([str(row[col]) for col in naics_columns if col in row.index and pd.notna(row[col])][:2]),
                 'evidence': '; '.join(evidence) if evidence else 'No relevant evidence found'
-            })
-            print(f"❌ NON-MANUFACTURING: {company_name} (Score: {score}/6)")
+            }
+            non_manufacturing_companies.append(non_manufacturing)
+            if reporter.wants_decisions:
+                reporter.decide(f"❌ NON-MANUFACTURING: {company_name} (Score: {score}/6)",
+                                {'row': idx + 1, 'company': company_name, 'decision': 'non_manufacturing',
+                                 'score': score, 'reason': non_manufacturing['reason'],
+                                 'evidence': non_manufacturing['evidence']})
+        reporter.advance()
+
+    return manufacturing_companies, non_manufacturing_companies
+
+def score_manufacturing_shard(shard, naics_columns, description_columns, tag_columns,
+                              manufacturing_naics, manufacturing_keywords, reporter=None):
+    """score_manufacturing_companies for one shard of a ShardPool run, with a score distribution of its own"""
+    score_distribution = {}
+    manufacturing_companies, non_manufacturing_companies = score_manufacturing_companies(
+        shard, naics_columns, description_columns, tag_columns,
+        manufacturing_naics, manufacturing_keywords, score_distribution, reporter=reporter
+    )
+    return manufacturing_companies, non_manufacturing_companies, score_distribution
+
+def filter_manufacturing_companies(input_file, output_file, chunksize=None, workers=1,
+                                   column_roles_file=None, column_overrides_file=None, metrics_file=None,
+                                   verbosity='rows', decision_log_file=None):
+    """
+    Main function to filter companies for manufacturing relevance
+    With chunksize set, the input is streamed in chunks of that many rows and results are appended
+    to the output files as they are produced (memory stays flat); the number of manufacturing
+    companies written is returned instead of a DataFrame. Non-manufacturing rows are streamed to a
+    partial file that only becomes the non-manufacturing file when some company qualified, as in a
+    whole-file run
+    With workers > 1, every chunk is split into shards scored in parallel by a pool of that many
+    processes (see ShardPool); the outputs are the same as with one
+    column_roles_file caches the detected columns per input schema, and column_overrides_file pins
+    them by hand (see ColumnRoleCache)
+    With metrics_file set, the wall and CPU time of every stage and calculate_manufacturing_score
+    call and the rows in and out are written there as a JSON report at the end (see RunMetrics)
+    verbosity 'rows' prints the decision of every company, 'progress' a progress line every few
+    seconds instead and 'quiet' neither; with decision_log_file set, every decision is also saved
+    there as a JSON line (see ProgressReporter)
+    """
+    print("Starting Phase 2: STRICT Manufacturing Relevance Filtering")
+    print("=" * 70)
+    metrics = RunMetrics() if metrics_file else None
+    reporter = open_progress_reporter('2', verbosity, decision_log_file)
+
+    # Load the Phase 1a results
+    with stage_timer(metrics, 'read'):
+        if chunksize:
+            reader = open_table_reader(input_file, chunksize)
+            chunks = timed_chunks(metrics, reader)
+            total_companies = reader.total_rows
+            columns_df = pd.DataFrame(columns=reader.columns)
+            print(f"Streaming {total_companies} companies from Phase 1a output in chunks of {chunksize} rows")
+        else:
+            df = read_table(input_file)
+            chunks = [df]
+            total_companies = len(df)
+            columns_df = df
+            print(f"Loaded {len(df)} companies from Phase 1a output")
+    reporter.total_rows = total_companies
+
+    # Get manufacturing criteria
+    manufacturing_naics = get_naics_index(get_manufacturing_naics_codes())
+    # Compile the keyword list once for every row
+    manufacturing_keywords = get_keyword_matcher(get_manufacturing_keywords())
+
+    # Detect relevant columns
+    with stage_timer(metrics, 'detect_columns'):
+        role_cache = open_column_role_cache(column_roles_file, column_overrides_file)
+        (naics_columns, description_columns, tag_columns), role_source = column_roles(
+            role_cache, 'manufacturing', columns_df, detect_manufacturing_columns
+        )
+
+    print(f"\nDetected columns{role_source_note(role_source)}:")
+    print(f"NAICS columns: {', '.join(naics_columns) if naics_columns else 'None'}")
+    print(f"Description columns: {', '.join(description_columns) if description_columns else 'None'}")
+    print(f"Tag columns: {', '.join(tag_columns) if tag_columns else 'None'}")
+
+    # Prepare for filtering
+    manufacturing_companies = []
+    non_manufacturing_companies = []
+    score_distribution = {}
+    manufacturing_count = 0
+    non_manufacturing_count = 0
+    naics_counts = Counter()
+
+    non_manufacturing_file = derived_table_path(output_file, '_non_manufacturing')
+    non_manufacturing_partial_file = derived_table_path(non_manufacturing_file, '.partial')
+    output_writer = open_table_appender(output_file)
+    non_manufacturing_writer = open_table_appender(non_manufacturing_partial_file)
+
+    print(f"\nProcessing {total_companies} companies for manufacturing relevance...")
+    print("-" * 70)
+
+    # The compiled criteria and detected columns go to each worker process once
+    pool = None
+    if workers > 1:
+        pool = ShardPool(score_manufacturing_shard, {
+            'naics_columns': naics_columns, 'description_columns': description_columns,
+            'tag_columns': tag_columns, 'manufacturing_naics': manufacturing_naics,
+            'manufacturing_keywords': manufacturing_keywords,
+        }, workers, metrics, reporter)
+
+    # Process each company
+    for chunk in chunks:
+        with stage_timer(metrics, 'score'):
+            if pool is None:
+                chunk_manufacturing, chunk_non_manufacturing = score_manufacturing_companies(
+                    chunk, naics_columns, description_columns, tag_columns,
+                    manufacturing_naics, manufacturing_keywords, score_distribution, metrics, reporter
+                )
+            else:
+                chunk_manufacturing, chunk_non_manufacturing = [], []
+                for shard_manufacturing, shard_non_manufacturing, shard_distribution in pool.map(chunk):
+                    chunk_manufacturing.extend(shard_manufacturing)
+                    chunk_non_manufacturing.extend(shard_non_manufacturing)
+                    merge_counts(score_distribution, shard_distribution)
+        if metrics is not None:
+            metrics.add_rows('score', len(chunk), len(chunk_manufacturing))
+        manufacturing_count += len(chunk_manufacturing)
+        non_manufacturing_count += len(chunk_non_manufacturing)
+
+        if naics_columns and chunk_manufacturing:
+            naics_col = naics_columns[0]
+            naics_counts.update(pd.DataFrame(chunk_manufacturing)[naics_col].value_counts().to_dict())
+
+        if chunksize:
+            # Streaming: write this chunk's results and let them go
+            with stage_timer(metrics, 'write'):
+                output_writer.append(pd.DataFrame(chunk_manufacturing))
+                non_manufacturing_writer.append(pd.DataFrame(chunk_non_manufacturing))
+        else:
+            manufacturing_companies.extend(chunk_manufacturing)
+            non_manufacturing_companies.extend(chunk_non_manufacturing)
+    if pool is not None:
+        pool.close()
+    output_writer.close()
+    non_manufacturing_writer.close()
+    close_progress_reporter(reporter)
+    if non_manufacturing_writer.rows_written:
+        if manufacturing_count:
+            os.replace(non_manufacturing_partial_file, non_manufacturing_file)
+        else:
+            os.remove(non_manufacturing_partial_file)
+
+    run_info = {'phase': '2', 'input_file': input_file, 'output_file': output_file, 'rows': total_companies,
+                'chunksize': chunksize, 'workers': workers}
 
     # Create output dataframe
-    if manufacturing_companies:
-        result_df = pd.DataFrame(manufacturing_companies)
+    if manufacturing_count:
+        if chunksize:
+            result = manufacturing_count
+        else:
+            result = pd.DataFrame(manufacturing_companies)
 
-        # Save the result
-        result_df.to_csv(output_file, index=False)
+            # Save the result
+            with stage_timer(metrics, 'write'):
+                write_table(result, output_file)
 
         print("\n" + "=" * 70)
         print("PHASE 2 COMPLETE")
         print("=" * 70)
-        print(f"Total companies processed: {len(df)}")
-        print(f"Manufacturing companies SELECTED: {len(manufacturing_companies)}")
-        print(f"Non-manufacturing companies FILTERED OUT: {len(non_manufacturing_companies)}")
-        print(f"Retention rate: {len(manufacturing_companies)/len(df):.1%}")
+        print(f"Total companies processed: {total_companies}")
+        print(f"Manufacturing companies SELECTED: {manufacturing_count}")
+        print(f"Non-manufacturing companies FILTERED OUT: {non_manufacturing_count}")
+        print(f"Retention rate: {manufacturing_count/total_companies:.1%}")
         print(f"\nOutput saved to: {output_file}")
 
         # Show score distribution
@@ -259,29 +406,36 @@ def filter_manufacturing_companies(input_file, output_file):
             print(f"  • Score {score}: {score_distribution[score]} companies")
 
         # Show top manufacturing sectors
-        if naics_columns and manufacturing_companies:
+        if naics_counts:
             print(f"\nTop NAICS codes among manufacturing companies:")
-            naics_col = naics_columns[0]
-            if naics_col in result_df.columns:
-                naics_counts = result_df[naics_col].value_counts().head(10)
-                for code, count in naics_counts.items():
-                    print(f"  • {code}: {count} companies")
-
-        # Save non-manufacturing companies for analysis
-        non_manufacturing_file = output_file.replace('.csv', '_non_manufacturing.csv')
-        pd.DataFrame(non_manufacturing_companies).to_csv(non_manufacturing_file, index=False)
+            for code, count in naics_counts.most_common(10):
+                print(f"  • {code}: {count} companies")
+
+        # Save non-manufacturing companies for analysis (streamed ones are there already)
+        if not chunksize or not non_manufacturing_count:
+            with stage_timer(metrics, 'write'):
+                write_table(pd.DataFrame(non_manufacturing_companies), non_manufacturing_file)
         print(f"\nNon-manufacturing companies saved to: {non_manufacturing_file}")
+        save_metrics(metrics, metrics_file, run_info)
 
-        return result_df
+        return result
     else:
         print("❌ NO COMPANIES MET THE STRICT MANUFACTURING CRITERIA!")
         print("This indicates the filtering criteria may be too strict or data may lack manufacturing relevance indicators.")
+        save_metrics(metrics, metrics_file, run_info)
         return None
 
 if __name__ == "__main__":
     # Configuration
     INPUT_FILE = "phase1_pragmatic_selected_rows.csv"  # Output from Phase 1
     OUTPUT_FILE = "phase2_manufacturing_companies.csv"
+    CHUNKSIZE = None  # Set to e.g. 50_000 to stream large inputs in chunks
+    WORKERS = 1       # Processes scoring shards in parallel (e.g. os.cpu_count())
+    COLUMN_ROLES_FILE = "column_roles_cache.json"  # Detected columns per input schema, or None to detect every run
+    COLUMN_OVERRIDES_FILE = None  # Or a JSON file pinning columns, e.g. {"manufacturing": [["naics_2022"], ["about"], ["tags"]]}
+    METRICS_FILE = "phase2_manufacturing_companies_metrics.json"  # JSON timing report of the run, or None
+    VERBOSITY = 'progress'  # 'rows' prints every company's decision, 'quiet' only the summary
+    DECISION_LOG_FILE = "phase2_manufacturing_decisions.jsonl"  # Every company's decision as JSON lines, or None
 
     # Verify input file exists
     if not os.path.exists(INPUT_FILE):
@@ -289,4 +443,8 @@ if __name__ == "__main__":
         print("Please ensure Phase 1a has been run successfully and the output file exists.")
     else:
         # Run the filtering
-        result = filter_manufacturing_companies(INPUT_FILE, OUTPUT_FILE)
+        result = filter_manufacturing_companies(INPUT_FILE, OUTPUT_FILE, chunksize=CHUNKSIZE, workers=WORKERS,
+                                                column_roles_file=COLUMN_ROLES_FILE,
+                                                column_overrides_file=COLUMN_OVERRIDES_FILE,
+                                                metrics_file=METRICS_FILE, verbosity=VERBOSITY,
+                                                decision_log_file=DECISION_LOG_FILE)
@@ -3,6 +3,14 @@ import numpy as np
 import os
 import re
 from datetime import datetime
+from itertools import chain
+
+from column_roles import column_roles, open_column_role_cache, role_source_note
+from numeric_parser import NumericParser, parse_numeric_text
+from progress import ProgressReporter, close_progress_reporter, open_progress_reporter
+from run_metrics import RunMetrics, save_metrics, stage_timer, timed, timed_chunks
+from shard_parallel import ShardPool, merge_counts
+from table_io import open_table_appender, open_table_reader, read_table, write_table
 
 def detect_capability_columns(df):
     """Dynamically detect columns that contain capability information"""
@@ -47,43 +55,7 @@ def parse_numeric_value(value):
     """Parse various numeric formats including currency and formatted numbers"""
     if pd.isna(value) or not isinstance(value, str):
         return None
-
-    value = value.strip().lower()
-
-    # Handle "not available" type values
-    if value in ["not available", "n/a", "none", "not applicable", "no data", "unknown", ""]:
-        return None
-
-    # Handle currency formats like "$10M", "€5.5M", "10 million"
-    if 'million' in value or 'm' in value or 'mn' in value:
-        # Extract numeric part
-        num_match = re.search(r'[\d,.]+', value)
-        if num_match:
-            num_str = num_match.group().replace(',', '')
-            try:
-                return float(num_str) * 1_000_000
-            except:
-                return None
-
-    if 'billion' in value or 'b' in value:
-        num_match = re.search(r'[\d,.]+', value)
-        if num_match:
-            num_str = num_match.group().replace(',', '')
-            try:
-                return float(num_str) * 1_000_000_000
-            except:
-                return None
-
-    # Handle simple numeric values
-    try:
-        # Remove currency symbols and commas
-        clean_value = re.sub(r'[^\d.-]', '', value)
-        if clean_value:
-            return float(clean_value)
-    except:
-        pass
-
-    return None
+    return parse_numeric_text(value)
 
 def assess_company_size_flexible(row, employee_columns):
     """More flexible employee count assessment"""
@@ -117,44 +89,49 @@ def assess_company_size_flexible(row, employee_columns):
     # Default fallback - assume some size if company exists
     return 2, "Small company (default assumption)"
 
-def assess_company_stability_flexible(row, year_columns):
+# Integer text as int() reads it, and a year inside other text (tried when the value is not an integer)
+INTEGER_PATTERN = re.compile(r'\s*[+-]?\d+(?:_\d+)*\s*')
+YEAR_PATTERN = re.compile(r'\b(19\d{2}|20\d{2})\b')
+# Years in business at which the stability score steps up from 1 to 5
+STABILITY_EDGES = [2, 5, 10, 20]
+
+def integer_value(text):
+    """
+    int(text) if text is integer text, or None
+    Integers longer than int() reads (sys.get_int_max_str_digits) count as other text, as they did
+    when int() raised ValueError for them
+    """
+    if not INTEGER_PATTERN.fullmatch(text):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+def founding_year(text, current_year):
+    """Founding year in text (an integer, or else a 19xx/20xx year inside it) if in 1900..current_year, or None"""
+    year_val = integer_value(text)
+    if year_val is None:
+        year_match = YEAR_PATTERN.search(text)
+        if not year_match:
+            return None
+        year_val = int(year_match.group())
+    return year_val if 1900 <= year_val <= current_year else None
+
+def stability_scores(years_in_business):
+    """Stability score (1-5) for years in business, a number or an array"""
+    return np.digitize(years_in_business, STABILITY_EDGES) + 1
+
+def assess_company_stability_flexible(row, year_columns, current_year=None):
     """More flexible stability assessment"""
-    current_year = datetime.now().year
+    current_year = current_year or datetime.now().year
 
     for col in year_columns:
         if col in row.index and pd.notna(row[col]):
-            try:
-                # Try to parse year directly
-                year_val = int(str(row[col]).strip())
-                if 1900 <= year_val <= current_year:
-                    years_in_business = current_year - year_val
-                    if years_in_business >= 20:
-                        return 5, f"Founded {year_val} ({years_in_business} years)"
-                    elif years_in_business >= 10:
-                        return 4, f"Founded {year_val} ({years_in_business} years)"
-                    elif years_in_business >= 5:
-                        return 3, f"Founded {year_val} ({years_in_business} years)"
-                    elif years_in_business >= 2:
-                        return 2, f"Founded {year_val} ({years_in_business} years)"
-                    else:
-                        return 1, f"Founded {year_val} ({years_in_business} years)"
-            except:
-                # Try to extract year from text
-                year_match = re.search(r'\b(19\d{2}|20\d{2})\b', str(row[col]))
-                if year_match:
-                    year_val = int(year_match.group())
-                    if 1900 <= year_val <= current_year:
-                        years_in_business = current_year - year_val
-                        if years_in_business >= 20:
-                            return 5, f"Founded {year_val} ({years_in_business} years)"
-                        elif years_in_business >= 10:
-                            return 4, f"Founded {year_val} ({years_in_business} years)"
-                        elif years_in_business >= 5:
-                            return 3, f"Founded {year_val} ({years_in_business} years)"
-                        elif years_in_business >= 2:
-                            return 2, f"Founded {year_val} ({years_in_business} years)"
-                        else:
-                            return 1, f"Founded {year_val} ({years_in_business} years)"
+            year_val = founding_year(str(row[col]), current_year)
+            if year_val is not None:
+                years_in_business = current_year - year_val
+                return int(stability_scores(years_in_business)), f"Founded {year_val} ({years_in_business} years)"
 
     # Default fallback
     return 3, "Established company (default assumption)"
@@ -222,11 +199,11 @@ def assess_geographical_presence_flexible(row, location_columns, country_columns
         # Default fallback
         return 2, "Single location (default assumption)"
 
-def calculate_capability_score_flexible(row, capability_columns):
+def calculate_capability_score_flexible(row, capability_columns, current_year=None):
     """Calculate capability score with more flexible logic"""
     # Get scores from each dimension
     size_score, size_info = assess_company_size_flexible(row, capability_columns['employee'])
-    stability_score, stability_info = assess_company_stability_flexible(row, capability_columns['year'])
+    stability_score, stability_info = assess_company_stability_flexible(row, capability_columns['year'], current_year)
     financial_score, financial_info = assess_financial_strength_flexible(row, capability_columns['revenue'])
     geo_score, geo_info = assess_geographical_presence_flexible(row, capability_columns['location'], capability_columns['country'])
 
@@ -250,6 +227,250 @@ def calculate_capability_score_flexible(row, capability_columns):
         'geo_info': geo_info
     }
 
+# Columnar scoring: bucket edges and labels of the assess_*_flexible functions above
+SIZE_EDGES = [10, 50, 100, 500]
+SIZE_LABELS = ['Micro', 'Small', 'Medium', 'Medium-Large', 'Large']
+SIZE_DESCRIPTIONS = {
+    4: "Large company (based on description)",
+    3: "Medium company (based on description)",
+    2: "Small company (based on description)",
+}
+FINANCIAL_EDGES = [100_000, 1_000_000, 10_000_000, 50_000_000]
+FINANCIAL_LABELS = ['Micro', 'Small', 'Medium', 'Medium-Large', 'Large']
+NAME_FIELDS = ['company_name', 'input_company_name', 'business_name']
+MIN_CAPABILITY_SCORE = 1.5
+MIN_GEO_SCORE = 1.0
+
+def size_description_score(text):
+    """Score the employee description fallback of assess_company_size_flexible gives text, or None"""
+    text = text.lower()
+    if any(term in text for term in ['large', 'enterprise', '500+', '1000+']):
+        return 4
+    elif any(term in text for term in ['medium', '100-500', '50-250']):
+        return 3
+    elif any(term in text for term in ['small', '10-50', '1-50']):
+        return 2
+    return None
+
+def location_count_value(text):
+    """Number of locations assess_geographical_presence_flexible reads from text, or None"""
+    return integer_value(text)
+
+def country_list(text):
+    """Countries assess_geographical_presence_flexible reads from text, or None to try the next column"""
+    country_val = text.strip()
+    if not country_val or country_val.lower() in ["not available", "n/a", "none"]:
+        return None
+    if ',' in country_val or ';' in country_val or '|' in country_val:
+        return [c.strip() for c in re.split(r'[;,|]', country_val) if c.strip()]
+    return [country_val]
+
+def row_view_columns(df, columns):
+    """
+    The columns of df that exist, in order, with the values a row from df.iterrows() holds
+    (rows of an all-numeric frame are upcast to one dtype, and str() sees that)
+    """
+    row_dtype = df.iloc[:0].to_numpy().dtype
+    for column in columns:
+        if column in df.columns:
+            yield df[column] if row_dtype == object else df[column].astype(row_dtype)
+
+def first_parsed_values(df, columns, parse):
+    """
+    Columnar version of the row-wise "first column whose value parses" loops
+    parse gets str() of every present value (as a row from df.iterrows() holds it) and runs once
+    per distinct value of a column; returns an object array with the first result other than None
+    of every row (None where no column gives one)
+    """
+    results = np.full(len(df), None, dtype=object)
+    undecided = np.ones(len(df), dtype=bool)
+
+    for series in row_view_columns(df, columns):
+        rows = np.flatnonzero(series.notna().to_numpy() & undecided)
+        if not len(rows):
+            continue
+
+        texts = np.array([str(value) for value in series.to_numpy(dtype=object)[rows]], dtype=object)
+        codes, distinct = pd.factorize(texts)
+        parsed = np.empty(len(distinct), dtype=object)
+        for i, text in enumerate(distinct):
+            parsed[i] = parse(text)
+
+        values = parsed[codes]
+        found = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+        results[rows[found]] = values[found]
+        undecided[rows[found]] = False
+
+    return results
+
+def first_numeric_values(df, columns, numeric_parser):
+    """first_parsed_values with parse_numeric_value as a float64 array (NaN where no column holds a number)"""
+    results = np.full(len(df), np.nan)
+    for series in row_view_columns(df, columns):
+        undecided = np.isnan(results)
+        if not undecided.any():
+            break
+        results[undecided] = numeric_parser.parse_column(series[undecided])
+    return results
+
+def founding_years(series, current_year):
+    """
+    Columnar founding_year over str() of every value of a column, as a nullable Int64 array
+    Each distinct value is read once: integers with one vectorized match, the rest with one
+    vectorized year search (only integers too long for int() raise, once each)
+    """
+    years = pd.array(np.full(len(series), pd.NA), dtype="Int64")
+    present = series.notna().to_numpy()
+    if not present.any():
+        return years
+
+    codes, distinct = pd.factorize(np.array([str(value) for value in series.to_numpy(dtype=object)[present]], dtype=object))
+    distinct = pd.Series(distinct, dtype=object)
+    is_integer = distinct.str.fullmatch(INTEGER_PATTERN.pattern).fillna(False).to_numpy(dtype=bool, copy=True)
+    # Integers too long for int() are searched for a year like other text
+    integers = [integer_value(text) for text in distinct[is_integer]]
+    is_integer[is_integer] = [year is not None for year in integers]
+    distinct_years = np.full(len(distinct), np.nan)
+    # Integers can be of any size, so they are range-checked before becoming floats
+    distinct_years[is_integer] = [year if 1900 <= year <= current_year else np.nan
+                                  for year in integers if year is not None]
+    distinct_years[~is_integer] = pd.to_numeric(
+        distinct[~is_integer].str.extract(YEAR_PATTERN.pattern, expand=False)).to_numpy(dtype=np.float64)
+    distinct_years[distinct_years > current_year] = np.nan
+
+    years[present] = pd.array(distinct_years, dtype="Int64")[codes]
+    return years
+
+def first_founding_years(df, columns, current_year):
+    """founding_years of the first year column that gives each row one (nullable Int64 array)"""
+    years = pd.array(np.full(len(df), pd.NA), dtype="Int64")
+    for series in row_view_columns(df, columns):
+        undecided = years.isna()
+        if not undecided.any():
+            break
+        years[undecided] = founding_years(series[undecided], current_year)
+    return years
+
+def as_float_array(values):
+    """Object array of numbers and None as float64, None as NaN"""
+    return pd.Series(values, dtype=object).astype(np.float64).to_numpy()
+
+def rounded(values, digits=1):
+    """Python round() of every value (NumPy rounds halves differently), once per distinct value"""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(value, digits) for value in distinct.tolist()], dtype=np.float64)[inverse]
+
+def score_capabilities(df, capability_columns, numeric_parser=None, current_year=None):
+    """
+    Columnar calculate_capability_score_flexible for a whole DataFrame
+    The capability columns are parsed once into arrays (each distinct value once) and bucketed with
+    np.digitize / np.select; returns a DataFrame aligned with df by position holding the
+    score_breakdown entries, the unrounded total_supplier_score and the parsed values the info
+    strings are formatted from (see capability_info)
+    Revenue and employee values are parsed by numeric_parser (a NumericParser with the historical
+    rules by default), which remembers them across calls; current_year is taken once per run by
+    the callers (this year by default)
+    """
+    current_year = current_year or datetime.now().year
+    numeric_parser = numeric_parser or NumericParser()
+
+    employees = first_numeric_values(df, capability_columns['employee'], numeric_parser)
+    size_description = first_parsed_values(df, capability_columns['employee'], size_description_score)
+    size_description = np.where(np.isnan(employees), as_float_array(size_description), np.nan)
+    size_score = np.select(
+        [~np.isnan(employees), ~np.isnan(size_description)],
+        [np.digitize(employees, SIZE_EDGES) + 1, size_description],
+        2
+    ).astype(np.int64)
+
+    founded = first_founding_years(df, capability_columns['year'], current_year)
+    years_in_business = current_year - founded
+    stability_score = np.where(years_in_business.isna(), 3,
+                               stability_scores(years_in_business.fillna(0).to_numpy(dtype=np.int64))).astype(np.int64)
+
+    revenue = first_numeric_values(df, capability_columns['revenue'], numeric_parser)
+    financial_score = np.where(np.isnan(revenue), 2, np.digitize(revenue, FINANCIAL_EDGES) + 1).astype(np.int64)
+
+    locations = first_parsed_values(df, capability_columns['location'], location_count_value)
+    countries = first_parsed_values(df, capability_columns['country'], country_list)
+    # Counts are only compared with 5 and below, so integers too large for a float are capped first
+    location_count = as_float_array([value if value is None else max(-1, min(value, 5)) for value in locations])
+    country_count = np.fromiter((len(value) if value is not None else 0 for value in countries),
+                                dtype=np.int64, count=len(countries))
+    geo_score = np.select(
+        [location_count >= 5, location_count >= 3, location_count >= 2,
+         country_count >= 3, country_count >= 2, country_count >= 1],
+        [5, 4, 3, 4, 3, 2],
+        2
+    ).astype(np.int64)
+
+    # Weighted scoring, in the same operation order as the row-wise version
+    capability_score = (size_score * 0.3 + stability_score * 0.3 + financial_score * 0.4)
+    total_score = (capability_score * 0.7 + geo_score * 0.3)
+
+    return pd.DataFrame({
+        'company_size': size_score,
+        'company_stability': stability_score,
+        'financial_strength': financial_score,
+        'geographical_presence': geo_score,
+        'capability_score': rounded(capability_score),
+        'total_score': rounded(total_score),
+        'total_supplier_score': total_score,
+        'employees': employees,
+        'size_description': size_description,
+        'founded': founded,
+        'years_in_business': years_in_business,
+        'revenue': revenue,
+        # As a Series of object, so pandas does not try integers too large for a float as floats
+        'locations': pd.Series(locations, dtype=object),
+        'countries': countries,
+    })
+
+def capability_info(scores):
+    """The size, stability, financial and geo info strings of one row of score_capabilities"""
+    if not np.isnan(scores.employees):
+        size_info = f"{scores.employees:,.0f} employees ({SIZE_LABELS[scores.company_size - 1]})"
+    elif not np.isnan(scores.size_description):
+        size_info = SIZE_DESCRIPTIONS[scores.company_size]
+    else:
+        size_info = "Small company (default assumption)"
+
+    if not pd.isna(scores.founded):
+        stability_info = f"Founded {scores.founded} ({scores.years_in_business} years)"
+    else:
+        stability_info = "Established company (default assumption)"
+
+    value = scores.revenue
+    if np.isnan(value):
+        financial_info = "Small revenue (default assumption)"
+    elif value >= 1_000_000:
+        financial_info = f"${value/1_000_000:,.1f}M revenue ({FINANCIAL_LABELS[scores.financial_strength - 1]})"
+    elif value >= 100_000:
+        financial_info = f"${value/1_000:,.0f}K revenue (Small)"
+    else:
+        financial_info = f"${value:,.0f} revenue (Micro)"
+
+    countries = scores.countries or []
+    if scores.locations is not None and scores.locations >= 2:
+        geo_info = f"{scores.locations} locations across {len(countries)} countries"
+    elif len(countries) >= 3:
+        geo_info = f"Present in {len(countries)} countries: {', '.join(countries[:3])}"
+    elif len(countries) >= 2:
+        geo_info = f"Present in {len(countries)} countries: {', '.join(countries)}"
+    elif countries:
+        geo_info = f"Present in {countries[0]}"
+    else:
+        geo_info = "Single location (default assumption)"
+
+    return {'size_info': size_info, 'stability_info': stability_info,
+            'financial_info': financial_info, 'geo_info': geo_info}
+
+def company_names(df):
+    """Columnar company name lookup of assess_suppliers ("Unknown" where no name field is filled)"""
+    names = first_parsed_values(df, NAME_FIELDS, lambda text: text.strip() or None)
+    names[pd.isna(names)] = "Unknown"
+    return names
+
 def is_suitable_supplier_flexible(score_breakdown, min_capability_score=1.5, min_geo_score=1.0):
     """More flexible supplier qualification criteria"""
     capability_score = score_breakdown['capability_score']
@@ -260,25 +481,172 @@ def is_suitable_supplier_flexible(score_breakdown, min_capability_score=1.5, min
         return True
     return False
 
-def filter_suppliers_flexible(input_file, output_file, rejected_file=None):
-    """Main function with flexible scoring and detection"""
+def assess_suppliers(df, capability_columns, score_distribution, numeric_parser=None, current_year=None,
+                     metrics=None, reporter=None, rejected_info=True):
+    """
+    Assess one frame of companies with the flexible supplier criteria
+    Scores every row at once with score_capabilities and formats the info strings from the parsed
+    arrays, without parsing any value again. Updates score_distribution in place and returns
+    (qualified rows as a DataFrame with the score columns added, rejected records)
+    Info strings are only formatted for the qualified rows, and for the rejected ones with
+    rejected_info (set it to False when the rejected records are not written out)
+    With a RunMetrics, the score_capabilities call is timed
+    Every company's decision goes to reporter, a ProgressReporter (without one, the lines are printed)
+    """
+    if reporter is None:
+        reporter = ProgressReporter('3')
+    scores = timed(metrics, score_capabilities)(df, capability_columns, numeric_parser, current_year)
+    names = company_names(df)
+    cap_scores = scores['capability_score'].tolist()
+    geo_scores = scores['geographical_presence'].tolist()
+
+    # Track score distribution
+    for cap_score, geo_score in zip(cap_scores, geo_scores):
+        score_key = f"{cap_score:.1f}/{geo_score:.1f}"
+        score_distribution[score_key] = score_distribution.get(score_key, 0) + 1
+
+    # Determine which companies are suitable suppliers
+    suitable = ((scores['capability_score'] >= MIN_CAPABILITY_SCORE)
+                & (scores['geographical_presence'] >= MIN_GEO_SCORE)).to_numpy()
+
+    suitable_rows = np.flatnonzero(suitable)
+    suitable_scores = scores.iloc[suitable_rows]
+    suitable_infos = [capability_info(row) for row in suitable_scores.itertuples(index=False)]
+    suitable_suppliers = df.iloc[suitable_rows].copy()
+    suitable_suppliers['total_supplier_score'] = suitable_scores['total_supplier_score'].to_numpy()
+    suitable_suppliers['capability_score'] = suitable_scores['capability_score'].to_numpy()
+    suitable_suppliers['geographical_score'] = suitable_scores['geographical_presence'].to_numpy()
+    suitable_suppliers['company_size_info'] = [info['size_info'] for info in suitable_infos]
+    suitable_suppliers['stability_info'] = [info['stability_info'] for info in suitable_infos]
+    suitable_suppliers['financial_info'] = [info['financial_info'] for info in suitable_infos]
+    suitable_suppliers['geographical_info'] = [info['geo_info'] for info in suitable_infos]
+    suitable_suppliers['score_breakdown'] = [
+        str({'company_size': size, 'company_stability': stability, 'financial_strength': financial,
+             'geographical_presence': geo, 'capability_score': cap, 'total_score': total})
+        for size, stability, financial, geo, cap, total in zip(
+            *(suitable_scores[column].tolist() for column in
+              ['company_size', 'company_stability', 'financial_strength', 'geographical_presence',
+               'capability_score', 'total_score']))
+    ]
+
+    rejected_rows = np.flatnonzero(~suitable)
+    rejected_infos = {}
+    if rejected_info:
+        rejected_infos = dict(zip(rejected_rows.tolist(),
+                                  map(capability_info, scores.iloc[rejected_rows].itertuples(index=False))))
+
+    rejected_suppliers = []
+    report_lines = []
+    decisions = []
+    # Without decisions to report, only the rejected rows need a look
+    wants_decisions = reporter.wants_decisions
+    row_numbers = df.index.to_numpy()
+    for i in range(len(df)) if wants_decisions else rejected_rows:
+        company_name, cap_score, geo_score = names[i], cap_scores[i], geo_scores[i]
+        if suitable[i]:
+            report_lines.append(f"✅ QUALIFIED: {company_name} (Cap: {cap_score:.1f}/5.0, Geo: {geo_score:.1f}/5.0)")
+            decisions.append({'row': int(row_numbers[i]) + 1, 'company': company_name, 'decision': 'qualified',
+                              'capability_score': cap_score, 'geographical_score': geo_score})
+            continue
+
+        rejection_reasons = []
+        if cap_score < MIN_CAPABILITY_SCORE:
+            rejection_reasons.append(f"Low capability ({cap_score:.1f}/5.0)")
+        if geo_score < MIN_GEO_SCORE:
+            rejection_reasons.append(f"Poor geography ({geo_score:.1f}/5.0)")
+
+        rejected_supplier = {
+            'company_name': company_name,
+            'capability_score': cap_score,
+            'geographical_score': geo_score,
+            'rejection_reasons': '; '.join(rejection_reasons) if rejection_reasons else 'Failed flexible criteria'
+        }
+        if rejected_info:
+            info_details = rejected_infos[i]
+            rejected_supplier.update({
+                'company_size': info_details['size_info'],
+                'stability': info_details['stability_info'],
+                'financial_strength': info_details['financial_info'],
+                'geographical_presence': info_details['geo_info']
+            })
+        rejected_suppliers.append(rejected_supplier)
+        if wants_decisions:
+            report_lines.append(f"❌ REJECTED: {company_name} ({'; '.join(rejection_reasons)})")
+            decisions.append({'row': int(row_numbers[i]) + 1, 'company': company_name, 'decision': 'rejected',
+                              'capability_score': cap_score, 'geographical_score': geo_score,
+                              'reason': rejected_supplier['rejection_reasons']})
+
+    reporter.decide_many(report_lines, decisions)
+    reporter.advance(len(df))
+    return suitable_suppliers, rejected_suppliers
+
+def assess_suppliers_shard(shard, capability_columns, numeric_compat=True, current_year=None, reporter=None,
+                           rejected_info=True):
+    """
+    assess_suppliers for one shard of a ShardPool run, with a score distribution and numeric parser
+    of its own; returns the parser's counts too
+    """
+    score_distribution = {}
+    numeric_parser = NumericParser(numeric_compat)
+    suitable_suppliers, rejected_suppliers = assess_suppliers(shard, capability_columns, score_distribution,
+                                                              numeric_parser, current_year, reporter=reporter,
+                                                              rejected_info=rejected_info)
+    return suitable_suppliers, rejected_suppliers, score_distribution, numeric_parser.counts()
+
+def filter_suppliers_flexible(input_file, output_file, rejected_file=None, chunksize=None, workers=1,
+                              numeric_compat=True, column_roles_file=None, column_overrides_file=None,
+                              metrics_file=None, verbosity='rows', decision_log_file=None):
+    """
+    Main function with flexible scoring and detection
+    With chunksize set, the input is streamed in chunks of that many rows and results are appended
+    to the output files as they are produced (memory stays flat); the number of qualified
+    suppliers written is returned instead of a DataFrame
+    With workers > 1, every chunk is split into shards assessed in parallel by a pool of that many
+    processes (see ShardPool); the outputs are the same as with one
+    numeric_compat keeps the historical revenue and employee parsing rules (see parse_numeric_text);
+    set it to False to apply million/billion multipliers to units after the number only
+    column_roles_file caches the detected capability columns per input schema, and
+    column_overrides_file pins them by hand (see ColumnRoleCache)
+    With metrics_file set, the wall and CPU time of every stage and score_capabilities call, the rows
+    in and out and the numeric parsing counts are written there as a JSON report at the end (see RunMetrics)
+    verbosity 'rows' prints the decision of every company, 'progress' a progress line every few
+    seconds instead and 'quiet' neither; with decision_log_file set, every decision is also saved
+    there as a JSON line (see ProgressReporter)
+    """
     print("Starting Phase 3: FLEXIBLE Supplier Capability & Geographical Analysis")
     print("=" * 70)
+    metrics = RunMetrics() if metrics_file else None
+    reporter = open_progress_reporter('3', verbosity, decision_log_file)
 
     # Load the Phase 2 results
-    df = pd.read_csv(input_file)
-    print(f"Loaded {len(df)} manufacturing companies from Phase 2 output")
-    print(f"Available columns: {', '.join(df.columns.tolist())}")
+    with stage_timer(metrics, 'read'):
+        if chunksize:
+            reader = open_table_reader(input_file, chunksize)
+            chunk_iter = iter(reader)
+            sample_df = next(chunk_iter, pd.DataFrame(columns=reader.columns))
+            chunks = chain([sample_df], timed_chunks(metrics, chunk_iter))
+            total_companies = reader.total_rows
+            print(f"Streaming {total_companies} manufacturing companies from Phase 2 output in chunks of {chunksize} rows")
+        else:
+            df = read_table(input_file)
+            sample_df = df
+            chunks = [df]
+            total_companies = len(df)
+            print(f"Loaded {len(df)} manufacturing companies from Phase 2 output")
+    reporter.total_rows = total_companies
+    print(f"Available columns: {', '.join(sample_df.columns.tolist())}")
 
     # Detect capability columns
-    capability_columns = detect_capability_columns(df)
-    print(f"\nDetected capability columns:")
+    with stage_timer(metrics, 'detect_columns'):
+        role_cache = open_column_role_cache(column_roles_file, column_overrides_file)
+        capability_columns, role_source = column_roles(role_cache, 'capability', sample_df, detect_capability_columns)
+    print(f"\nDetected capability columns{role_source_note(role_source)}:")
     for category, columns in capability_columns.items():
         print(f"  {category}: {', '.join(columns) if columns else 'None'}")
 
     # Show sample data for debugging
     print(f"\nSample data from first row:")
-    sample_row = df.iloc[0]
+    sample_row = sample_df.iloc[0]
     for category, columns in capability_columns.items():
         for col in columns:
             if col in sample_row.index:
@@ -288,77 +656,101 @@ def filter_suppliers_flexible(input_file, output_file, rejected_file=None):
     suitable_suppliers = []
     rejected_suppliers = []
     score_distribution = {}
+    qualified_count = 0
+    rejected_count = 0
+    sample_rejected = []
+    top_suppliers = pd.DataFrame()
+
+    output_writer = open_table_appender(output_file)
+    rejected_writer = open_table_appender(rejected_file) if rejected_file else None
 
     print(f"\nAssessing supplier capability with FLEXIBLE criteria...")
     print("-" * 70)
 
-    # Process each company
-    for idx, row in df.iterrows():
-        # Get company name for reporting
-        company_name = "Unknown"
-        for field in ['company_name', 'input_company_name', 'business_name']:
-            if field in row.index and pd.notna(row[field]) and str(row[field]).strip() != "":
-                company_name = str(row[field]).strip()
-                break
-
-        # Calculate scores
-        total_score, score_breakdown, info_details = calculate_capability_score_flexible(row, capability_columns)
-
-        # Track score distribution
-        cap_score = score_breakdown['capability_score']
-        geo_score = score_breakdown['geographical_presence']
-        score_key = f"{cap_score:.1f}/{geo_score:.1f}"
-        score_distribution[score_key] = score_distribution.get(score_key, 0) + 1
+    # The detected columns go to each worker process once
+    numeric_parser = NumericParser(numeric_compat)
+    current_year = datetime.now().year
+    pool = None
+    if workers > 1:
+        pool = ShardPool(assess_suppliers_shard, {'capability_columns': capability_columns,
+                                                  'numeric_compat': numeric_compat,
+                                                  'current_year': current_year,
+                                                  'rejected_info': bool(rejected_file)}, workers, metrics, reporter)
 
-        # Determine if suitable supplier
-        is_suitable = is_suitable_supplier_flexible(score_breakdown)
-
-        if is_suitable:
-            row_copy = row.copy()
-            row_copy['total_supplier_score'] = total_score
-            row_copy['capability_score'] = cap_score
-            row_copy['geographical_score'] = geo_score
-            row_copy['company_size_info'] = info_details['size_info']
-            row_copy['stability_info'] = info_details['stability_info']
-            row_copy['financial_info'] = info_details['financial_info']
-            row_copy['geographical_info'] = info_details['geo_info']
-            row_copy['score_breakdown'] = str(score_breakdown)
-            suitable_suppliers.append(row_copy)
-            print(f"✅ QUALIFIED: {company_name} (Cap: {cap_score:.1f}/5.0, Geo: {geo_score:.1f}/5.0)")
+    # Process each company
+    for chunk in chunks:
+        with stage_timer(metrics, 'assess'):
+            if pool is None:
+                chunk_suitable, chunk_rejected = assess_suppliers(chunk, capability_columns, score_distribution,
+                                                                  numeric_parser, current_year, metrics, reporter,
+                                                                  rejected_info=bool(rejected_file))
+            else:
+                shard_suitable, chunk_rejected = [], []
+                for suitable, rejected, shard_distribution, parser_counts in pool.map(chunk):
+                    shard_suitable.append(suitable)
+                    chunk_rejected.extend(rejected)
+                    merge_counts(score_distribution, shard_distribution)
+                    numeric_parser.add_counts(parser_counts)
+                chunk_suitable = pd.concat(shard_suitable) if shard_suitable else chunk.iloc[0:0]
+        if metrics is not None:
+            metrics.add_rows('assess', len(chunk), len(chunk_suitable))
+        qualified_count += len(chunk_suitable)
+        rejected_count += len(chunk_rejected)
+        sample_rejected.extend(chunk_rejected[:10 - len(sample_rejected)])
+
+        if len(chunk_suitable):
+            # Keep a running top 10 so the summary does not need every qualified row
+            chunk_top = chunk_suitable[['company_name', 'total_supplier_score', 'company_size_info']]
+            top_suppliers = pd.concat([top_suppliers, chunk_top]).sort_values(
+                'total_supplier_score', ascending=False, kind='stable').head(10)
+
+        if chunksize:
+            # Streaming: write this chunk's results and let them go
+            with stage_timer(metrics, 'write'):
+                output_writer.append(chunk_suitable)
+                if rejected_writer is not None:
+                    rejected_writer.append(pd.DataFrame(chunk_rejected))
         else:
-            rejection_reasons = []
-            if cap_score < 1.5:
-                rejection_reasons.append(f"Low capability ({cap_score:.1f}/5.0)")
-            if geo_score < 1.0:
-                rejection_reasons.append(f"Poor geography ({geo_score:.1f}/5.0)")
-
-            rejected_suppliers.append({
-                'company_name': company_name,
-                'capability_score': cap_score,
-                'geographical_score': geo_score,
-                'rejection_reasons': '; '.join(rejection_reasons) if rejection_reasons else 'Failed flexible criteria',
-                'company_size': info_details['size_info'],
-                'stability': info_details['stability_info'],
-                'financial_strength': info_details['financial_info'],
-                'geographical_presence': info_details['geo_info']
-            })
-            print(f"❌ REJECTED: {company_name} ({'; '.join(rejection_reasons)})")
+            suitable_suppliers.append(chunk_suitable)
+            rejected_suppliers.extend(chunk_rejected)
+    if pool is not None:
+        pool.close()
+    output_writer.close()
+    if rejected_writer is not None:
+        rejected_writer.close()
+    close_progress_reporter(reporter)
 
     # Create output dataframe
     print("\n" + "=" * 70)
     print("PHASE 3 FLEXIBLE ANALYSIS COMPLETE")
     print("=" * 70)
+    print(numeric_parser.report())
+    run_info = {'phase': '3', 'input_file': input_file, 'output_file': output_file, 'rows': total_companies,
+                'chunksize': chunksize, 'workers': workers}
+    if metrics is not None:
+        for name, count in numeric_parser.counts().items():
+            metrics.count(f"numeric_{name}", count)
+
+    if not chunksize and rejected_file and rejected_suppliers:
+        with stage_timer(metrics, 'write'):
+            write_table(pd.DataFrame(rejected_suppliers), rejected_file)
+
+    if qualified_count:
+        if chunksize:
+            result = qualified_count
+        else:
+            result = pd.concat(suitable_suppliers)
 
-    if suitable_suppliers:
-        result_df = pd.DataFrame(suitable_suppliers)
-
-        # Save the result
-        result_df.to_csv(output_file, index=False)
+            # Save the result
+            with stage_timer(metrics, 'write'):
+                write_table(result, output_file)
 
-        print(f"Qualified suppliers: {len(suitable_suppliers)}")
-        print(f"Rejected suppliers: {len(rejected_suppliers)}")
-        print(f"Qualification rate: {len(suitable_suppliers)/len(df):.1%}")
+        print(f"Qualified suppliers: {qualified_count}")
+        print(f"Rejected suppliers: {rejected_count}")
+        print(f"Qualification rate: {qualified_count/total_companies:.1%}")
         print(f"Output saved to: {output_file}")
+        if rejected_file and rejected_count:
+            print(f"Rejected suppliers saved to: {rejected_file}")
 
         # Show score distribution
         print(f"\nScore distribution summary (top 10):")
@@ -367,23 +759,23 @@ def filter_suppliers_flexible(input_file, output_file, rejected_file=None):
             print(f"  • {score_range}: {count} companies")
 
         # Show top suppliers
-        if not result_df.empty:
-            print(f"\nTop 10 suppliers by total score:")
-            top_suppliers = result_df.sort_values('total_supplier_score', ascending=False).head(10)
-            for i, (_, row) in enumerate(top_suppliers.iterrows(), 1):
-                print(f"  {i}. {row['company_name']}: {row['total_supplier_score']:.1f}/5.0 (Size: {row['company_size_info']})")
+        print(f"\nTop 10 suppliers by total score:")
+        for i, (_, row) in enumerate(top_suppliers.iterrows(), 1):
+            print(f"  {i}. {row['company_name']}: {row['total_supplier_score']:.1f}/5.0 (Size: {row['company_size_info']})")
+        save_metrics(metrics, metrics_file, run_info)
 
-        return result_df
+        return result
     else:
         print("❌ WARNING: NO COMPANIES QUALIFIED with flexible criteria!")
         print("This suggests the data may not contain sufficient capability information.")
         print("Consider checking the input file structure or lowering criteria further.")
 
         # Show why companies were rejected
-        if rejected_suppliers:
+        if sample_rejected:
             print(f"\nSample rejection reasons (first 10):")
-            for i, supplier in enumerate(rejected_suppliers[:10], 1):
+            for i, supplier in enumerate(sample_rejected, 1):
                 print(f"  {i}. {supplier['company_name']}: {supplier['rejection_reasons']}")
+        save_metrics(metrics, metrics_file, run_info)
 
         return None
 
@@ -392,6 +784,14 @@ if __name__ == "__main__":
     INPUT_FILE = "phase2_manufacturing_companies.csv"  # Output from Phase 2
     OUTPUT_FILE = "phase3_qualified_suppliers.csv"
     REJECTED_FILE = "phase3_rejected_suppliers.csv"
+    CHUNKSIZE = None  # Set to e.g. 50_000 to stream large inputs in chunks
+    WORKERS = 1       # Processes scoring shards in parallel (e.g. os.cpu_count())
+    NUMERIC_COMPAT = True  # Or False to read '10M' / '2 bn' as millions / billions only when the unit follows the number
+    COLUMN_ROLES_FILE = "column_roles_cache.json"  # Detected columns per input schema, or None to detect every run
+    COLUMN_OVERRIDES_FILE = None  # Or a JSON file pinning columns, e.g. {"capability": {"year": ["founded"]}}
+    METRICS_FILE = "phase3_qualified_suppliers_metrics.json"  # JSON timing report of the run, or None
+    VERBOSITY = 'progress'  # 'rows' prints every company's decision, 'quiet' only the summary
+    DECISION_LOG_FILE = "phase3_supplier_decisions.jsonl"  # Every company's decision as JSON lines, or None
 
     # Verify input file exists
     if not os.path.exists(INPUT_FILE):
@@ -399,4 +799,7 @@ if __name__ == "__main__":
         print("Please ensure Phase 2 has been run successfully and the output file exists.")
     else:
         # Run the filtering
-        result = filter_suppliers_flexible(INPUT_FILE, OUTPUT_FILE, REJECTED_FILE)
+        result = filter_suppliers_flexible(INPUT_FILE, OUTPUT_FILE, REJECTED_FILE, chunksize=CHUNKSIZE, workers=WORKERS,
+                                           numeric_compat=NUMERIC_COMPAT, column_roles_file=COLUMN_ROLES_FILE,
+                                           column_overrides_file=COLUMN_OVERRIDES_FILE, metrics_file=METRICS_FILE,
+                                           verbosity=VERBOSITY, decision_log_file=DECISION_LOG_FILE)
@@ -0,0 +1,580 @@
+import pandas as pd
+import contextlib
+import io
+import os
+import time
+from datetime import datetime
+from itertools import chain
+
+from column_roles import column_roles, open_column_role_cache
+from table_io import open_table_appender, open_table_reader, read_table, write_table
+from phase1_rows_scoring_selection import (
+    calculate_row_scores, find_website_columns, report_company_selection,
+    select_best_rows, split_complete_groups
+)
+from phase1_website_status_code import (OUTPUT_COLUMNS, canonical_probe_key, check_company_websites,
+                                        clean_website_url, print_check_reports)
+from phase2_manufacturing_relevance import (
+    detect_manufacturing_columns, get_manufacturing_keywords, get_manufacturing_naics_codes,
+    score_manufacturing_companies
+)
+from phase3_manufacturing_reliability import assess_suppliers, detect_capability_columns
+from dns_cache import CachingResolver, hosts_file_lookup
+from http_session import PooledSession
+from politeness import DomainScheduler
+from progress import close_progress_reporter, open_progress_reporter
+from rate_limiter import TokenBucket
+from run_metrics import RunMetrics, save_metrics, stage_timer, timed, timed_chunks
+from shard_manifest import parse_shard, shard_of_rows, shard_output_path, write_manifest
+from shard_parallel import merge_counts
+from timeout_policy import TimeoutPolicy
+from keyword_matcher import get_keyword_matcher
+from naics_index import get_naics_index
+from numeric_parser import NumericParser
+from website_cache import WebsiteCheckCache
+
+# Stage order of the four separate scripts (network check first)
+SEQUENTIAL_STAGE_ORDER = ['website', 'manufacturing', 'capability']
+
+# Cheap CPU filters first, so only companies that can still qualify have their website checked
+CHEAP_FIRST_STAGE_ORDER = ['manufacturing', 'capability', 'website']
+
+# Files written for each stage when intermediate files are requested: (kept rows, rejected records)
+# They carry the same names as the outputs of the separate phase scripts
+STAGE_FILES = {
+    'rows': ('phase1_selected_rows.csv', None),
+    'website': ('phase1_pragmatic_selected_rows.csv', 'phase1_pragmatic_rejected_rows.csv'),
+    'manufacturing': ('phase2_manufacturing_companies.csv', 'phase2_manufacturing_companies_non_manufacturing.csv'),
+    'capability': ('phase3_qualified_suppliers.csv', 'phase3_rejected_suppliers.csv'),
+}
+
+# Phase whose decisions each stage reports, as in the decision logs of the separate phase scripts
+STAGE_PHASES = {'website': '1b', 'manufacturing': '2', 'capability': '3'}
+
+# Columns each stage adds to the rows it keeps
+STAGE_COLUMNS = {
+    'website': ['selection_status', 'website_status', 'website_url_normalized'],
+    'manufacturing': ['manufacturing_score', 'manufacturing_evidence'],
+    'capability': [
+        'total_supplier_score', 'capability_score', 'geographical_score', 'company_size_info',
+        'stability_info', 'financial_info', 'geographical_info', 'score_breakdown'
+    ],
+}
+
+def keep_scored_rows(frame, scored_rows, added_columns):
+    """
+    Rows of frame that a row-wise stage kept (scored_rows are their copies, named by index),
+    with the columns the stage added. Kept rows keep the dtypes of frame
+    """
+    kept = frame.loc[[row.name for row in scored_rows]].copy()
+    for column in added_columns:
+        kept[column] = [row[column] for row in scored_rows]
+    return kept
+
+class PipelineStage:
+    """
+    One row filter of the fused pipeline
+    run(frame) returns (kept rows, rejected records); the stage keeps its own row counts and timing,
+    and score_distribution is the {score: count} dict run updates, if it keeps one
+    With a RunMetrics, the stage's wall and CPU time and rows in and out are recorded there as well
+    """
+
+    def __init__(self, name, run, score_distribution=None, metrics=None):
+        self.name = name
+        self.run = run
+        self.score_distribution = score_distribution
+        self.metrics = metrics
+        self.rows_in = 0
+        self.rows_out = 0
+        self.seconds = 0.0
+
+    def __call__(self, frame):
+        start_time = time.time()
+        with stage_timer(self.metrics, self.name):
+            kept, rejected = self.run(frame)
+        self.seconds += time.time() - start_time
+        self.rows_in += len(frame)
+        self.rows_out += len(kept)
+        if self.metrics is not None:
+            self.metrics.add_rows(self.name, len(frame), len(kept))
+        return kept, rejected
+
+def build_stages(columns, concurrency=20, per_host_concurrency=2, timeout=10, cache=None, session=None,
+                 mode='asyncio', rate_limiter=None, scheduler=None, probe_key='url', probe_results=None,
+                 timeout_policy=None, resolver=None, role_cache=None, metrics=None, reporter=None,
+                 rejected_info=True):
+    """
+    Build the website, manufacturing and capability stages for frames with the given columns
+    (the phase 1b output columns). Every stage decides each row on its own, so the stages can run
+    in any order and still keep the same final rows
+    probe_results is an optional dict shared with check_company_websites, so every probe key is
+    probed once per run
+    role_cache is an optional ColumnRoleCache the manufacturing and capability columns come from,
+    and metrics an optional RunMetrics the stages and their scoring functions are timed in
+    With a ProgressReporter, every stage reports its row decisions under its phase (see
+    ProgressReporter.for_phase); without one they are printed
+    rejected_info formats the capability info strings of rejected rows too (see assess_suppliers)
+    """
+    columns_df = pd.DataFrame(columns=columns)
+
+    # Phase 2 criteria are compiled once for every chunk
+    manufacturing_naics = get_naics_index(get_manufacturing_naics_codes())
+    manufacturing_keywords = get_keyword_matcher(get_manufacturing_keywords())
+    (naics_columns, description_columns, tag_columns), _ = column_roles(
+        role_cache, 'manufacturing', columns_df, detect_manufacturing_columns
+    )
+    manufacturing_scores = {}
+
+    capability_columns, _ = column_roles(role_cache, 'capability', columns_df, detect_capability_columns)
+    capability_scores = {}
+    numeric_parser = NumericParser()
+    current_year = datetime.now().year
+    stage_reporters = {stage_name: reporter.for_phase(phase) if reporter is not None else None
+                       for stage_name, phase in STAGE_PHASES.items()}
+
+    def run_website(frame):
+        selected, rejected = check_company_websites(
+            frame, concurrency=concurrency, per_host_concurrency=per_host_concurrency,
+            timeout=timeout, cache=cache, session=session, mode=mode, rate_limiter=rate_limiter,
+            scheduler=scheduler, probe_key=probe_key, probe_results=probe_results,
+            timeout_policy=timeout_policy, resolver=resolver, metrics=metrics, reporter=stage_reporters['website']
+        )
+        kept = frame.loc[selected.index].copy()
+        for column in STAGE_COLUMNS['website']:
+            kept[column] = selected[column]
+        return kept, rejected
+
+    def run_manufacturing(frame):
+        scored_rows, rejected = score_manufacturing_companies(
+            frame, naics_columns, description_columns, tag_columns,
+            manufacturing_naics, manufacturing_keywords, manufacturing_scores, metrics,
+            stage_reporters['manufacturing']
+        )
+        return keep_scored_rows(frame, scored_rows, STAGE_COLUMNS['manufacturing']), rejected
+
+    def run_capability(frame):
+        return assess_suppliers(frame, capability_columns, capability_scores, numeric_parser, current_year, metrics,
+                                stage_reporters['capability'], rejected_info)
+
+    return {
+        'website': PipelineStage('website', run_website, metrics=metrics),
+        'manufacturing': PipelineStage('manufacturing', run_manufacturing, manufacturing_scores, metrics),
+        'capability': PipelineStage('capability', run_capability, capability_scores, metrics),
+    }
+
+def website_probe_keys(frame, probe_key='url'):
+    """Canonical probe keys of the rows of frame whose website_url would be checked over the network"""
+    if 'website_url' not in frame.columns:
+        return []
+    cleaned_urls = (clean_website_url(str(url)) for url in frame['website_url'] if pd.notna(url))
+    return [canonical_probe_key(url, by_site=probe_key == 'site') for url in cleaned_urls if url is not None]
+
+def estimate_stages(sample, stages):
+    """
+    Run every stage on the same sample (quietly) and return {stage name: estimate}
+    Each estimate holds the measured seconds per row and the fraction of rows the stage keeps
+    """
+    estimates = {}
+    for stage_name, stage in stages.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            kept, _ = stage(sample)
+        estimates[stage_name] = {
+            'seconds_per_row': stage.seconds / len(sample),
+            'pass_rate': len(kept) / len(sample),
+        }
+    return estimates
+
+def plan_stage_order(estimates):
+    """
+    Order stages by cost per rejected row (seconds per row / fraction rejected), cheapest first
+    For independent row filters this order minimizes the expected cost per row; stages that reject
+    nothing go last, and ties keep the sequential order
+    """
+    def rank(stage_name):
+        estimate = estimates[stage_name]
+        rejected_rate = 1.0 - estimate['pass_rate']
+        if rejected_rate <= 0:
+            return float('inf')
+        return estimate['seconds_per_row'] / rejected_rate
+
+    return sorted(estimates, key=lambda stage_name: (rank(stage_name), SEQUENTIAL_STAGE_ORDER.index(stage_name)))
+
+def estimate_order_cost(stage_order, estimates):
+    """
+    Expected (seconds per row, fraction of rows reaching the website stage) for a stage order
+    """
+    seconds_per_row = 0.0
+    reaching = 1.0
+    website_reach = 1.0
+    for stage_name in stage_order:
+        if stage_name == 'website':
+            website_reach = reaching
+        seconds_per_row += reaching * estimates[stage_name]['seconds_per_row']
+        reaching *= estimates[stage_name]['pass_rate']
+    return seconds_per_row, website_reach
+
+def run_pipeline(input_file, output_file, stage_order=None, intermediate_dir=None, intermediate_format='csv',
+                 plan=False, plan_sample_rows=200, group_size=5, group_key=None, chunksize=None,
+                 concurrency=20, per_host_concurrency=2, timeout=10,
+                 cache_file=None, cache_ttl=24 * 3600, cache_positive_ttl=None, cache_negative_ttl=None,
+                 pool_size=None, host_pool_sizes=None, mode='asyncio', rate_limit=None, rate_burst=None,
+                 domain_min_interval=0.0, probe_key='url', connect_timeout=None, adaptive_timeouts=False,
+                 row_deadline=None, resolve_first=False, dns_hosts_file=None, shard=None,
+                 column_roles_file=None, column_overrides_file=None, metrics_file=None,
+                 verbosity='rows', decision_log_file=None):
+    """
+    Run phases 1a, 1b, 2 and 3 in one process over in-memory frames
+    Phase 1a picks the best row of every company, then the website (1b), manufacturing (2) and
+    capability (3) filters run in stage_order (CHEAP_FIRST_STAGE_ORDER by default, so websites are
+    only checked for companies that pass the CPU filters). The qualified suppliers are the same in
+    any order; with CHEAP_FIRST_STAGE_ORDER each rejected file only lists rows that reached its stage
+    If intermediate_dir is given, every stage's kept rows and rejected records are also written there
+    under the names the separate phase scripts use (see STAGE_FILES), as intermediate_format files
+    ('csv', 'parquet' or 'arrow'). The input and output formats follow their file extensions
+    With plan set, stage_order is chosen instead from each stage's cost and selectivity measured on
+    the first plan_sample_rows phase 1a rows (see plan_stage_order), and the run report compares the
+    estimated and actual website checks saved against SEQUENTIAL_STAGE_ORDER (the actual checks
+    include the sample's checks the run did not need). Sampled websites are remembered for the run
+    (in memory when no cache_file is given), so none is checked twice
+    Website checks share one PooledSession, rate limiter and DomainScheduler (pool_size, host_pool_sizes,
+    mode, rate_limit, rate_burst and domain_min_interval as in process_supplier_data_pragmatic), and
+    rows with the same canonical probe key share one probe for the whole run (see probe_key there);
+    connect_timeout, adaptive_timeouts and row_deadline set up one TimeoutPolicy for the run, and
+    resolve_first and dns_hosts_file one CachingResolver, as there
+    With chunksize set, the input is streamed in chunks of that many rows and qualified suppliers are
+    appended to output_file as they are produced; their count is returned instead of a DataFrame
+    With shard set to (k, N) or 'k/N', only the companies of shard k of N of the input are run (see
+    shard_of_rows: contiguous, company-aligned row ranges, the same on every node; with group_key
+    every company's rows must be contiguous, or ValueError is raised), and a manifest
+    of the run's counts, score distributions and output checksum is written next to output_file.
+    shard_manifest.merge_shards combines the outputs of all N shards into the output and summary of
+    one run over the whole input; shard (0, 1) writes that run's manifest
+    column_roles_file caches the detected columns per input schema, so later runs over the same
+    schema skip detection, and column_overrides_file pins them by hand (see ColumnRoleCache)
+    With metrics_file set, the wall and CPU time of every stage and scoring function, the rows in
+    and out of every stage, probe outcomes and HTTP latency histograms are written there as a JSON
+    report at the end (see RunMetrics)
+    verbosity 'rows' prints the decision of every company at every stage, 'progress' a progress line
+    over the input rows every few seconds instead and 'quiet' neither; with decision_log_file set,
+    every decision is also saved there as a JSON line tagged with its phase (see ProgressReporter)
+    """
+    if shard is not None:
+        shard_index, shards = parse_shard(shard)
+    stage_order = list(stage_order or CHEAP_FIRST_STAGE_ORDER)
+    if sorted(stage_order) != sorted(SEQUENTIAL_STAGE_ORDER):
+        raise ValueError(f"stage_order must order the stages {SEQUENTIAL_STAGE_ORDER}, got {stage_order}")
+
+    print("Starting fused pipeline" + (" (planned stage order)" if plan else ": Phase 1a → " + " → ".join(stage_order)))
+    print("=" * 70)
+    metrics = RunMetrics() if metrics_file else None
+    reporter = open_progress_reporter('1a', verbosity, decision_log_file)
+
+    # Load the data
+    with stage_timer(metrics, 'read'):
+        if chunksize:
+            reader = open_table_reader(input_file, chunksize)
+            chunk_iter = iter(reader)
+            first_chunk = next(chunk_iter, pd.DataFrame(columns=reader.columns))
+            chunks = chain([first_chunk], timed_chunks(metrics, chunk_iter))
+            total_rows = reader.total_rows
+            print(f"Streaming {total_rows} rows from input file in chunks of {chunksize} rows")
+        else:
+            first_chunk = read_table(input_file)
+            chunks = [first_chunk]
+            total_rows = len(first_chunk)
+            print(f"Loaded {total_rows} rows from input file")
+    if shard is not None:
+        print(f"Running shard {shard_index} of {shards} (0-based)")
+    reporter.total_rows = total_rows
+
+    with stage_timer(metrics, 'detect_columns'):
+        role_cache = open_column_role_cache(column_roles_file, column_overrides_file)
+        website_columns = find_website_columns(first_chunk, role_cache)
+    if not website_columns:
+        print("❌ No columns with website information found. Cannot proceed with selection.")
+        close_progress_reporter(reporter)
+        return None
+
+    # Intermediate outputs are only written when asked for
+    writers = {}
+    if intermediate_dir:
+        os.makedirs(intermediate_dir, exist_ok=True)
+        for stage_name, file_names in STAGE_FILES.items():
+            writers[stage_name] = tuple(
+                open_table_appender(os.path.join(intermediate_dir, file_name.replace('.csv', '.' + intermediate_format)))
+                if file_name else None
+                for file_name in file_names
+            )
+    output_writer = open_table_appender(output_file)
+
+    start_time = time.time()
+    cache = None
+    if cache_file:
+        cache = WebsiteCheckCache(cache_file, ttl=cache_ttl,
+                                  positive_ttl=cache_positive_ttl, negative_ttl=cache_negative_ttl)
+    elif plan:
+        # Keep the sample's website checks for the main run
+        cache = WebsiteCheckCache(':memory:', ttl=float('inf'))
+
+    timeout_policy = TimeoutPolicy(timeout, connect_timeout, adaptive=adaptive_timeouts,
+                                   deadline=row_deadline)
+    resolver = None
+    if resolve_first:
+        resolver = CachingResolver(hosts_file_lookup(dns_hosts_file) if dns_hosts_file else None)
+    session = PooledSession(pool_size=pool_size or per_host_concurrency, host_pool_sizes=host_pool_sizes,
+                            connect_observer=timeout_policy.observe_connect)
+    rate_limiter = TokenBucket(rate_limit, rate_burst) if rate_limit else None
+    scheduler = DomainScheduler(per_domain_concurrency=per_host_concurrency, min_interval=domain_min_interval)
+    probe_results = {}
+    stage_options = {'concurrency': concurrency, 'per_host_concurrency': per_host_concurrency,
+                     'timeout': timeout, 'cache': cache, 'session': session,
+                     'mode': mode, 'rate_limiter': rate_limiter, 'scheduler': scheduler,
+                     'probe_key': probe_key, 'probe_results': probe_results, 'timeout_policy': timeout_policy,
+                     'resolver': resolver, 'role_cache': role_cache}
+
+    estimates = None
+    sample_keys = set()  # Probe keys the planner checked on its sample
+    if plan:
+        # Phase 1a on the head of the input gives the sample every stage is measured on
+        with contextlib.redirect_stdout(io.StringIO()):
+            sample_head, _ = split_complete_groups(first_chunk.head(plan_sample_rows * group_size), group_size, group_key)
+            sample, _ = select_best_rows(sample_head, website_columns, calculate_row_scores(sample_head), group_size, group_key)
+        sample = sample.head(plan_sample_rows).reset_index(drop=True).reindex(columns=OUTPUT_COLUMNS)
+
+        if len(sample):
+            estimates = estimate_stages(sample, build_stages(OUTPUT_COLUMNS, rejected_info=False, **stage_options))
+            sample_keys.update(website_probe_keys(sample, probe_key))
+            stage_order = plan_stage_order(estimates)
+            sequential_cost, _ = estimate_order_cost(SEQUENTIAL_STAGE_ORDER, estimates)
+            planned_cost, planned_reach = estimate_order_cost(stage_order, estimates)
+
+            print(f"\nStage estimates from a sample of {len(sample)} Phase 1a rows:")
+            for stage_name in SEQUENTIAL_STAGE_ORDER:
+                estimate = estimates[stage_name]
+                print(f"  • {stage_name}: {estimate['seconds_per_row'] * 1000:.2f} ms per row, "
+                      f"keeps {estimate['pass_rate']:.1%}")
+            print(f"Planned stage order: Phase 1a → {' → '.join(stage_order)}")
+            print(f"Estimated cost per row: {planned_cost * 1000:.2f} ms "
+                  f"(sequential order: {sequential_cost * 1000:.2f} ms)")
+            print(f"Estimated website checks saved: {1.0 - planned_reach:.1%}")
+        else:
+            print("\n⚠️  No Phase 1a rows in the planning sample, keeping the given stage order")
+
+    stages = build_stages(OUTPUT_COLUMNS, metrics=metrics, reporter=reporter,
+                          rejected_info=bool(intermediate_dir), **stage_options)
+    score_rows = timed(metrics, calculate_row_scores)
+    select_rows = timed(metrics, select_best_rows)
+    report_selection = timed(metrics, report_company_selection)
+    companies = 0
+    selected_rows = 0
+    rows_seen = 0
+    shard_keys = set()  # Company keys of earlier frames, to check a sharded keyed input is contiguous
+    selection_scores = {}
+    sequential_keys = set()  # Probe keys the website stage would see first in SEQUENTIAL_STAGE_ORDER
+    website_keys = set()
+    website_urls = 0
+    qualified_frames = []
+    sample_rejections = []
+
+    def run_chunk(frame):
+        nonlocal companies, selected_rows, website_urls, rows_seen
+        input_rows = len(frame)
+
+        # Frames hold whole companies in input order, so their input row positions are known
+        if shard is not None:
+            in_shard = shard_of_rows(frame, rows_seen, total_rows, shards, group_size, group_key,
+                                     shard_keys) == shard_index
+            rows_seen += len(frame)
+            frame = frame[in_shard]
+            if len(frame) == 0:
+                reporter.advance(input_rows)
+                return 0
+
+        # Phase 1a: best row of every company
+        with stage_timer(metrics, 'phase1a'):
+            row_scores = score_rows(frame)
+            selected, groups = select_rows(frame, website_columns, row_scores, group_size, group_key)
+            report_selection(frame, selected, groups, sample_rejections, reporter)
+        if metrics is not None:
+            metrics.add_rows('phase1a', len(frame), len(selected))
+        companies += len(groups)
+        merge_counts(selection_scores, selected['selection_score'].value_counts(sort=False).to_dict())
+        if 'rows' in writers:
+            writers['rows'][0].append(selected)
+
+        # Number rows like a fresh read of the phase 1a output, and give every row the phase 1b columns
+        selected.index = pd.RangeIndex(selected_rows, selected_rows + len(selected))
+        selected_rows += len(selected)
+        frame = selected.reindex(columns=OUTPUT_COLUMNS)
+        sequential_keys.update(website_probe_keys(frame, probe_key))
+
+        for stage_name in stage_order:
+            if len(frame) == 0:
+                break
+            if stage_name == 'website':
+                probe_keys = website_probe_keys(frame, probe_key)
+                website_urls += len(probe_keys)
+                website_keys.update(probe_keys)
+            frame, rejected = stages[stage_name](frame)
+            if stage_name in writers:
+                kept_writer, rejected_writer = writers[stage_name]
+                kept_writer.append(frame)
+                rejected_writer.append(pd.DataFrame(rejected))
+
+        if chunksize:
+            with stage_timer(metrics, 'write'):
+                output_writer.append(frame)
+        else:
+            qualified_frames.append(frame)
+        reporter.advance(input_rows)
+        return len(frame)
+
+    qualified_count = 0
+    try:
+        pending = first_chunk.iloc[0:0]
+        for chunk in chunks:
+            if chunksize:
+                if len(pending):
+                    chunk = pd.concat([pending, chunk])
+                chunk, pending = split_complete_groups(chunk, group_size, group_key)
+            qualified_count += run_chunk(chunk)
+
+        # The last company of a key-grouped stream is complete once the input ends
+        if group_key is not None and len(pending):
+            qualified_count += run_chunk(pending)
+    finally:
+        if cache is not None:
+            cache.close()
+        session.close()
+        output_writer.close()
+        for stage_writers in writers.values():
+            for writer in stage_writers:
+                if writer is not None:
+                    writer.close()
+        close_progress_reporter(reporter)
+
+    total_time = time.time() - start_time
+    sequential_checks = len(sequential_keys)
+    website_checks = len(website_keys)
+    # Sample checks the run reused cost nothing more; the others are checks of their own
+    sample_checks = len(sample_keys - website_keys)
+    total_checks = website_checks + sample_checks
+    print("\n" + "=" * 70)
+    print("FUSED PIPELINE COMPLETE")
+    print("=" * 70)
+    print(f"Total processing time: {total_time:.1f} seconds")
+    print(f"Companies: {companies}, best rows selected in Phase 1a: {selected_rows}")
+    for stage_name in stage_order:
+        stage = stages[stage_name]
+        print(f"  • {stage_name}: {stage.rows_in} in → {stage.rows_out} kept ({stage.seconds:.1f} seconds)")
+    sample_text = f", {sample_checks} of them only for the planning sample" if sample_checks else ""
+    print(f"Website checks: {total_checks}{sample_text} (sequential order: {sequential_checks}, "
+          f"saved: {sequential_checks - total_checks})")
+    if estimates is not None:
+        _, planned_reach = estimate_order_cost(stage_order, estimates)
+        print(f"Website checks saved, estimated: {(1.0 - planned_reach) * sequential_checks:.0f}, "
+              f"actual: {sequential_checks - total_checks}")
+    print_check_reports(website_urls, website_checks, session, scheduler, timeout_policy, concurrency,
+                        cache if cache_file else None, resolver, rate_limiter)
+
+    result = qualified_count
+    if qualified_count and not chunksize:
+        result = pd.concat(qualified_frames)
+        with stage_timer(metrics, 'write'):
+            write_table(result, output_file)
+
+    if shard is not None:
+        counts = {
+            'companies': companies, 'selected_rows': selected_rows, 'qualified': qualified_count,
+            'stages_in': {stage_name: stages[stage_name].rows_in for stage_name in stage_order},
+            'stages_out': {stage_name: stages[stage_name].rows_out for stage_name in stage_order},
+        }
+        score_distributions = {'selection': selection_scores}
+        for stage_name in stage_order:
+            if stages[stage_name].score_distribution is not None:
+                score_distributions[stage_name] = stages[stage_name].score_distribution
+        input_info = {'file': os.path.basename(input_file), 'size': os.path.getsize(input_file), 'rows': total_rows,
+                      'group_size': group_size, 'group_key': group_key}
+        write_manifest(output_file, (shard_index, shards), input_info, stage_order, counts,
+                       score_distributions, qualified_count)
+
+    if metrics is not None:
+        metrics.count('companies', companies)
+        metrics.count('website_checks', total_checks)
+        metrics.count('website_checks_sequential_order', sequential_checks)
+    run_info = {'phase': 'fused', 'input_file': input_file, 'output_file': output_file, 'rows': total_rows,
+                'stage_order': stage_order, 'chunksize': chunksize, 'shard': None if shard is None else [shard_index, shards]}
+    save_metrics(metrics, metrics_file, run_info)
+
+    if not qualified_count:
+        print("❌ NO COMPANIES QUALIFIED AS SUPPLIERS!")
+        return None
+
+    print(f"Qualified suppliers: {qualified_count}")
+    print(f"Output saved to: {output_file}")
+    if intermediate_dir:
+        print(f"Intermediate files saved to: {intermediate_dir}")
+    return result
+
+if __name__ == "__main__":
+    # Configuration
+    INPUT_FILE = "presales_data_sample.csv"
+    OUTPUT_FILE = "phase3_qualified_suppliers.csv"
+    STAGE_ORDER = CHEAP_FIRST_STAGE_ORDER   # Or SEQUENTIAL_STAGE_ORDER to match the separate scripts' run order
+    PLAN = False               # Or True to order the stages from costs measured on a sample
+    PLAN_SAMPLE_ROWS = 200     # Phase 1a rows the planner measures every stage on
+    INTERMEDIATE_DIR = None    # Or a directory to also write every stage's outputs
+    INTERMEDIATE_FORMAT = 'csv'   # Or 'parquet' / 'arrow' (needs pyarrow)
+    GROUP_SIZE = 5             # Rows per company block
+    GROUP_KEY = None           # Or the name of a column identifying each row's company
+    CHUNKSIZE = None           # Set to e.g. 50_000 to stream large inputs in chunks
+    CONCURRENCY = 20           # Website checks in flight at once
+    PER_HOST_CONCURRENCY = 2   # Checks in flight against the same registered domain
+    CACHE_FILE = "phase1_website_cache.sqlite"
+    CACHE_POSITIVE_TTL = 7 * 24 * 3600   # Reachable sites are re-checked weekly
+    CACHE_NEGATIVE_TTL = 24 * 3600       # Unreachable sites are re-checked daily
+    POOL_SIZE = None           # Open connections kept per host (default: PER_HOST_CONCURRENCY)
+    HOST_POOL_SIZES = {}       # Larger pools for hosts many suppliers share, e.g. {'sites.google.com': 8}
+    MODE = 'asyncio'           # Or 'threads' where asyncio cannot be used (CONCURRENCY worker threads)
+    RATE_LIMIT = 10            # Website checks per second, shared by all workers (the old pace), or None for no cap
+    RATE_BURST = None          # Checks allowed at once before the cap applies (default: RATE_LIMIT)
+    DOMAIN_MIN_INTERVAL = 0.5  # Seconds between check starts against the same registered domain
+    PROBE_KEY = 'url'          # Or 'site' to probe each host once, whatever page the rows link to
+    TIMEOUT = 10               # Seconds a request attempt may wait for a response (the adaptive ceiling)
+    CONNECT_TIMEOUT = 5        # Seconds a connection may take to open
+    ADAPTIVE_TIMEOUTS = False  # Or True to lower both timeouts to 3x the p95 latency seen so far
+    ROW_DEADLINE = 20          # Seconds one website probe may take over HEAD, GET and the SSL retry
+    RESOLVE_FIRST = False      # Or True to resolve hosts in batches first and reject those that do not resolve
+    DNS_HOSTS_FILE = None      # Or a hosts-format file to resolve from instead of DNS (offline runs)
+    SHARD = None               # Or 'k/N' to run shard k of N (0-based) on this node; merge with shard_manifest.py
+    COLUMN_ROLES_FILE = "column_roles_cache.json"  # Detected columns per input schema, or None to detect every run
+    COLUMN_OVERRIDES_FILE = None  # Or a JSON file pinning columns, e.g. {"website": ["homepage"]}
+    METRICS_FILE = "pipeline_metrics.json"  # JSON timing report of the run, or None
+    VERBOSITY = 'progress'     # 'rows' prints every company's decision at every stage, 'quiet' only the summary
+    DECISION_LOG_FILE = "pipeline_decisions.jsonl"  # Every decision of every stage as JSON lines, or None
+    if SHARD is not None:
+        OUTPUT_FILE = shard_output_path(OUTPUT_FILE, SHARD)
+        if METRICS_FILE:
+            METRICS_FILE = shard_output_path(METRICS_FILE, SHARD)
+        if DECISION_LOG_FILE:
+            DECISION_LOG_FILE = shard_output_path(DECISION_LOG_FILE, SHARD)
+
+    # Verify input file exists
+    if not os.path.exists(INPUT_FILE):
+        print(f"❌ Error: Input file '{INPUT_FILE}' not found.")
+        print("Please ensure the file is in the current directory or provide the correct path.")
+    else:
+        result = run_pipeline(
+            INPUT_FILE, OUTPUT_FILE, stage_order=STAGE_ORDER, intermediate_dir=INTERMEDIATE_DIR,
+            intermediate_format=INTERMEDIATE_FORMAT, plan=PLAN, plan_sample_rows=PLAN_SAMPLE_ROWS,
+            group_size=GROUP_SIZE, group_key=GROUP_KEY, chunksize=CHUNKSIZE,
+            concurrency=CONCURRENCY, per_host_concurrency=PER_HOST_CONCURRENCY,
+            cache_file=CACHE_FILE, cache_positive_ttl=CACHE_POSITIVE_TTL, cache_negative_ttl=CACHE_NEGATIVE_TTL,
+            pool_size=POOL_SIZE, host_pool_sizes=HOST_POOL_SIZES,
+            mode=MODE, rate_limit=RATE_LIMIT, rate_burst=RATE_BURST, domain_min_interval=DOMAIN_MIN_INTERVAL,
+            probe_key=PROBE_KEY, timeout=TIMEOUT, connect_timeout=CONNECT_TIMEOUT,
+            adaptive_timeouts=ADAPTIVE_TIMEOUTS, row_deadline=ROW_DEADLINE, resolve_first=RESOLVE_FIRST,
+            dns_hosts_file=DNS_HOSTS_FILE, shard=SHARD,
+            column_roles_file=COLUMN_ROLES_FILE, column_overrides_file=COLUMN_OVERRIDES_FILE,
+            metrics_file=METRICS_FILE, verbosity=VERBOSITY, decision_log_file=DECISION_LOG_FILE
+        )
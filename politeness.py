@@ -0,0 +1,218 @@
+import asyncio
+import ipaddress
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Second-level labels under which domains are registered (example.co.uk, example.com.au, ...)
+# A small built-in list, enough to keep such suppliers from sharing one 'co.uk' domain
+MULTI_PART_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'ltd.uk', 'plc.uk', 'me.uk',
+    'com.au', 'net.au', 'org.au', 'co.nz', 'org.nz', 'co.za', 'co.jp', 'ne.jp', 'or.jp',
+    'co.in', 'net.in', 'org.in', 'co.kr', 'or.kr', 'com.br', 'com.cn', 'net.cn', 'org.cn',
+    'com.mx', 'com.tr', 'com.sg', 'com.hk', 'com.tw', 'com.my', 'com.ar', 'com.co', 'co.id', 'co.il',
+}
+
+# Upper bounds (seconds) of the queue wait histogram buckets; longer waits land in the last one
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+def registered_domain(host):
+    """
+    Registered domain of a host ('shop.example.co.uk' -> 'example.co.uk')
+    IP addresses are kept whole, and an explicit port stays part of the domain, since a different
+    port is a different server
+    """
+    host = host.lower().strip('.')
+    port = ''
+    if host.count(':') == 1:
+        host, port = host.split(':')
+        port = ':' + port
+
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return host + port
+    except ValueError:
+        pass
+
+    labels = host.split('.')
+    if len(labels) <= 2:
+        return host + port
+    keep = 3 if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES else 2
+    return '.'.join(labels[-keep:]) + port
+
+class DomainScheduler:
+    """
+    Politeness scheduler for website checks, shared by every batch of one run
+    Pending checks are queued per registered domain and started round-robin across domains, so one
+    domain with many suppliers never blocks the others. A domain has at most per_domain_concurrency
+    checks in flight, and its check starts are at least min_interval seconds apart (also across
+    batches); workers caps the checks in flight overall
+    Queue depth and wait-time metrics accumulate over the whole run (see metrics / report); waits
+    are kept as a running total, maximum and WAIT_BUCKETS histogram, so memory does not grow with it
+    """
+
+    def __init__(self, per_domain_concurrency=2, min_interval=0.0, domain_of=registered_domain):
+        self.per_domain_concurrency = max(1, int(per_domain_concurrency))
+        self.min_interval = float(min_interval)
+        self.domain_of = domain_of
+        self.checks_started = 0
+        self.max_queue_depth = 0
+        self.queue_depth_total = 0
+        self.wait_total = 0.0
+        self.max_wait = 0.0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS) + 1)
+        self.domains = set()
+        self.busiest_domain = (None, 0)
+        self._next_start = {}
+        self._queued = 0
+
+    def _plan(self, items):
+        """Per-domain queues for one batch of (position, host) items"""
+        queues = {}
+        now = time.monotonic()
+        for position, host in items:
+            domain = self.domain_of(host)
+            queues.setdefault(domain, deque()).append((position, now))
+
+        self.domains.update(queues)
+        self._queued = len(items)
+        self.max_queue_depth = max(self.max_queue_depth, len(items))
+        busiest = max(queues.items(), key=lambda entry: len(entry[1]), default=(None, ()))
+        if len(busiest[1]) > self.busiest_domain[1]:
+            self.busiest_domain = (busiest[0], len(busiest[1]))
+        return queues
+
+    def _next_ready(self, queues, rotation, active, now):
+        """Pop the next (position, domain) allowed to start now, rotating over domains; None if none is"""
+        for _ in range(len(rotation)):
+            domain = rotation[0]
+            rotation.rotate(-1)
+            if active.get(domain, 0) >= self.per_domain_concurrency:
+                continue
+            if now < self._next_start.get(domain, 0.0):
+                continue
+
+            position, enqueued_at = queues[domain].popleft()
+            if not queues[domain]:
+                del queues[domain]
+                rotation.remove(domain)
+            active[domain] = active.get(domain, 0) + 1
+            self._next_start[domain] = now + self.min_interval
+            self._observe_wait(now - enqueued_at)
+            self.queue_depth_total += self._queued
+            self._queued -= 1
+            self.checks_started += 1
+            return position, domain
+        return None
+
+    def _observe_wait(self, seconds):
+        bucket = 0
+        while bucket < len(WAIT_BUCKETS) and seconds > WAIT_BUCKETS[bucket]:
+            bucket += 1
+        self.wait_counts[bucket] += 1
+        self.wait_total += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    def wait_percentile(self, percent):
+        """Upper bound of the histogram bucket holding the given percentile of the waits (at most max_wait)"""
+        if not self.checks_started:
+            return 0.0
+        rank = percent / 100 * self.checks_started
+        seen = 0
+        for bound, count in zip(WAIT_BUCKETS, self.wait_counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_wait)
+        return self.max_wait
+
+    def _seconds_until_ready(self, queues, active, now):
+        """Time until a domain with free slots may start its next check (None: wait for a check to finish)"""
+        waits = [self._next_start.get(domain, 0.0) - now for domain in queues
+                 if active.get(domain, 0) < self.per_domain_concurrency]
+        return max(0.0, min(waits)) if waits else None
+
+    def run_threads(self, items, workers, check, on_done):
+        """
+        Run check(position) for every (position, host) item on a thread pool of `workers` threads
+        on_done(position, result) is called on the calling thread as each check finishes
+        """
+        queues = self._plan(items)
+        rotation = deque(queues)
+        active = {}
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while queues or in_flight:
+                now = time.monotonic()
+                while len(in_flight) < workers:
+                    ready = self._next_ready(queues, rotation, active, now)
+                    if ready is None:
+                        break
+                    in_flight[executor.submit(check, ready[0])] = ready
+
+                timeout = self._seconds_until_ready(queues, active, now) if len(in_flight) < workers else None
+                if not in_flight:
+                    time.sleep(timeout or 0.0)
+                    continue
+
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position, domain = in_flight.pop(future)
+                    active[domain] -= 1
+                    on_done(position, future.result())
+
+    async def run_async(self, items, workers, check, on_done):
+        """
+        Same as run_threads, driven by an asyncio event loop (the checks still run on worker threads)
+        on_done(position, result) is called on the event loop as each check finishes
+        """
+        loop = asyncio.get_running_loop()
+        queues = self._plan(items)
+        rotation = deque(queues)
+        active = {}
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while queues or in_flight:
+                now = time.monotonic()
+                while len(in_flight) < workers:
+                    ready = self._next_ready(queues, rotation, active, now)
+                    if ready is None:
+                        break
+                    in_flight[loop.run_in_executor(executor, check, ready[0])] = ready
+
+                timeout = self._seconds_until_ready(queues, active, now) if len(in_flight) < workers else None
+                if not in_flight:
+                    await asyncio.sleep(timeout or 0.0)
+                    continue
+
+                done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    position, domain = in_flight.pop(future)
+                    active[domain] -= 1
+                    on_done(position, future.result())
+
+    def metrics(self):
+        """
+        Scheduler metrics so far: checks, domains, queue depth and queue wait times (seconds)
+        p95_wait is read from the wait histogram (see wait_percentile)
+        """
+        return {
+            'checks_started': self.checks_started,
+            'domains': len(self.domains),
+            'max_queue_depth': self.max_queue_depth,
+            'mean_queue_depth': self.queue_depth_total / self.checks_started if self.checks_started else 0.0,
+            'busiest_domain': self.busiest_domain[0],
+            'busiest_domain_checks': self.busiest_domain[1],
+            'mean_wait': self.wait_total / self.checks_started if self.checks_started else 0.0,
+            'p95_wait': self.wait_percentile(95),
+            'max_wait': self.max_wait,
+        }
+
+    def report(self):
+        """One-line summary of the scheduler metrics"""
+        metrics = self.metrics()
+        return (f"Politeness scheduler: {metrics['checks_started']} checks over {metrics['domains']} domains, "
+                f"queue depth max {metrics['max_queue_depth']} / mean {metrics['mean_queue_depth']:.1f} "
+                f"(busiest domain {metrics['busiest_domain']}: {metrics['busiest_domain_checks']} queued), "
+                f"queue wait mean {metrics['mean_wait']:.2f}s / p95 {metrics['p95_wait']:.2f}s / max {metrics['max_wait']:.2f}s")
@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+
+# How much of a run is printed besides its summaries: nothing ('quiet'), a progress line every
+# few seconds ('progress'), or one line per row decision ('rows', the historical output)
+VERBOSITY_LEVELS = ('quiet', 'progress', 'rows')
+
+# Minimum seconds between two progress lines
+PROGRESS_INTERVAL = 5.0
+# Rows counted between two looks at the clock, so advance() is mostly one addition
+PROGRESS_CHECK_ROWS = 1_000
+# Decision records kept in memory before they are written to the decision log in one go
+DECISION_BUFFER_ROWS = 10_000
+
+class DecisionLog:
+    """
+    JSON Lines file with one record (a JSON object) per row decision, truncated when opened
+    Records are buffered and written buffer_rows at a time, so logging a row costs a list append
+    and its share of one write; safe to share between the worker threads of one run
+    """
+
+    def __init__(self, path, buffer_rows=DECISION_BUFFER_ROWS):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.records = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def log(self, records):
+        """Add a list of records (dicts)"""
+        with self._lock:
+            self._buffer.extend(records)
+            self.records += len(records)
+            if len(self._buffer) >= self.buffer_rows:
+                self._write()
+
+    def _write(self):
+        if self._buffer:
+            self._file.write("".join(json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                                     for record in self._buffer))
+            self._buffer = []
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._write()
+                self._file.close()
+
+    def report(self):
+        """One-line summary of the log"""
+        return f"Decision log: {self.records} row decisions saved to {self.path}"
+
+class ProgressReporter:
+    """
+    Row decisions and progress of one phase run, printed at one of VERBOSITY_LEVELS
+    decide() prints a row's decision line at 'rows' verbosity and adds its record to the decision
+    log, if any. Callers build lines and records only when wants_decisions is set, so a quiet run
+    without a decision log pays nothing per row
+    advance() counts finished rows and at 'progress' verbosity prints a progress line (rows done,
+    rate, time left) at most every interval seconds
+    """
+
+    def __init__(self, phase, verbosity='rows', decision_log=None, total_rows=None,
+                 interval=PROGRESS_INTERVAL, check_rows=PROGRESS_CHECK_ROWS):
+        check_verbosity(verbosity)
+        self.phase = phase
+        self.verbosity = verbosity
+        self.decision_log = decision_log
+        self.total_rows = total_rows
+        self.interval = interval
+        self.check_rows = check_rows
+        self.print_rows = verbosity == 'rows'
+        self.print_progress = verbosity == 'progress'
+        self.wants_decisions = self.print_rows or decision_log is not None
+        self.rows_done = 0
+        self._printed_rows = None
+        self._records = None  # Records kept for drain() instead of logged, in ShardPool workers
+        self._started = self._last_print = time.monotonic()
+        self._next_check = check_rows
+
+    def _log(self, records):
+        records = [{'phase': self.phase, **record} for record in records]
+        if self._records is not None:
+            self._records.extend(records)
+        elif self.decision_log is not None:
+            self.decision_log.log(records)
+
+    def decide(self, line, record):
+        """One row's decision: the line printed for it and its decision log record"""
+        if self.print_rows:
+            print(line)
+        if self.decision_log is not None or self._records is not None:
+            self._log([record])
+
+    def decide_many(self, lines, records):
+        """The decisions of many rows at once, printed as one block"""
+        if self.print_rows and lines:
+            print("\n".join(lines))
+        if self.decision_log is not None or self._records is not None:
+            self._log(records)
+
+    def advance(self, rows=1):
+        """Count rows as finished, printing a progress line when one is due"""
+        self.rows_done += rows
+        if self.print_progress and self.rows_done >= self._next_check:
+            self._next_check = self.rows_done + self.check_rows
+            now = time.monotonic()
+            if now - self._last_print >= self.interval:
+                self._last_print = now
+                self._printed_rows = self.rows_done
+                print(self.progress_line(now))
+
+    def progress_line(self, now=None):
+        elapsed = (now or time.monotonic()) - self._started
+        rate = self.rows_done / elapsed if elapsed > 0 else 0.0
+        if self.total_rows:
+            line = (f"Progress: {self.rows_done}/{self.total_rows} rows "
+                    f"({self.rows_done / self.total_rows:.1%}), {rate:.0f} rows/s")
+            if rate > 0:
+                line += f", about {max(0, self.total_rows - self.rows_done) / rate:.0f} seconds left"
+            return line
+        return f"Progress: {self.rows_done} rows, {rate:.0f} rows/s"
+
+    def finish(self):
+        """Print the last progress line (at 'progress' verbosity), unless it was just printed"""
+        if self.print_progress and self._printed_rows != self.rows_done:
+            print(self.progress_line())
+
+    def for_phase(self, phase):
+        """Reporter for another phase of the same run: same decision lines and log, no progress lines"""
+        return ProgressReporter(phase, 'rows' if self.print_rows else 'quiet', self.decision_log)
+
+    def worker_copy(self):
+        """
+        Reporter for ShardPool workers: prints decision lines like this one (the pool replays them)
+        and keeps records for drain() instead of logging them; it prints no progress lines
+        """
+        copy = ProgressReporter(self.phase, 'rows' if self.print_rows else 'quiet')
+        if self.decision_log is not None:
+            copy._records = []
+            copy.wants_decisions = True
+        return copy
+
+    def drain(self):
+        """Records kept by a worker copy since the last drain()"""
+        records = self._records or []
+        if self._records is not None:
+            self._records = []
+        return records
+
+    def log_records(self, records):
+        """Log records drained from a worker copy"""
+        if self.decision_log is not None and records:
+            self.decision_log.log(records)
+
+def check_verbosity(verbosity):
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"verbosity must be one of {VERBOSITY_LEVELS}, got {verbosity!r}")
+
+def open_progress_reporter(phase, verbosity='rows', decision_log_file=None, check_rows=PROGRESS_CHECK_ROWS):
+    """A ProgressReporter for one phase run, logging decisions to decision_log_file if given"""
+    check_verbosity(verbosity)
+    decision_log = DecisionLog(decision_log_file) if decision_log_file else None
+    return ProgressReporter(phase, verbosity, decision_log, check_rows=check_rows)
+
+def close_progress_reporter(reporter):
+    """Print the last progress line, then write out and close the decision log and print its summary"""
+    reporter.finish()
+    if reporter.decision_log is not None:
+        reporter.decision_log.close()
+        print(reporter.decision_log.report())
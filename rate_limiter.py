@@ -0,0 +1,48 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker of a run
+    Tokens refill at `rate` per second up to `capacity` (default: one second's worth), so short
+    bursts are allowed while the long-run rate never exceeds `rate`
+    acquire() blocks the calling thread until a token is available
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self):
+        """Take one token, waiting as long as needed; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.acquired += 1
+                    self.waited_seconds += waited
+                    return waited
+                wait = (1.0 - self._tokens) / self.rate
+
+            # Sleep outside the lock so other workers can refill and take tokens meanwhile
+            time.sleep(wait)
+            waited += wait
+
+    def report(self):
+        """One-line summary of the rate limiting"""
+        return (f"Rate limit: {self.rate:g} checks/s, {self.acquired} checks, "
+                f"{self.waited_seconds:.1f} seconds spent waiting for tokens (summed over workers)")
@@ -0,0 +1,268 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from functools import wraps
+
+# Upper bounds (seconds) of the latency histogram buckets; slower ones land in '+Inf'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Wall or CPU time changes smaller than this are not reported by compare_reports
+REGRESSION_THRESHOLD = 0.10
+
+def _new_histogram():
+    return {'counts': [0] * (len(LATENCY_BUCKETS) + 1), 'sum': 0.0, 'max': 0.0}
+
+class _Timer:
+    """Context manager adding the wall and thread CPU time of its block to one timer of RunMetrics"""
+    __slots__ = ('timers', 'name', 'metrics', 'wall', 'cpu')
+
+    def __init__(self, metrics, timers, name):
+        self.metrics = metrics
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.timers, self.name, time.perf_counter() - self.wall,
+                              time.thread_time() - self.cpu)
+
+class RunMetrics:
+    """
+    Timing and counters of one run, written out as a JSON report (see write_report)
+    Stages (reading, scoring, writing, ...) and functions each keep their calls and wall and CPU
+    seconds; CPU time is the CPU of the calling thread, so checks running on worker threads are
+    charged their own CPU only. Stages also keep the rows that went in and out of them
+    Counters and latency histograms (LATENCY_BUCKETS) are kept by name
+    Safe to share between the worker threads of one run; worker processes send their timings back
+    (see ShardPool) or their counts() to add_counts()
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.functions = {}
+        self.rows = {}
+        self.counters = {}
+        self.histograms = {}
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._children_started = self._children_cpu()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _children_cpu():
+        times = os.times()
+        return times.children_user + times.children_system
+
+    def add_time(self, timers, name, wall, cpu, calls=1):
+        """Add calls taking wall and cpu seconds to timer name of timers (self.stages or self.functions)"""
+        with self._lock:
+            timer = timers.get(name)
+            if timer is None:
+                timer = timers[name] = [0, 0.0, 0.0]
+            timer[0] += calls
+            timer[1] += wall
+            timer[2] += cpu
+
+    def stage(self, name):
+        """Context manager timing a block as (one call of) stage name"""
+        return _Timer(self, self.stages, name)
+
+    def function(self, name):
+        """Context manager timing a block as one call of function name"""
+        return _Timer(self, self.functions, name)
+
+    def timed(self, function, name=None):
+        """function wrapped so every call is timed under name (default: its __name__)"""
+        name = name or function.__name__
+        functions = self.functions
+
+        @wraps(function)
+        def timed_function(*args, **kwargs):
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_time(functions, name, time.perf_counter() - wall, time.thread_time() - cpu)
+        return timed_function
+
+    def timed_iter(self, iterable, name):
+        """Iterate over iterable, timing every step (e.g. reading the next chunk) as stage name"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def add_rows(self, stage, rows_in, rows_out):
+        """Count rows_in rows going into stage and rows_out coming out of it"""
+        with self._lock:
+            rows = self.rows.setdefault(stage, [0, 0])
+            rows[0] += rows_in
+            rows[1] += rows_out
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        """Add one latency of seconds to histogram name"""
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = _new_histogram()
+            histogram['counts'][bucket] += 1
+            histogram['sum'] += seconds
+            histogram['max'] = max(histogram['max'], seconds)
+
+    def counts(self):
+        """Everything recorded so far, for add_counts (e.g. from worker processes)"""
+        with self._lock:
+            return {'stages': {name: list(timer) for name, timer in self.stages.items()},
+                    'functions': {name: list(timer) for name, timer in self.functions.items()},
+                    'rows': {name: list(rows) for name, rows in self.rows.items()},
+                    'counters': dict(self.counters),
+                    'histograms': {name: {**histogram, 'counts': list(histogram['counts'])}
+                                   for name, histogram in self.histograms.items()}}
+
+    def add_counts(self, counts):
+        for kind, timers in (('stages', self.stages), ('functions', self.functions)):
+            for name, (calls, wall, cpu) in counts[kind].items():
+                self.add_time(timers, name, wall, cpu, calls)
+        for name, (rows_in, rows_out) in counts['rows'].items():
+            self.add_rows(name, rows_in, rows_out)
+        for name, amount in counts['counters'].items():
+            self.count(name, amount)
+        with self._lock:
+            for name, part in counts['histograms'].items():
+                histogram = self.histograms.setdefault(name, _new_histogram())
+                histogram['counts'] = [total + count for total, count in zip(histogram['counts'], part['counts'])]
+                histogram['sum'] += part['sum']
+                histogram['max'] = max(histogram['max'], part['max'])
+
+    def as_dict(self, run_info=None):
+        """The JSON report: run totals, stages, functions, counters and histograms"""
+        counts = self.counts()
+
+        def timer_entry(calls, wall, cpu):
+            return {'calls': calls, 'wall_seconds': round(wall, 6), 'cpu_seconds': round(cpu, 6),
+                    'mean_ms': round(wall / calls * 1000, 4) if calls else 0.0}
+
+        stages = {}
+        for name, timer in counts['stages'].items():
+            stages[name] = timer_entry(*timer)
+        for name, (rows_in, rows_out) in counts['rows'].items():
+            stages.setdefault(name, timer_entry(0, 0.0, 0.0)).update({'rows_in': rows_in, 'rows_out': rows_out})
+
+        histograms = {}
+        for name, histogram in counts['histograms'].items():
+            total = sum(histogram['counts'])
+            histograms[name] = {
+                'count': total, 'sum_seconds': round(histogram['sum'], 6),
+                'mean_seconds': round(histogram['sum'] / total, 6) if total else 0.0,
+                'max_seconds': round(histogram['max'], 6),
+                'buckets': {**{f"{bound:g}": count for bound, count in zip(LATENCY_BUCKETS, histogram['counts'])},
+                            '+Inf': histogram['counts'][-1]},
+            }
+
+        return {
+            'run': {**(run_info or {}), 'started_at': self.started_at,
+                    'wall_seconds': round(time.perf_counter() - self._wall_started, 6),
+                    'cpu_seconds': round(time.process_time() - self._cpu_started, 6),
+                    'child_cpu_seconds': round(self._children_cpu() - self._children_started, 6),
+                    'python': sys.version.split()[0]},
+            'stages': stages,
+            'functions': {name: timer_entry(*timer) for name, timer in counts['functions'].items()},
+            'counters': counts['counters'],
+            'histograms': histograms,
+        }
+
+    def write_report(self, path, run_info=None):
+        """Write the JSON report to path and return it"""
+        report = self.as_dict(run_info)
+        with open(path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+        return report
+
+    def report(self):
+        """One-line summary of the stages' wall and CPU time"""
+        stages = ", ".join(f"{name} {wall:.2f}s wall / {cpu:.2f}s CPU"
+                           for name, (_, wall, cpu) in self.counts()['stages'].items())
+        return f"Timing: {stages or 'no stages timed'}"
+
+def stage_timer(metrics, name):
+    """metrics.stage(name), or a context manager doing nothing without metrics"""
+    return nullcontext() if metrics is None else metrics.stage(name)
+
+def timed(metrics, function):
+    """metrics.timed(function), or function itself without metrics"""
+    return function if metrics is None else metrics.timed(function)
+
+def timed_chunks(metrics, chunks):
+    """chunks, with the reading of every chunk timed as the 'read' stage when there are metrics"""
+    return chunks if metrics is None else metrics.timed_iter(chunks, 'read')
+
+def save_metrics(metrics, path, run_info=None):
+    """Write the JSON report of metrics to path and print its summary (nothing without metrics)"""
+    if metrics is None:
+        return
+    metrics.write_report(path, run_info)
+    print(metrics.report())
+    print(f"Metrics report saved to: {path}")
+
+def load_report(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Lines comparing the wall and CPU time of the run, its stages and its functions between two
+    JSON reports, for timers that changed by more than threshold (as a fraction of the baseline)
+    """
+    lines = []
+
+    def compare(label, before, after):
+        for measure in ('wall_seconds', 'cpu_seconds'):
+            old, new = before.get(measure, 0.0), after.get(measure, 0.0)
+            if old and abs(new - old) / old > threshold:
+                change = "slower" if new > old else "faster"
+                lines.append(f"{label} {measure.split('_')[0]}: {old:.3f}s → {new:.3f}s "
+                             f"({new / old:.2f}x, {change})")
+
+    compare("run", baseline['run'], current['run'])
+    for kind in ('stages', 'functions'):
+        for name, after in current[kind].items():
+            if name in baseline[kind]:
+                compare(f"{kind[:-1]} {name}", baseline[kind][name], after)
+    return lines
+
+if __name__ == "__main__":
+    # Configuration
+    BASELINE_FILE = "phase3_qualified_suppliers_metrics_baseline.json"  # Report of an earlier run
+    CURRENT_FILE = "phase3_qualified_suppliers_metrics.json"            # Report of the run to check
+
+    for path in (BASELINE_FILE, CURRENT_FILE):
+        if not os.path.exists(path):
+            print(f"❌ Error: Metrics report '{path}' not found.")
+            break
+    else:
+        changes = compare_reports(load_report(BASELINE_FILE), load_report(CURRENT_FILE))
+        print(f"Comparing {CURRENT_FILE} against {BASELINE_FILE} (changes over {REGRESSION_THRESHOLD:.0%})")
+        print("=" * 70)
+        for line in changes or ["No timer changed by more than the threshold"]:
+            print(line)
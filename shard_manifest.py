@@ -0,0 +1,226 @@
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from shard_parallel import group_run_starts, keys_contiguous, merge_counts
+from table_io import derived_table_path, read_table, table_format, write_table
+
+def parse_shard(shard):
+    """(k, N) from a (k, N) pair or a 'k/N' string, k counted from 0"""
+    if isinstance(shard, str):
+        shard = shard.split('/')
+    index, shards = (int(part) for part in shard)
+    if shards < 1 or not 0 <= index < shards:
+        raise ValueError(f"shard must be k/N with 0 <= k < N, got {index}/{shards}")
+    return index, shards
+
+def shard_output_path(output_file, shard):
+    """Output path of shard k of N, e.g. out.csv -> out_shard1of4.csv"""
+    index, shards = parse_shard(shard)
+    return derived_table_path(output_file, f"_shard{index}of{shards}")
+
+def manifest_path(output_file):
+    """Manifest written next to an output file, e.g. out.csv -> out.manifest.json"""
+    return os.path.splitext(output_file)[0] + '.manifest.json'
+
+def check_contiguous_keys(keys, seen_keys):
+    """
+    Raise ValueError unless the rows of every key in keys are contiguous and no key already came up
+    in an earlier frame (the set seen_keys, which the frame's keys are added to)
+    """
+    frame_keys = set(keys.astype(object).where(keys.notna(), None).unique().tolist())
+    if not keys_contiguous(keys) or not frame_keys.isdisjoint(seen_keys):
+        raise ValueError(f"Sharded runs need the rows of every company together, but some rows sharing a "
+                         f"'{keys.name}' value are not contiguous in the input (sort it by '{keys.name}' first)")
+    seen_keys.update(frame_keys)
+
+def shard_of_rows(frame, start, total_rows, shards, group_size=5, group_key=None, seen_keys=None):
+    """
+    Shard number of every row of frame, whose rows are rows start.. of the input
+    The input is cut into shards contiguous ranges of total_rows / shards rows, and every company
+    goes whole to the shard its first row falls in (its block of group_size rows, or with group_key
+    its run of equal keys, so frame must start on a company's first row). The partition depends
+    only on the input's row count, so every node computes the same one on its own, and the shards'
+    outputs concatenated in shard order are in input order
+    With group_key and several shards, every company's rows must be contiguous or a run would split
+    it over shards: ValueError is raised otherwise (see check_contiguous_keys; pass the same
+    seen_keys set for every frame of a streamed input to check across frames)
+    """
+    positions = np.arange(start, start + len(frame))
+    if group_key is None:
+        first_rows = positions - (positions - start) % group_size
+    else:
+        if shards > 1:
+            check_contiguous_keys(frame[group_key], set() if seen_keys is None else seen_keys)
+        starts = np.zeros(len(frame), dtype=bool)
+        starts[group_run_starts(frame[group_key])] = True
+        starts[:1] = True
+        first_rows = np.maximum.accumulate(np.where(starts, positions, start))
+    return first_rows * shards // max(total_rows, 1)
+
+def file_checksum(path):
+    """sha256 hex digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as checked_file:
+        for block in iter(lambda: checked_file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def describe_output(output_file, rows):
+    """Manifest entry of an output file: its name (relative to the manifest), rows and checksum"""
+    exists = os.path.exists(output_file) and rows > 0
+    return {'file': os.path.basename(output_file), 'rows': rows,
+            'sha256': file_checksum(output_file) if exists else None}
+
+def sorted_counts(counts):
+    """Counts keyed by str, ordered by key (numerically where the keys are numbers)"""
+    def order(key):
+        try:
+            return (0, float(key), key)
+        except ValueError:
+            return (1, 0.0, key)
+    return {str(key): counts[key] for key in sorted(counts, key=lambda key: order(str(key)))}
+
+def write_manifest(output_file, shard, input_info, stage_order, counts, score_distributions, rows):
+    """
+    Write the manifest of a (shard) run next to output_file and return it
+    counts holds the run's row counts, score_distributions {name: {score: count}}, and rows the
+    number of rows in output_file
+    """
+    index, shards = parse_shard(shard)
+    manifest = {
+        'shard': [index, shards],
+        'input': input_info,
+        'stage_order': list(stage_order),
+        'counts': counts,
+        'score_distributions': {name: sorted_counts(distribution)
+                                for name, distribution in score_distributions.items()},
+        'output': describe_output(output_file, rows),
+    }
+    with open(manifest_path(output_file), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+def load_manifest(path):
+    with open(path, encoding='utf-8') as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest['path'] = path
+    return manifest
+
+def shard_output_file(manifest):
+    """Path of a shard's output file, which sits next to its manifest"""
+    return os.path.join(os.path.dirname(manifest['path']), manifest['output']['file'])
+
+def check_shards(manifests):
+    """Raise ValueError unless manifests are all shards 0..N-1 of one run, with intact outputs"""
+    if not manifests:
+        raise ValueError("No shard manifests to merge")
+    shards = manifests[0]['shard'][1]
+    found = [manifest['shard'] for manifest in manifests]
+    if found != [[index, shards] for index in range(shards)]:
+        raise ValueError(f"Expected shards 0..{shards - 1} of {shards}, got {[f'{k}/{n}' for k, n in found]}")
+
+    for manifest in manifests:
+        if manifest['input'] != manifests[0]['input'] or manifest['stage_order'] != manifests[0]['stage_order']:
+            raise ValueError(f"Shard {manifest['path']} ran on another input or stage order than "
+                             f"{manifests[0]['path']}")
+        expected = manifest['output']['sha256']
+        if expected is not None and file_checksum(shard_output_file(manifest)) != expected:
+            raise ValueError(f"Checksum mismatch for {shard_output_file(manifest)}: the file is "
+                             f"incomplete or was changed after its shard finished")
+
+def concatenate_outputs(input_files, output_file):
+    """
+    Concatenate table files in order into output_file
+    CSV files are joined byte for byte (the header once), so the result is the file one run over
+    all their rows would have written; other formats are read and written back
+    """
+    if table_format(output_file) != 'csv':
+        write_table(pd.concat([read_table(path) for path in input_files], ignore_index=True), output_file)
+        return
+
+    header = None
+    with open(output_file, 'wb') as merged_file:
+        for path in input_files:
+            with open(path, 'rb') as shard_file:
+                shard_header = shard_file.readline()
+                if header is None:
+                    header = shard_header
+                    merged_file.write(header)
+                elif shard_header != header:
+                    raise ValueError(f"{path} has other columns than {input_files[0]}")
+                for block in iter(lambda: shard_file.read(1 << 20), b''):
+                    merged_file.write(block)
+
+def merge_shards(manifest_files, output_file):
+    """
+    Merge the outputs of shards 0..N-1 into output_file, in shard (= input) order, and write the
+    merged manifest next to it; returns the merged manifest
+    Every shard's output is checked against its manifest's checksum first. Counts and score
+    distributions are summed, so the merged manifest matches the manifest of one run over the
+    whole input (see manifest_summary)
+    """
+    manifests = sorted((load_manifest(path) for path in manifest_files), key=lambda manifest: manifest['shard'][0])
+    check_shards(manifests)
+
+    counts = {}
+    score_distributions = {}
+    for manifest in manifests:
+        for name, count in manifest['counts'].items():
+            if isinstance(count, dict):
+                merge_counts(counts.setdefault(name, {}), count)
+            else:
+                counts[name] = counts.get(name, 0) + count
+        for name, distribution in manifest['score_distributions'].items():
+            merge_counts(score_distributions.setdefault(name, {}), distribution)
+
+    shard_files = [shard_output_file(manifest) for manifest in manifests if manifest['output']['rows']]
+    rows = sum(manifest['output']['rows'] for manifest in manifests)
+    if shard_files:
+        concatenate_outputs(shard_files, output_file)
+
+    return write_manifest(output_file, (0, 1), manifests[0]['input'], manifests[0]['stage_order'],
+                          counts, score_distributions, rows)
+
+def manifest_summary(manifest):
+    """The parts of a manifest that a merged sharded run and one run over the same input must share"""
+    summary = {key: manifest[key] for key in ('input', 'stage_order', 'counts', 'score_distributions')}
+    summary['output'] = {key: manifest['output'][key] for key in ('rows', 'sha256')}
+    return summary
+
+def manifest_report(manifest):
+    """Summary statistics of a (merged) run, one line each"""
+    counts = manifest['counts']
+    lines = [f"Companies: {counts['companies']}, best rows selected in Phase 1a: {counts['selected_rows']}"]
+    for stage_name in manifest['stage_order']:
+        stage_rows_in, stage_rows_out = counts['stages_in'][stage_name], counts['stages_out'][stage_name]
+        lines.append(f"  • {stage_name}: {stage_rows_in} in → {stage_rows_out} kept")
+    lines.append(f"Qualified suppliers: {counts['qualified']}")
+    for name, distribution in manifest['score_distributions'].items():
+        top = sorted(distribution.items(), key=lambda item: item[1], reverse=True)[:10]
+        lines.append(f"{name} score distribution (top {len(top)}): " +
+                     ", ".join(f"{score}: {count}" for score, count in top))
+    output = manifest['output']
+    lines.append(f"Output: {output['file']} ({output['rows']} rows, sha256 {output['sha256']})")
+    return lines
+
+if __name__ == "__main__":
+    # Configuration
+    OUTPUT_FILE = "phase3_qualified_suppliers.csv"
+    # Manifests of the shards to merge, copied next to their outputs from every node
+    SHARD_MANIFESTS = sorted(glob.glob(manifest_path(derived_table_path(OUTPUT_FILE, "_shard*of*"))))
+
+    print(f"Merging {len(SHARD_MANIFESTS)} shard manifests into {OUTPUT_FILE}")
+    print("=" * 70)
+    try:
+        merged = merge_shards(SHARD_MANIFESTS, OUTPUT_FILE)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+    else:
+        for line in manifest_report(merged):
+            print(line)
+        print(f"Merged manifest saved to: {manifest_path(OUTPUT_FILE)}")
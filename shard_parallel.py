@@ -0,0 +1,124 @@
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+
+# Minimum rows per shard: smaller shards cost more in process round trips than they save
+MIN_SHARD_ROWS = 500
+# Shards per worker, so a slow shard does not leave the other workers idle at the end of a frame
+SHARDS_PER_WORKER = 4
+
+# Set once in every worker process by _init_worker
+_shard_function = None
+_shared_state = {}
+
+def _init_worker(function, shared_state):
+    global _shard_function, _shared_state
+    _shard_function = function
+    _shared_state = shared_state
+
+def _run_shard(shard):
+    """
+    Run the worker's function on one shard; returns (result, everything it printed, wall and CPU
+    seconds, decision records kept by its reporter)
+    """
+    printed = io.StringIO()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    with redirect_stdout(printed):
+        result = _shard_function(shard, **_shared_state)
+    wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+    reporter = _shared_state.get('reporter')
+    return result, printed.getvalue(), wall, cpu, reporter.drain() if reporter is not None else []
+
+def group_run_starts(keys):
+    """Positions where a run of equal keys (missing keys count as equal) starts"""
+    same_as_previous = (keys.eq(keys.shift()) | (keys.isna() & keys.shift().isna())).to_numpy(dtype=bool, copy=True)
+    same_as_previous[:1] = False  # The first row starts a run even when its key is missing
+    return np.flatnonzero(~same_as_previous)
+
+def keys_contiguous(keys):
+    """Whether the rows of every key (missing keys count as one key) form a single run"""
+    return len(group_run_starts(keys)) == keys.nunique(dropna=False)
+
+def shard_bounds(frame, shards, group_size=1, group_key=None):
+    """
+    (start, stop) row positions of up to `shards` contiguous shards covering frame
+    Boundaries fall on multiples of group_size rows, or with group_key only where the key changes;
+    when some key's rows are not contiguous, that company cannot be cut out of the frame and the
+    whole frame is one shard (scored in one process, with the output of a sequential pass)
+    """
+    rows = len(frame)
+    shard_rows = -(-rows // max(1, shards))
+    shard_rows = max(group_size, -(-shard_rows // group_size) * group_size)
+    cuts = np.arange(shard_rows, rows, shard_rows)
+
+    if group_key is not None and len(cuts):
+        if not keys_contiguous(frame[group_key]):
+            return [(0, rows)]
+        run_starts = group_run_starts(frame[group_key])
+        cuts = run_starts[np.minimum(np.searchsorted(run_starts, cuts), len(run_starts) - 1)]
+        cuts = cuts[cuts > 0]
+
+    edges = [0] + sorted(set(cuts.tolist())) + [rows]
+    return [(start, stop) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+def merge_counts(total, part):
+    """Add the counts of part into the dict total, keeping the order keys were first seen in"""
+    for key, count in part.items():
+        total[key] = total.get(key, 0) + count
+    return total
+
+class ShardPool:
+    """
+    Process pool that runs one scoring function over contiguous shards of frames
+    function(shard, **shared_state) must be a module-level function; shared_state (compiled
+    keyword matchers, detected columns, ...) is built once by the caller and handed to every worker
+    once, when it starts, instead of with every shard
+    map() returns the shard results in row order, and replays what each shard printed in that
+    order, so the output is the same as one sequential pass
+    With a RunMetrics, every shard's wall and CPU time in its worker is recorded as a call of the
+    function
+    With a ProgressReporter, the function also gets reporter=, a worker copy of it (see
+    ProgressReporter.worker_copy); the decision records of every shard are logged in row order
+    and its rows counted as they come back
+    """
+
+    def __init__(self, function, shared_state=None, workers=None, metrics=None, reporter=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.metrics = metrics
+        self.reporter = reporter
+        self._name = function.__name__
+        shared_state = dict(shared_state or {})
+        if reporter is not None:
+            shared_state['reporter'] = reporter.worker_copy()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(function, shared_state))
+
+    def map(self, frame, group_size=1, group_key=None):
+        shards = min(self.workers * SHARDS_PER_WORKER, max(1, len(frame) // MIN_SHARD_ROWS))
+        bounds = shard_bounds(frame, shards, group_size, group_key)
+        results = []
+        shards = (frame.iloc[start:stop] for start, stop in bounds)
+        for (start, stop), (result, printed, wall, cpu, records) in zip(bounds, self._executor.map(_run_shard, shards)):
+            sys.stdout.write(printed)
+            results.append(result)
+            if self.metrics is not None:
+                self.metrics.add_time(self.metrics.functions, self._name, wall, cpu)
+            if self.reporter is not None:
+                self.reporter.log_records(records)
+                self.reporter.advance(stop - start)
+        return results
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,285 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa  # optional: pip install pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+# File extensions of the binary columnar formats; every other file is read and written as CSV
+TABLE_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+
+def table_format(path):
+    """Return 'parquet', 'arrow' (Arrow IPC file) or 'csv' for a table path, by its extension"""
+    return TABLE_FORMATS.get(os.path.splitext(str(path))[1].lower(), 'csv')
+
+def require_pyarrow(path):
+    """Raise a helpful ImportError when a Parquet/Arrow path is used without pyarrow"""
+    if pa is None:
+        raise ImportError(f"Reading or writing '{path}' needs pyarrow (pip install pyarrow)")
+
+def derived_table_path(path, suffix):
+    """Path next to path with suffix added before the extension, e.g. out.csv -> out_rejected.csv"""
+    root, extension = os.path.splitext(path)
+    return f"{root}{suffix}{extension}"
+
+def read_table_columns(path):
+    """Column names of a table file, without loading its rows"""
+    file_format = table_format(path)
+    if file_format == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    require_pyarrow(path)
+    if file_format == 'parquet':
+        return list(pa.parquet.read_schema(path).names)
+    with pa.memory_map(path) as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+def read_table(path, columns=None):
+    """
+    Load a whole table file as a DataFrame
+    columns optionally projects the read onto those columns (in file order); columns the file
+    does not have are ignored, so a phase can ask for everything it might use
+    """
+    if columns is not None:
+        wanted = set(columns)
+        columns = [column for column in read_table_columns(path) if column in wanted]
+
+    file_format = table_format(path)
+    if file_format == 'csv':
+        return pd.read_csv(path, usecols=columns)
+
+    require_pyarrow(path)
+    if file_format == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+def write_table(df, path):
+    """Write a whole DataFrame to a table file (CSV, Parquet or Arrow IPC, by extension)"""
+    file_format = table_format(path)
+    if file_format == 'csv':
+        df.to_csv(path, index=False)
+        return
+
+    writer = ArrowTableAppender(path)
+    writer.append(df)
+    writer.close()
+
+class CsvChunkReader:
+    """
+    Reads a CSV file in chunks of at most chunksize rows, keeping memory flat
+    A first streaming pass counts the rows and finds columns whose parsed dtype changes between
+    chunks: int in some and float in others (missing values in some chunks only) are read as float,
+    numeric in some and text in others are read as text. That is what a whole-file read infers,
+    so every chunk carries the same values a whole-file read would
+    """
+
+    def __init__(self, path, chunksize, dtype=None, **read_csv_kwargs):
+        self.path = path
+        self.chunksize = chunksize
+        self.user_dtypes = dict(dtype or {})
+        self.read_csv_kwargs = read_csv_kwargs
+        self.columns = list(pd.read_csv(path, nrows=0, **read_csv_kwargs).columns)
+        self.total_rows, self.dtypes = self._scan()
+
+    def _scan(self):
+        total_rows = 0
+        kinds = {}
+        for chunk in pd.read_csv(self.path, chunksize=self.chunksize, dtype=self.user_dtypes or None,
+                                 **self.read_csv_kwargs):
+            total_rows += len(chunk)
+            for column, dtype in chunk.dtypes.items():
+                kind = dtype.kind if dtype.kind in ('i', 'u', 'f', 'b') else 'text'
+                kinds.setdefault(column, set()).add(kind)
+
+        dtypes = {}
+        for column, column_kinds in kinds.items():
+            if len(column_kinds) > 1:
+                dtypes[column] = 'float64' if column_kinds <= {'i', 'u', 'f'} else str
+        dtypes.update(self.user_dtypes)
+        return total_rows, dtypes
+
+    def __iter__(self):
+        return iter(pd.read_csv(self.path, chunksize=self.chunksize, dtype=self.dtypes or None, **self.read_csv_kwargs))
+
+class ArrowChunkReader:
+    """
+    Reads a Parquet or Arrow IPC file in chunks of at most chunksize rows
+    The file's schema fixes every column's type, so no scan pass is needed; columns optionally
+    projects the read onto those columns, and only they are decoded
+    Chunks are numbered with a running index, like CSV chunks
+    """
+
+    def __init__(self, path, chunksize, columns=None):
+        require_pyarrow(path)
+        self.path = path
+        self.chunksize = chunksize
+        self.format = table_format(path)
+        self.columns = read_table_columns(path)
+        if columns is not None:
+            wanted = set(columns)
+            self.columns = [column for column in self.columns if column in wanted]
+
+        if self.format == 'parquet':
+            self.total_rows = pa.parquet.ParquetFile(path).metadata.num_rows
+        else:
+            with pa.memory_map(path) as source:
+                reader = pa.ipc.open_file(source)
+                self.total_rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+    def _batches(self):
+        if self.format == 'parquet':
+            yield from pa.parquet.ParquetFile(self.path).iter_batches(batch_size=self.chunksize, columns=self.columns)
+            return
+
+        # Arrow IPC batches have the writer's sizes, so they are sliced or gathered to chunksize rows
+        with pa.memory_map(self.path) as source:
+            reader = pa.ipc.open_file(source)
+            pending = []
+            pending_rows = 0
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(self.columns)
+                while batch.num_rows:
+                    take = min(batch.num_rows, self.chunksize - pending_rows)
+                    pending.append(batch.slice(0, take))
+                    pending_rows += take
+                    batch = batch.slice(take)
+                    if pending_rows == self.chunksize:
+                        yield pa.Table.from_batches(pending)
+                        pending, pending_rows = [], 0
+            if pending:
+                yield pa.Table.from_batches(pending)
+
+    def __iter__(self):
+        start = 0
+        for batch in self._batches():
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+
+def open_table_reader(path, chunksize, columns=None):
+    """
+    Chunk reader for a table file: CsvChunkReader or ArrowChunkReader, by extension
+    Both expose .columns and .total_rows and iterate over DataFrame chunks
+    """
+    if table_format(path) == 'csv':
+        if columns is None:
+            return CsvChunkReader(path, chunksize)
+        wanted = set(columns)
+        return CsvChunkReader(path, chunksize,
+                              usecols=[column for column in read_table_columns(path) if column in wanted])
+    return ArrowChunkReader(path, chunksize, columns=columns)
+
+class CsvAppender:
+    """
+    Appends DataFrames to a CSV file as they are produced
+    The file is created (with its header) by the first non-empty frame, so nothing is written
+    when no rows ever arrive; later frames are aligned to the first frame's columns
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self.rows_written = 0
+
+    def append(self, df):
+        """Write the rows of df to the end of the file"""
+        if df is None or len(df) == 0:
+            return
+
+        if self.columns is None:
+            self.columns = list(df.columns)
+            df.to_csv(self.path, index=False)
+        else:
+            df.reindex(columns=self.columns).to_csv(self.path, index=False, mode='a', header=False)
+        self.rows_written += len(df)
+
+    def close(self):
+        """Nothing to flush: every append is written straight to the file"""
+
+def arrow_table_from_frame(df, schema=None):
+    """
+    Convert a DataFrame to an Arrow table, cast to schema when one is given
+    Object columns holding mixed Python types are stored as text, as a CSV round trip would
+    Without a schema, columns with no value in df (all None or NaN) are typed as text, which the
+    values of any later frame can be cast to; a frame that does not fit schema raises ValueError
+    """
+    arrays = []
+    for column in df.columns:
+        values = df[column]
+        try:
+            array = pa.array(values, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            array = pa.array(values.map(lambda value: value if pd.isna(value) else str(value)), from_pandas=True)
+        arrays.append(array)
+    table = pa.Table.from_arrays(arrays, names=[str(column) for column in df.columns])
+
+    if schema is None:
+        # A column that is empty in the first frame is typed as text
+        return table.cast(pa.schema([
+            field.with_type(pa.string()) if table.column(i).null_count == len(table) else field
+            for i, field in enumerate(table.schema)
+        ]))
+
+    try:
+        return table.cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+        raise ValueError(f"Frame does not fit the schema already written: {error}") from error
+
+class ArrowTableAppender:
+    """
+    Appends DataFrames to a Parquet or Arrow IPC file as they are produced
+    The file and its schema are created by the first non-empty frame (columns it leaves empty are
+    typed as text); later frames are aligned to its columns and cast to its types, and one that
+    does not fit raises ValueError without being written. close() must be called to finish the file
+    """
+
+    def __init__(self, path):
+        require_pyarrow(path)
+        self.path = path
+        self.format = table_format(path)
+        self.columns = None
+        self.schema = None
+        self.rows_written = 0
+        self._writer = None
+
+    def append(self, df):
+        """Write the rows of df to the end of the file"""
+        if df is None or len(df) == 0:
+            return
+
+        if self.columns is None:
+            self.columns = list(df.columns)
+            table = arrow_table_from_frame(df)
+            self.schema = table.schema
+            if self.format == 'parquet':
+                self._writer = pa.parquet.ParquetWriter(self.path, self.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self.schema)
+        else:
+            table = arrow_table_from_frame(df.reindex(columns=self.columns), self.schema)
+
+        self._writer.write_table(table)
+        self.rows_written += len(df)
+
+    def close(self):
+        """Finish the file (writes the Parquet footer or Arrow IPC file trailer)"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def open_table_appender(path):
+    """Appender for a table file: CsvAppender or ArrowTableAppender, by extension"""
+    if table_format(path) == 'csv':
+        return CsvAppender(path)
+    return ArrowTableAppender(path)
@@ -0,0 +1,73 @@
+import json
+
+import pandas as pd
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from checkpoint_journal import CheckpointJournal
+from phase1_website_status_code import canonical_probe_key, check_company_websites, clean_website_url
+
+RUN_INFO = {'input_file': '/data/phase1a.csv', 'size': 1234, 'mtime': 1.5, 'probe_key': 'url'}
+RESULTS = {'a.example/': (True, 200, None),
+           'b.example/': (False, None, "Request timed out"),
+           'c.example/': (False, 404, "Status code: 404")}
+
+def crashed_journal(path):
+    """Journal RESULTS, then leave it as a process killed mid-write would: last line cut, no close()"""
+    journal = CheckpointJournal(str(path), RUN_INFO)
+    journal.load()
+    for key, result in RESULTS.items():
+        journal.record(key, result)
+    journal._file.flush()
+    text = path.read_text(encoding='utf-8')
+    path.write_text(text[:-len('404, "Status code: 404"]\n')], encoding='utf-8')
+
+def test_resume_keeps_results_before_a_torn_last_line(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    crashed_journal(path)
+
+    journal = CheckpointJournal(str(path), dict(RUN_INFO))
+    results = journal.load()
+    assert results == {key: RESULTS[key] for key in ('a.example/', 'b.example/')}
+    assert journal.restored == 2
+    journal.record('c.example/', RESULTS['c.example/'])
+    journal.close()
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[0]) == RUN_INFO
+    assert CheckpointJournal(str(path), RUN_INFO).load() == RESULTS
+
+def test_journal_of_another_run_is_discarded(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    crashed_journal(path)
+
+    journal = CheckpointJournal(str(path), dict(RUN_INFO, size=4321))
+    assert journal.load() == {}
+    assert journal.restored == 0
+    journal.close()
+    assert json.loads(path.read_text(encoding='utf-8').splitlines()[0])['size'] == 4321
+
+def test_journaled_keys_are_not_probed_again(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    servers, urls = start_stub_servers(1, latency=0.002)
+    try:
+        frame = pd.DataFrame({'company_name': ['Done', 'Pending'],
+                              'website_url': [f"{urls[0]}/done", f"{urls[0]}/pending"]})
+        done_key = canonical_probe_key(clean_website_url(frame['website_url'][0]))
+        journal = CheckpointJournal(str(path), RUN_INFO)
+        journal.load()
+        # A result the stub server would never give, so only the journal can have produced it
+        journal.record(done_key, (False, 503, "Status code: 503"))
+        journal.close()
+
+        journal = CheckpointJournal(str(path), RUN_INFO)
+        probe_results = journal.load()
+        selected, rejected = check_company_websites(frame, timeout=5, probe_results=probe_results, journal=journal)
+        journal.close()
+    finally:
+        stop_stub_servers(servers)
+
+    assert selected['company_name'].tolist() == ['Pending']
+    assert [(record['company_name'], record['rejection_reason']) for record in rejected] == [
+        ('Done', "Website not accessible: Status code: 503")]
+    assert journal.restored == 1 and journal.written == 1
+    assert len(CheckpointJournal(str(path), RUN_INFO).load()) == 2
@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+import pytest
+
+from column_roles import ROLE_CACHE_VERSION, ColumnRoleCache, column_roles, schema_fingerprint
+from phase1_rows_scoring_selection import find_website_columns
+from phase3_manufacturing_reliability import detect_capability_columns
+
+def contact_frame(values):
+    """Frame without a website-named column, so website columns can only be found by sampling"""
+    return pd.DataFrame({'company_name': pd.Series(['A', 'B', 'C'], dtype=object),
+                         'contact': pd.Series(values, dtype=object)})
+
+def test_schema_fingerprint_follows_names_and_dtypes():
+    frame = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    assert schema_fingerprint(frame) == schema_fingerprint(frame.copy())
+    assert schema_fingerprint(frame) != schema_fingerprint(frame.astype({'a': float}))
+    assert schema_fingerprint(frame) != schema_fingerprint(frame[['b', 'a']])
+
+def test_name_based_detection_is_cached(tmp_path):
+    cache_file = tmp_path / "roles.json"
+    frame = pd.DataFrame({'company_name': ['A'], 'website_url': ['https://a.com']})
+    assert find_website_columns(frame, ColumnRoleCache(str(cache_file))) == ['website_url']
+
+    role_cache = ColumnRoleCache(str(cache_file))
+    assert find_website_columns(frame, role_cache) == ['website_url']
+    assert (role_cache.hits, role_cache.misses) == (1, 0)
+
+def test_empty_samples_are_not_cached_and_found_ones_are(tmp_path):
+    cache_file = tmp_path / "roles.json"
+    assert find_website_columns(contact_frame(['call us', 'n/a', 'email']), ColumnRoleCache(str(cache_file))) == []
+
+    # Same schema, but this time the sampled rows hold URLs
+    with_urls = contact_frame(['www.a.com', 'https://b.org', 'c.io'])
+    assert find_website_columns(with_urls, ColumnRoleCache(str(cache_file))) == ['contact']
+    stored = json.loads(cache_file.read_text())['schemas'][schema_fingerprint(with_urls)]
+    assert stored == {'website_sampled': ['contact']}
+
+    # Later runs over the schema take the sampled columns from the cache, whatever their rows hold
+    role_cache = ColumnRoleCache(str(cache_file))
+    assert find_website_columns(contact_frame(['call us', 'n/a', 'email']), role_cache) == ['contact']
+    assert (role_cache.hits, role_cache.misses) == (1, 1)
+
+def test_empty_roles_in_an_older_cache_are_detected_again(tmp_path):
+    cache_file = tmp_path / "roles.json"
+    frame = pd.DataFrame({'company_name': ['A'], 'website_url': ['https://a.com']})
+    cache_file.write_text(json.dumps({'version': ROLE_CACHE_VERSION,
+                                      'schemas': {schema_fingerprint(frame): {'website': []}}}))
+    role_cache = ColumnRoleCache(str(cache_file))
+    assert find_website_columns(frame, role_cache) == ['website_url']
+    assert role_cache.misses == 1
+
+def test_pinned_roles(tmp_path):
+    overrides_file = tmp_path / "overrides.json"
+    overrides_file.write_text(json.dumps({'website': ['homepage'], 'capability': {'year': ['founded']}}))
+    role_cache = ColumnRoleCache(None, str(overrides_file))
+    frame = pd.DataFrame({'homepage': ['a.com'], 'founded': [1990], 'employee_count': [10]})
+
+    assert find_website_columns(frame, role_cache) == ['homepage']
+    capability, source = column_roles(role_cache, 'capability', frame, detect_capability_columns)
+    assert source == 'pinned'
+    assert capability['year'] == ['founded'] and capability['employee'] == ['employee_count']
+
+    with pytest.raises(ValueError):
+        role_cache.roles('website', frame.drop(columns='homepage'), lambda df: [])
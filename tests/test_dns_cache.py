@@ -0,0 +1,109 @@
+import pytest
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from dns_cache import CachingResolver, HostNotFound, hosts_file_lookup
+from phase1_website_status_code import DNS_FAILURE, check_websites_concurrently
+from timeout_policy import TimeoutPolicy
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def counting_lookup(answers):
+    """Lookup answering from {host: (addresses, ttl) or an exception}, counting calls per host"""
+    calls = {}
+
+    def lookup(host):
+        calls[host] = calls.get(host, 0) + 1
+        answer = answers[host]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    return lookup, calls
+
+def test_addresses_are_kept_for_their_clamped_ttl():
+    clock = FakeClock()
+    lookup, calls = counting_lookup({'short.example': (['10.0.0.1'], 5), 'plain.example': (['10.0.0.2'], None)})
+    resolver = CachingResolver(lookup, default_ttl=300, min_ttl=30, clock=clock)
+    assert resolver.resolve('Short.Example.') == ['10.0.0.1']
+    assert resolver.resolve('plain.example') == ['10.0.0.2']
+    clock.now = 29
+    resolver.resolve('short.example')
+    assert calls == {'short.example': 1, 'plain.example': 1} and resolver.hits == 1
+    clock.now = 31
+    resolver.resolve('short.example')
+    resolver.resolve('plain.example')
+    assert calls == {'short.example': 2, 'plain.example': 1}
+
+def test_missing_hosts_are_cached_and_transient_failures_are_not():
+    clock = FakeClock()
+    lookup, calls = counting_lookup({'gone.example': HostNotFound('gone.example'),
+                                     'flaky.example': TimeoutError('no answer')})
+    resolver = CachingResolver(lookup, negative_ttl=600, clock=clock)
+    for _ in range(2):
+        assert not resolver.resolves('gone.example')
+        assert resolver.resolves('flaky.example')
+    assert calls == {'gone.example': 1, 'flaky.example': 2}
+    assert (resolver.not_found, resolver.errors, resolver.negative_hits) == (1, 2, 1)
+    clock.now = 601
+    resolver.resolves('gone.example')
+    assert calls['gone.example'] == 2
+
+def test_ip_addresses_need_no_lookup():
+    lookup, calls = counting_lookup({})
+    resolver = CachingResolver(lookup)
+    assert resolver.resolve('127.0.0.1') == ['127.0.0.1']
+    assert resolver.resolves('[::1]')
+    assert calls == {}
+
+def test_resolve_many_looks_up_every_distinct_host_once():
+    lookup, calls = counting_lookup({'a.example': (['10.0.0.1'], None), 'b.example': HostNotFound('b.example')})
+    resolver = CachingResolver(lookup)
+    hosts = ['a.example', 'b.example', 'a.example', 'b.example']
+    assert resolver.resolve_many(hosts, concurrency=4) == {'a.example': True, 'b.example': False}
+    assert calls == {'a.example': 1, 'b.example': 1}
+
+@pytest.mark.parametrize('mode', ['asyncio', 'threads'])
+def test_dns_stage_only_drops_hosts_that_do_not_resolve(tmp_path, mode):
+    hosts_file = tmp_path / "hosts"
+    hosts_file.write_text("127.0.0.1 localhost  # the stub servers\n")
+    servers, urls = start_stub_servers(2, latency=0.002)
+    try:
+        local_urls = [url.replace('127.0.0.1', 'localhost') for url in urls]
+        checked = [f"{url}/company/{i}" for i, url in enumerate(local_urls)] + [f"{local_urls[0]}/missing/1"]
+        missing = ["https://no-such-host.invalid/", "no-such-host.invalid/about"]
+        targets = [checked[0], missing[0], checked[1], missing[1], checked[2]]
+
+        without_dns = check_websites_concurrently(targets, concurrency=4, timeout=5, mode=mode)
+        policy = TimeoutPolicy(timeout=5)
+        resolver = CachingResolver(hosts_file_lookup(str(hosts_file)))
+        with_dns = check_websites_concurrently(targets, concurrency=4, timeout=5, mode=mode,
+                                               timeout_policy=policy, resolver=resolver)
+    finally:
+        stop_stub_servers(servers)
+
+    assert [result[:2] for result in without_dns] == [(True, 200), (False, None), (True, 200), (False, None),
+                                                      (False, 404)]
+    assert [with_dns[i] for i in (1, 3)] == [DNS_FAILURE, DNS_FAILURE]
+    assert [with_dns[i] for i in (0, 2, 4)] == [without_dns[i] for i in (0, 2, 4)]
+    assert resolver.lookups == 2 and resolver.not_found == 1
+    assert policy.dns_failures == 2
+
+def test_dns_stage_leaves_proxied_urls_to_the_proxy(monkeypatch):
+    servers, urls = start_stub_servers(1, latency=0.002)
+    try:
+        monkeypatch.setenv('HTTP_PROXY', urls[0])
+        for name in ('NO_PROXY', 'no_proxy', 'http_proxy'):
+            monkeypatch.delenv(name, raising=False)
+        lookup, calls = counting_lookup({})
+        resolver = CachingResolver(lookup)
+        results = check_websites_concurrently(["http://no-such-host.invalid/"], timeout=5, resolver=resolver)
+    finally:
+        stop_stub_servers(servers)
+
+    assert results == [(True, 200, None)]
+    assert calls == {}
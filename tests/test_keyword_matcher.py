@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from keyword_matcher import KeywordMatcher, ahocorasick, get_keyword_matcher
+from phase2_manufacturing_relevance import get_manufacturing_keywords
+
+BACKENDS = ['scan', pytest.param('automaton', marks=pytest.mark.skipif(ahocorasick is None,
+                                                                          reason="pyahocorasick not installed"))]
+# Duplicates, an empty keyword, keywords inside other keywords and a list order unlike text order
+KEYWORDS = ['steel', 'machine', 'machinery', 'steel', '', 'cnc', 'machine parts', 'parts', 'cnc']
+TEXTS = ["", "machinery parts and steel", "cnc machine parts", "steel steel steel", "wood", "partsmachine"]
+
+def old_entries(text, keywords):
+    """The loop the phases used: every keyword-list entry in text, in list order"""
+    return [keyword for keyword in keywords if keyword in text]
+
+def old_distinct(text, keywords):
+    """Phase 2's distinct keyword loop"""
+    found_keywords = []
+    for keyword in keywords:
+        if keyword in text and keyword not in found_keywords:
+            found_keywords.append(keyword)
+    return found_keywords
+
+def description_texts():
+    frame = make_supplier_frame(500, seed=4)
+    return (frame['long_description'] + " " + frame['business_tags'].fillna("")).str.lower().tolist()
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_matches_the_keyword_loop(backend):
+    matcher = KeywordMatcher(KEYWORDS, backend=backend)
+    for text in TEXTS:
+        assert matcher.find_entries(text) == old_entries(text, KEYWORDS)
+        assert matcher.find_indices(text) == [i for i, keyword in enumerate(KEYWORDS) if keyword in text]
+        assert matcher.find_all(text) == old_distinct(text, KEYWORDS)
+        assert matcher.count(text) == len(old_entries(text, KEYWORDS))
+    assert matcher.count_many(TEXTS).tolist() == [len(old_entries(text, KEYWORDS)) for text in TEXTS]
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_matches_the_keyword_loop_on_descriptions(backend):
+    keywords = get_manufacturing_keywords()
+    matcher = KeywordMatcher(keywords, backend=backend)
+    texts = description_texts()
+    assert [matcher.find_all(text) for text in texts] == [old_distinct(text, keywords) for text in texts]
+    assert [matcher.find_entries(text) for text in texts] == [old_entries(text, keywords) for text in texts]
+    assert np.array_equal(matcher.count_many(texts), [len(old_entries(text, keywords)) for text in texts])
+
+def test_matchers_are_shared_per_keyword_list():
+    matcher = get_keyword_matcher(KEYWORDS)
+    assert get_keyword_matcher(list(KEYWORDS)) is matcher
+    assert get_keyword_matcher(matcher) is matcher
+    with pytest.raises(ValueError):
+        KeywordMatcher(KEYWORDS, backend='regex')
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from naics_index import NaicsPrefixIndex, get_naics_index
+from phase2_manufacturing_relevance import check_naics_manufacturing_relevance, get_manufacturing_naics_codes
+
+# Overlapping prefixes listed both shorter-first and longer-first, and a duplicate
+PREFIXES = ['31', '311', '5413', '54133', '8113', '811', '31', '']
+CODES = ['311111', '31', '3', '541330', '541380', '811310', '811', '722511', '', 'x31', '311111.0']
+
+def old_first_match(code, prefixes):
+    """The loop the phases used: the first listed prefix the code starts with"""
+    for prefix in prefixes:
+        if code.startswith(prefix):
+            return prefix
+    return None
+
+def old_longest_match(code, prefixes):
+    matches = [prefix for prefix in prefixes if code.startswith(prefix)]
+    return max(matches, key=len) if matches else None
+
+def test_matches_the_startswith_loop():
+    for prefixes in (PREFIXES, PREFIXES[:-1], get_manufacturing_naics_codes()):
+        index = NaicsPrefixIndex(prefixes)
+        for code in CODES:
+            assert index.first_match(code) == old_first_match(code, prefixes), (prefixes, code)
+            assert index.longest_match(code) == old_longest_match(code, prefixes), (prefixes, code)
+            assert index.matching_prefixes(code) == list(dict.fromkeys(
+                prefix for prefix in prefixes if code.startswith(prefix)))
+
+def test_first_match_is_the_listed_one_not_the_longest():
+    index = NaicsPrefixIndex(PREFIXES[:-1])
+    assert (index.first_match('311111'), index.longest_match('311111')) == ('31', '311')
+    assert (index.first_match('811310'), index.longest_match('811310')) == ('8113', '8113')
+    assert (index.first_match('811000'), index.longest_match('811000')) == ('811', '811')
+
+def test_column_lookup_strips_values_and_skips_missing_ones():
+    index = NaicsPrefixIndex(get_manufacturing_naics_codes())
+    series = pd.Series([311111.0, np.nan, 722511.0, ' 541330 ', None], dtype=object)
+    assert index.first_match_column(series).tolist() == ['31', None, None, '5413', None]
+    assert index.longest_match_column(series).tolist() == ['311', None, None, '54133', None]
+
+def test_evidence_code_is_unchanged():
+    prefixes = get_manufacturing_naics_codes()
+    row = pd.Series({'naics_2022_primary_code': 332710.0, 'naics_2022_secondary_codes': '541330'})
+    columns = ['naics_2022_primary_code', 'naics_2022_secondary_codes']
+    expected = (True, old_first_match('332710.0', prefixes), '332710.0')
+    assert check_naics_manufacturing_relevance(row, columns, prefixes) == expected == (True, '33', '332710.0')
+    assert check_naics_manufacturing_relevance(row, columns, get_naics_index(prefixes)) == expected
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from numeric_parser import NumericParser, parse_numeric_text
+
+TEXTS = ["$10M", "5.5 million", "120000", "$2B", "not available", "1,250,000", "51-200", "1200",
+         "Large Enterprise", "small", "N/A", " 12 ", "€3.2bn", "2 bn", "medium", "-", ""]
+
+def as_floats(numbers):
+    return np.array([np.nan if number is None else number for number in numbers], dtype=np.float64)
+
+def test_historical_rules():
+    assert parse_numeric_text("$10M") == 10_000_000
+    assert parse_numeric_text("$2B") == 2_000_000_000
+    assert parse_numeric_text("1,250,000") == 1_250_000
+    assert parse_numeric_text("51-200") is None
+    # Any 'm' means millions under the historical rules, even in words
+    assert parse_numeric_text("12 employees") == 12_000_000
+    assert parse_numeric_text("not available") is None
+
+def test_strict_rules_only_read_units_after_the_number():
+    assert parse_numeric_text("12 employees", compat=False) == 12
+    assert parse_numeric_text("5.5 million", compat=False) == 5_500_000
+    assert parse_numeric_text("2 bn", compat=False) == 2_000_000_000
+    assert parse_numeric_text("$10M", compat=False) == 10_000_000
+
+@pytest.mark.parametrize('compat', [True, False])
+def test_parse_column_matches_parse_numeric_text(compat):
+    series = pd.Series(TEXTS * 3 + [None, np.nan], dtype=object)
+    expected = as_floats([None if pd.isna(value) else parse_numeric_text(str(value), compat) for value in series])
+    parser = NumericParser(compat=compat)
+    np.testing.assert_array_equal(parser.parse_column(series), expected)
+    # A second pass comes from the memo
+    np.testing.assert_array_equal(parser.parse_column(series), expected)
+    assert parser.parsed == len(set(TEXTS))
+    assert parser.values == 2 * len(TEXTS) * 3
+
+def test_mixed_objects_are_read_by_their_text():
+    series = pd.Series([1, 1.0, '1', 2.5, True], dtype=object)
+    expected = as_floats([parse_numeric_text(str(value)) for value in series])
+    np.testing.assert_array_equal(NumericParser().parse_column(series), expected)
+
+def test_full_memo_is_cleared_and_results_stay_the_same():
+    series = pd.Series(TEXTS, dtype=object)
+    expected = NumericParser().parse_column(series)
+    small = NumericParser(memo_size=3)
+    np.testing.assert_array_equal(small.parse_column(series), expected)
+    np.testing.assert_array_equal(small.parse_column(series), expected)
+    assert len(small._memo) <= 3
+
+def test_counts_add_up_across_parsers():
+    first, second = NumericParser(), NumericParser()
+    first.parse_column(pd.Series(TEXTS))
+    second.parse_column(pd.Series(TEXTS[:5]))
+    first.add_counts(second.counts())
+    assert (first.values, first.distinct) == (len(TEXTS) + 5, len(set(TEXTS)) + 5)
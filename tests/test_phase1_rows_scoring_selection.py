@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_rows_scoring_selection import (calculate_row_score, calculate_row_scores, detect_website_fields,
+                                           select_best_row_from_group, select_best_rows)
+
+def supplier_frame():
+    """Synthetic rows with a tied block, a block without websites and an incomplete trailing block"""
+    frame = make_supplier_frame(503, seed=3)
+    # Rows 0-4 are the same company five times over: every row ties, the first must win
+    frame.iloc[1:5] = frame.iloc[[0] * 4].to_numpy()
+    frame.loc[0:4, 'website_url'] = "https://tied.example"
+    # Rows 5-9 have no website in any column
+    frame.loc[5:9, ['website_url', 'website_domain']] = None
+    # Rows 10-14: rows 11 and 13 tie for the best score, the others have no website
+    frame.iloc[13] = frame.iloc[11]
+    frame.loc[[10, 12, 14], ['website_url', 'website_domain']] = None
+    frame.loc[[11, 13], 'website_url'] = "https://pair.example"
+    return frame
+
+def legacy_selection(frame, website_columns):
+    """The row-wise 5-row block loop: incomplete trailing blocks are skipped"""
+    selected = []
+    for start in range(0, len(frame), 5):
+        if start + 5 > len(frame):
+            continue
+        best_row = select_best_row_from_group(frame.iloc[start:start + 5], website_columns)
+        if best_row is not None:
+            selected.append(best_row)
+    return pd.DataFrame(selected)
+
+def test_columnar_scores_match_row_scores():
+    frame = supplier_frame()
+    expected = np.array([calculate_row_score(row) for _, row in frame.iterrows()], dtype=np.int64)
+    assert calculate_row_scores(frame).tolist() == expected.tolist()
+
+def test_groupby_selection_matches_the_block_loop():
+    frame = supplier_frame()
+    website_columns = detect_website_fields(frame)
+    selected, groups = select_best_rows(frame, website_columns)
+    expected = legacy_selection(frame, website_columns)
+
+    assert len(groups) == len(frame) // 5
+    assert groups['selected_position'].tolist()[:3] == [0, -1, 11]
+    assert selected.index.tolist() == expected.index.tolist()
+    for column in ['selection_score', 'source_row_index', 'detected_website_column', 'detected_website_value']:
+        assert selected[column].tolist() == expected[column].tolist(), column
+    pd.testing.assert_frame_equal(selected[frame.columns], expected[frame.columns].astype(frame.dtypes.to_dict()))
@@ -0,0 +1,17 @@
+import asyncio
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from phase1_website_status_code import check_websites_concurrently
+
+def test_asyncio_mode_works_inside_a_running_event_loop():
+    servers, urls = start_stub_servers(1, latency=0.002)
+
+    async def caller():
+        return check_websites_concurrently([f"{urls[0]}/", f"{urls[0]}/missing"], timeout=5, mode='asyncio')
+
+    try:
+        results = asyncio.run(caller())
+    finally:
+        stop_stub_servers(servers)
+
+    assert [result[:2] for result in results] == [(True, 200), (False, 404)]
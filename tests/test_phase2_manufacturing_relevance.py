@@ -0,0 +1,37 @@
+import filecmp
+import os
+
+import pytest
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase2_manufacturing_relevance import filter_manufacturing_companies
+
+def run_phase2(input_file, output_file, chunksize=None):
+    return filter_manufacturing_companies(str(input_file), str(output_file), chunksize=chunksize)
+
+def restaurant_frame(rows):
+    """Synthetic companies none of which is a manufacturer"""
+    frame = make_supplier_frame(rows, seed=5)
+    frame['short_description'] = frame['long_description'] = "restaurant serving local food"
+    frame['naics_2022_primary_code'] = 722511.0
+    frame['naics_2022_primary_label'] = "Full-Service Restaurants"
+    frame['business_tags'] = "Restaurants | Food Service"
+    return frame
+
+@pytest.mark.parametrize('restaurants', [0, 60])
+@pytest.mark.parametrize('chunksize', [7, 1000])
+def test_streaming_matches_whole_file(tmp_path, chunksize, restaurants):
+    frame = make_supplier_frame(200, seed=5)
+    frame.iloc[:restaurants] = restaurant_frame(restaurants)
+    frame.to_csv(tmp_path / "input.csv", index=False)
+    run_phase2(tmp_path / "input.csv", tmp_path / "whole.csv")
+    run_phase2(tmp_path / "input.csv", tmp_path / "streamed.csv", chunksize)
+    for suffix in ('', '_non_manufacturing'):
+        assert filecmp.cmp(tmp_path / f"whole{suffix}.csv", tmp_path / f"streamed{suffix}.csv", shallow=False)
+    assert not os.path.exists(tmp_path / "streamed_non_manufacturing.partial.csv")
+
+@pytest.mark.parametrize('chunksize', [None, 7])
+def test_no_output_files_when_no_company_qualifies(tmp_path, chunksize):
+    restaurant_frame(50).to_csv(tmp_path / "input.csv", index=False)
+    assert not run_phase2(tmp_path / "input.csv", tmp_path / "output.csv", chunksize)
+    assert sorted(os.listdir(tmp_path)) == ["input.csv"]
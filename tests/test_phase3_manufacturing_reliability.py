@@ -0,0 +1,63 @@
+import pandas as pd
+
+import phase3_manufacturing_reliability
+from phase3_manufacturing_reliability import (assess_suppliers, calculate_capability_score_flexible, capability_info,
+                                              detect_capability_columns, filter_suppliers_flexible,
+                                              founding_year, founding_years, integer_value, score_capabilities)
+
+CURRENT_YEAR = 2025
+# Integer text int() refuses (longer than its default 4300 digits), one it reads but no float holds,
+# a year inside an over-long integer, and ordinary values
+LONG_INTEGER = '9' * 5000
+WIDE_INTEGER = '9' * 400
+VALUES = [LONG_INTEGER, '-' + LONG_INTEGER, WIDE_INTEGER, '-' + WIDE_INTEGER, '1987 ' + LONG_INTEGER,
+          ' 1987 ', '2_001', 'founded in 1950', '3', 'abc']
+
+def test_integer_value_skips_integers_int_refuses():
+    assert integer_value(LONG_INTEGER) is None
+    assert integer_value(WIDE_INTEGER) == int(WIDE_INTEGER)
+    assert integer_value(' 2_001 ') == 2001
+    assert integer_value('3.0') is None
+
+def test_founding_years_match_founding_year():
+    years = founding_years(pd.Series(VALUES + [None], dtype=object), CURRENT_YEAR)
+    expected = [founding_year(value, CURRENT_YEAR) for value in VALUES] + [None]
+    assert [None if pd.isna(year) else int(year) for year in years] == expected
+    assert expected[4:8] == [1987, 1987, 2001, 1950]
+
+def test_columnar_scores_match_row_scores_for_long_integers():
+    frame = pd.DataFrame({'company_name': [f"Company {i}" for i in range(len(VALUES))],
+                          'year_founded': pd.Series(VALUES, dtype=object),
+                          'num_locations': pd.Series(VALUES[::-1], dtype=object)})
+    columns = detect_capability_columns(frame)
+    scores = score_capabilities(frame, columns, current_year=CURRENT_YEAR)
+    for (_, row), row_scores in zip(frame.iterrows(), scores.itertuples(index=False)):
+        total, breakdown, info = calculate_capability_score_flexible(row, columns, CURRENT_YEAR)
+        assert row_scores.total_supplier_score == total
+        assert {name: getattr(row_scores, name) for name in breakdown} == breakdown
+        assert capability_info(row_scores) == info
+
+def test_phase3_runs_on_long_integer_cells(tmp_path):
+    frame = pd.DataFrame({'company_name': ['A', 'B'], 'year_founded': [LONG_INTEGER, '1987'],
+                          'num_locations': [LONG_INTEGER, '3'], 'main_country': ['Germany', 'France']})
+    frame.to_csv(tmp_path / "input.csv", index=False)
+    filter_suppliers_flexible(str(tmp_path / "input.csv"), str(tmp_path / "output.csv"))
+    assert list(pd.read_csv(tmp_path / "output.csv")['company_name']) == ['A', 'B']
+
+def test_rejected_info_strings_are_only_built_when_asked_for(monkeypatch):
+    frame = pd.DataFrame({'company_name': ['Big', 'Small'],
+                          'employee_count': ['5000', '2'],
+                          'year_founded': ['1950', '2024'],
+                          'revenue': ['500000000', '1000'],
+                          'num_locations': ['40', '1']})
+    columns = detect_capability_columns(frame)
+    formatted = []
+    monkeypatch.setattr(phase3_manufacturing_reliability, 'capability_info',
+                        lambda scores: formatted.append(scores) or capability_info(scores))
+
+    suitable, rejected = assess_suppliers(frame, columns, {}, current_year=CURRENT_YEAR, rejected_info=False)
+    assert len(formatted) == len(suitable) == 1
+    assert [record['company_name'] for record in rejected] == ['Small'] and 'company_size' not in rejected[0]
+
+    _, rejected = assess_suppliers(frame, columns, {}, current_year=CURRENT_YEAR)
+    assert len(formatted) == 3 and 'company_size' in rejected[0]
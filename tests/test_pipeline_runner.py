@@ -0,0 +1,47 @@
+import json
+import re
+
+import pandas as pd
+
+import pipeline_runner
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from benchmarks.synthetic_suppliers import make_supplier_frame
+
+def write_input(path, urls, rows=300):
+    """
+    Synthetic input whose websites all answer from the stub servers and where every third company is
+    a restaurant, so the planner puts the website stage after the manufacturing one and the sample
+    checks websites the run itself never reaches
+    """
+    frame = make_supplier_frame(rows, seed=3)
+    companies = pd.Series(range(rows)) // 5
+    frame['website_url'] = [None if website is None else f"{urls[company % len(urls)]}/company/{company}"
+                            for company, website in zip(companies, frame['website_url'])]
+    restaurants = companies % 3 == 1
+    frame.loc[restaurants, ['short_description', 'long_description']] = "restaurant serving local food"
+    frame.loc[restaurants, 'naics_2022_primary_code'] = 722511.0
+    frame.loc[restaurants, 'naics_2022_primary_label'] = "Full-Service Restaurants"
+    frame.loc[restaurants, 'business_tags'] = "Restaurants | Food Service"
+    frame.to_csv(path, index=False)
+
+def test_planned_run_counts_the_sample_checks(tmp_path, capsys):
+    servers, urls = start_stub_servers(2, latency=0.002)
+    try:
+        write_input(tmp_path / "input.csv", urls)
+        pipeline_runner.run_pipeline(str(tmp_path / "input.csv"), str(tmp_path / "planned.csv"),
+                                     plan=True, plan_sample_rows=30, cache_file=str(tmp_path / "cache.sqlite"),
+                                     metrics_file=str(tmp_path / "metrics.json"))
+        pipeline_runner.run_pipeline(str(tmp_path / "input.csv"), str(tmp_path / "sequential.csv"),
+                                     stage_order=pipeline_runner.SEQUENTIAL_STAGE_ORDER)
+    finally:
+        stop_stub_servers(servers)
+    output = capsys.readouterr().out
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "planned.csv"), pd.read_csv(tmp_path / "sequential.csv"))
+    # A fresh cache misses once for every website checked over the network, sample included
+    misses = int(re.search(r"Website cache hit rate: .* (\d+) misses", output).group(1))
+    with open(tmp_path / "metrics.json", encoding='utf-8') as metrics_file:
+        counters = json.load(metrics_file)['counters']
+    assert counters['website_checks'] == misses
+    saved = int(re.search(r"Website checks saved, estimated: \d+, actual: (-?\d+)", output).group(1))
+    assert saved == counters['website_checks_sequential_order'] - misses
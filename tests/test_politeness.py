@@ -0,0 +1,33 @@
+import pytest
+
+from politeness import DomainScheduler, registered_domain
+
+def test_registered_domain():
+    assert registered_domain('shop.example.co.uk') == 'example.co.uk'
+    assert registered_domain('www.example.com:8080') == 'example.com:8080'
+    assert registered_domain('127.0.0.1:80') == '127.0.0.1:80'
+
+def test_waits_are_kept_as_bounded_aggregates():
+    scheduler = DomainScheduler(per_domain_concurrency=1, min_interval=0.05)
+    items = [(position, 'example.com') for position in range(3)] + [(3, 'other.example')]
+    done = {}
+    scheduler.run_threads(items, 4, lambda position: position * 10, done.__setitem__)
+    scheduler.run_threads([(4, 'example.com')], 4, lambda position: position * 10, done.__setitem__)
+
+    assert done == {position: position * 10 for position in range(5)}
+    metrics = scheduler.metrics()
+    assert metrics['checks_started'] == sum(scheduler.wait_counts) == 5
+    # The third example.com check waits out two min_intervals
+    assert metrics['max_wait'] >= 0.09
+    assert metrics['mean_wait'] == pytest.approx(scheduler.wait_total / 5)
+    assert metrics['p95_wait'] <= metrics['max_wait']
+
+def test_wait_percentile_reads_the_histogram():
+    scheduler = DomainScheduler()
+    assert scheduler.wait_percentile(95) == 0.0
+    for seconds in [0.0] * 90 + [2.0] * 9 + [4000.0]:
+        scheduler._observe_wait(seconds)
+        scheduler.checks_started += 1
+    assert scheduler.wait_percentile(50) == 0.01
+    assert scheduler.wait_percentile(95) == 2.5
+    assert scheduler.wait_percentile(100) == 4000.0
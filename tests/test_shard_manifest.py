@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from pipeline_runner import run_pipeline
+from shard_manifest import (load_manifest, manifest_path, manifest_summary, merge_shards, parse_shard,
+                            shard_of_rows, shard_output_path)
+
+@pytest.fixture(scope='module')
+def base_urls():
+    servers, urls = start_stub_servers(4, 0.001)
+    yield urls
+    stop_stub_servers(servers)
+
+def build_input(path, base_urls, rows, company_ids):
+    """Synthetic input whose websites point at the stub servers, one company per id"""
+    frame = make_supplier_frame(rows, seed=11)
+    frame['company'] = [f"Co{i}" for i in company_ids]
+    urls = [f"{base_urls[i % len(base_urls)]}/{'missing' if i % 10 == 7 else 'company'}/{i}" for i in company_ids]
+    frame['website_url'] = frame['website_url'].where(frame['website_url'].isna(), urls)
+    frame.to_csv(path, index=False)
+
+def run_sharded(*args, **kwargs):
+    return run_pipeline(*args, concurrency=10, per_host_concurrency=4, **kwargs)
+
+def test_parse_shard():
+    assert parse_shard('1/4') == (1, 4)
+    assert parse_shard((0, 1)) == (0, 1)
+    with pytest.raises(ValueError):
+        parse_shard('4/4')
+
+def test_shard_of_rows_keeps_companies_whole():
+    frame = pd.DataFrame({'company': np.repeat([f"Co{i}" for i in range(30)], np.arange(30) % 4 + 1)})
+    shards = shard_of_rows(frame, 0, len(frame), 4, group_key='company')
+    assert (np.diff(shards) >= 0).all()
+    assert (pd.Series(shards).groupby(frame['company']).nunique() == 1).all()
+
+    blocks = shard_of_rows(pd.DataFrame({'x': range(40)}), 0, 40, 3, group_size=5)
+    assert (pd.Series(blocks).groupby(np.arange(40) // 5).nunique() == 1).all()
+
+def test_shard_of_rows_rejects_interleaved_keys():
+    frame = pd.DataFrame({'company': [f"Co{i % 7}" for i in range(70)]})
+    with pytest.raises(ValueError):
+        shard_of_rows(frame, 0, len(frame), 4, group_key='company')
+
+    seen_keys = set()
+    first = pd.DataFrame({'company': ['a', 'a', 'b']})
+    shard_of_rows(first, 0, 6, 2, group_key='company', seen_keys=seen_keys)
+    with pytest.raises(ValueError):
+        shard_of_rows(pd.DataFrame({'company': ['c', 'a', 'a']}), 3, 6, 2, group_key='company', seen_keys=seen_keys)
+
+@pytest.mark.parametrize('group_key, chunksize', [(None, None), ('company', None), ('company', 700)])
+def test_merged_shards_match_single_run(tmp_path, base_urls, group_key, chunksize):
+    rows = 2000
+    input_file = str(tmp_path / "input.csv")
+    build_input(input_file, base_urls, rows, np.arange(rows) // 5)
+
+    single_file = str(tmp_path / "single.csv")
+    run_sharded(input_file, single_file, group_key=group_key, chunksize=chunksize, shard=(0, 1))
+
+    output_file = str(tmp_path / "sharded.csv")
+    manifests = []
+    for index in range(3):
+        shard_file = shard_output_path(output_file, (index, 3))
+        run_sharded(input_file, shard_file, group_key=group_key, chunksize=chunksize, shard=(index, 3))
+        manifests.append(manifest_path(shard_file))
+    merged = merge_shards(manifests, output_file)
+
+    assert manifest_summary(merged) == manifest_summary(load_manifest(manifest_path(single_file)))
+
+def test_sharded_run_rejects_interleaved_keys(tmp_path, base_urls):
+    input_file = str(tmp_path / "input.csv")
+    build_input(input_file, base_urls, 200, np.arange(200) % 7)
+    with pytest.raises(ValueError):
+        run_sharded(input_file, str(tmp_path / "out.csv"), group_key='company', shard=(0, 2))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_suppliers import make_supplier_frame
+from phase1_rows_scoring_selection import process_companies
+from shard_parallel import group_run_starts, keys_contiguous, shard_bounds
+
+def test_group_run_starts_counts_missing_keys_as_equal():
+    keys = pd.Series(['a', 'a', None, None, 'b', 'a'])
+    assert group_run_starts(keys).tolist() == [0, 2, 4, 5]
+
+def test_keys_contiguous():
+    assert keys_contiguous(pd.Series(['a', 'a', 'b', None, None]))
+    assert not keys_contiguous(pd.Series(['a', 'b', 'a']))
+    assert not keys_contiguous(pd.Series([None, 'a', None]))
+
+def test_shard_bounds_cover_frame_on_group_boundaries():
+    frame = pd.DataFrame({'x': range(103)})
+    bounds = shard_bounds(frame, 4, group_size=5)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 103
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(bounds, bounds[1:]))
+    assert all(start % 5 == 0 for start, _ in bounds)
+
+def test_shard_bounds_cut_only_between_key_runs():
+    frame = pd.DataFrame({'company': np.repeat([f"Co{i}" for i in range(50)], 7)})
+    bounds = shard_bounds(frame, 4, group_key='company')
+    assert len(bounds) > 1
+    keys = frame['company']
+    assert all(keys.iloc[start] != keys.iloc[start - 1] for start, _ in bounds[1:])
+
+def test_shard_bounds_keep_interleaved_keys_whole():
+    frame = pd.DataFrame({'company': [f"Co{i % 70}" for i in range(400)]})
+    assert shard_bounds(frame, 4, group_key='company') == [(0, 400)]
+
+@pytest.mark.parametrize('interleaved', [False, True])
+def test_parallel_selection_matches_one_process(tmp_path, interleaved):
+    frame = make_supplier_frame(4000, seed=7)
+    company_ids = np.arange(4000) % 700 if interleaved else np.arange(4000) // 6
+    frame['company'] = [f"Co{i}" for i in company_ids]
+    input_file = tmp_path / "input.csv"
+    frame.to_csv(input_file, index=False)
+
+    process_companies(str(input_file), str(tmp_path / "one.csv"), group_key='company')
+    process_companies(str(input_file), str(tmp_path / "two.csv"), group_key='company', workers=2)
+
+    one = pd.read_csv(tmp_path / "one.csv")
+    assert one['company'].is_unique
+    assert (tmp_path / "one.csv").read_bytes() == (tmp_path / "two.csv").read_bytes()
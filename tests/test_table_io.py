@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from table_io import open_table_appender, read_table, write_table
+
+pytest.importorskip('pyarrow')
+
+@pytest.mark.parametrize('extension', ['.parquet', '.arrow'])
+def test_column_empty_in_the_first_frame_takes_later_text(tmp_path, extension):
+    path = str(tmp_path / f"table{extension}")
+    writer = open_table_appender(path)
+    writer.append(pd.DataFrame({'name': ['a', 'b'], 'city': [np.nan, np.nan]}))
+    writer.append(pd.DataFrame({'name': ['c'], 'city': ['Munich']}))
+    writer.append(pd.DataFrame({'name': ['d'], 'city': [7]}))
+    writer.close()
+    table = read_table(path)
+    assert list(table['name']) == ['a', 'b', 'c', 'd']
+    assert [None if pd.isna(city) else city for city in table['city']] == [None, None, 'Munich', '7']
+
+@pytest.mark.parametrize('extension', ['.parquet', '.arrow'])
+def test_streamed_and_whole_writes_agree_on_empty_columns(tmp_path, extension):
+    frame = pd.DataFrame({'name': ['a', 'b', 'c'], 'revenue': [np.nan] * 3, 'tags': [None] * 3})
+    write_table(frame, str(tmp_path / f"whole{extension}"))
+    writer = open_table_appender(str(tmp_path / f"streamed{extension}"))
+    writer.append(frame.iloc[:1])
+    writer.append(frame.iloc[1:])
+    writer.close()
+    pd.testing.assert_frame_equal(read_table(str(tmp_path / f"whole{extension}")),
+                                  read_table(str(tmp_path / f"streamed{extension}")))
+
+@pytest.mark.parametrize('extension', ['.parquet', '.arrow'])
+def test_frame_that_does_not_fit_is_not_written(tmp_path, extension):
+    path = str(tmp_path / f"table{extension}")
+    writer = open_table_appender(path)
+    writer.append(pd.DataFrame({'name': ['a'], 'revenue': [1.5]}))
+    with pytest.raises(ValueError):
+        writer.append(pd.DataFrame({'name': ['b'], 'revenue': ['unknown']}))
+    writer.append(pd.DataFrame({'name': ['c'], 'revenue': [2.5]}))
+    writer.close()
+    assert writer.rows_written == 2
+    assert list(read_table(path)['name']) == ['a', 'c']
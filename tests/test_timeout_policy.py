@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from benchmarks.stub_http_server import start_stub_servers, stop_stub_servers
+from phase1_website_status_code import probe_website
+from timeout_policy import DeadlineExceeded, TimeoutPolicy
+
+def test_fixed_timeout_without_options():
+    policy = TimeoutPolicy(timeout=10)
+    assert not policy.enabled()
+    assert policy.current_timeouts() == 10
+    assert TimeoutPolicy(timeout=10, connect_timeout=5).current_timeouts() == (5, 10)
+
+def test_adaptive_timeouts_wait_for_min_samples():
+    policy = TimeoutPolicy(timeout=10, connect_timeout=5, adaptive=True, min_samples=20)
+    for _ in range(19):
+        policy.observe_connect(0.01)
+        policy.observe_response(0.01)
+    assert policy.current_timeouts() == (5, 10)
+
+def test_adaptive_read_timeout_keeps_its_floor():
+    policy = TimeoutPolicy(timeout=10, connect_timeout=5, adaptive=True, min_samples=20)
+    for _ in range(50):
+        policy.observe_connect(0.01)
+        policy.observe_response(0.01)
+    assert policy.current_timeouts() == (policy.min_timeout, policy.min_read_timeout)
+
+def test_timed_out_attempts_raise_the_timeouts_back():
+    policy = TimeoutPolicy(timeout=10, connect_timeout=5, adaptive=True, min_samples=20)
+    for _ in range(50):
+        policy.observe_connect(0.01)
+        policy.observe_response(1.0)
+    lowered = policy.current_timeouts()
+    assert lowered == (1.0, 5.0)
+    # Slow servers start timing out at the lowered read timeout: their censored samples push it up
+    for _ in range(10):
+        policy.attempt_timed_out(lowered)
+    assert policy.current_timeouts() == (1.0, 10.0)
+    for _ in range(10):
+        policy.attempt_timed_out(lowered, connecting=True)
+    assert policy.current_timeouts() == (3.0, 10.0)
+    assert policy.timed_out_attempts == 20
+
+def test_deadline_caps_and_stops_attempts():
+    policy = TimeoutPolicy(timeout=10, connect_timeout=5, deadline=2)
+    connect, read = policy.attempt_timeouts(time.monotonic())
+    assert connect <= 2 and read <= 2
+    with pytest.raises(DeadlineExceeded):
+        policy.attempt_timeouts(time.monotonic() - 3)
+    assert policy.deadline_stops == 1
+
+def test_adaptive_probes_match_fixed_timeout_probes():
+    servers, urls = start_stub_servers(2, latency=0.02)
+    try:
+        targets = [url + path for url in urls for path in ('/', '/missing', '/page')]
+        fixed = [probe_website(url, timeout=5) for url in targets]
+        policy = TimeoutPolicy(timeout=5, connect_timeout=2, adaptive=True, min_samples=2)
+        adaptive = [probe_website(url, timeout=5, timeout_policy=policy) for url in targets * 2]
+    finally:
+        stop_stub_servers(servers)
+    assert [result[:2] for result in fixed] == [(True, 200), (False, 404), (True, 200)] * 2
+    assert [result[:2] for result in adaptive] == [result[:2] for result in fixed] * 2
@@ -0,0 +1,45 @@
+from phase1_website_status_code import DNS_FAILURE
+from website_cache import WebsiteCheckCache, classify_check_error
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+def test_dns_and_deadline_failures_have_their_own_error_class():
+    assert classify_check_error(DNS_FAILURE[2]) == 'dns'
+    assert classify_check_error("Probe deadline exceeded") == 'deadline'
+    assert classify_check_error("Unexpected error: boom") == 'unexpected'
+
+def test_dns_failures_are_stored_with_their_error_class(tmp_path):
+    cache = WebsiteCheckCache(str(tmp_path / "checks.sqlite"))
+    cache.put("no-such-host.invalid", DNS_FAILURE)
+    error_class = cache._connection.execute("SELECT error_class FROM website_checks").fetchone()[0]
+    cache.close()
+    assert error_class == 'dns'
+def test_results_expire_after_their_own_ttl(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr('website_cache.time.time', clock)
+    path = str(tmp_path / "checks.sqlite")
+    cache = WebsiteCheckCache(path, positive_ttl=100, negative_ttl=10)
+    cache.put("Example.com", (True, 200, None))
+    cache.put("https://down.example/", (False, None, "Connection error"))
+    cache.close()
+
+    # Results are read back from the file, under the same normalized key
+    cache = WebsiteCheckCache(path, positive_ttl=100, negative_ttl=10)
+    assert cache.get("https://example.com/") == (True, 200, None)
+    assert cache.get("down.example") == (False, None, "Connection error")
+
+    clock.now += 10
+    assert cache.get("down.example") is not None
+    clock.now += 1
+    assert cache.get("down.example") is None
+    assert cache.get("example.com") == (True, 200, None)
+
+    clock.now += 90
+    assert cache.get("example.com") is None
+    assert (cache.hits, cache.misses) == (4, 2)
+    cache.close()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import requests
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """A probe ran out of its per-row deadline before its next request attempt"""
+
+class TimeoutPolicy:
+    """
+    Timeouts for the website probes of one run, shared by every worker
+    timeout is the fixed (read) timeout of every request attempt and connect_timeout an optional
+    separate connect timeout. With adaptive set, once min_samples latencies have been seen both are
+    lowered to factor times the given percentile of the recent connect / response latencies (never
+    above the configured values), so dead hosts fail in a few seconds instead of the full timeout
+    while slow but live sites keep their margin. The connect timeout never goes below min_timeout and
+    the read timeout never below min_read_timeout (slow servers answer late far more often than
+    dead hosts accept connections). Attempts that time out count as latencies of the timeout they
+    had (censored samples: the real latency was at least that), so a run of timeouts raises the
+    timeouts back towards the configured values instead of leaving them low
+    deadline caps the time one probe may spend over all its attempts (HEAD, GET, GET without SSL
+    verification): no attempt starts after it, and each attempt's timeouts are capped by what is left
+    Fast-fail metrics (see report) estimate the probe time saved against the fixed timeout, including
+    the hosts a DNS stage rejected without any request (see record_dns_failures)
+    """
+
+    def __init__(self, timeout=10, connect_timeout=None, adaptive=False, percentile=95, factor=3.0,
+                 min_timeout=1.0, min_read_timeout=5.0, min_samples=20, window=1000, deadline=None):
+        self.timeout = float(timeout)
+        self.connect_timeout = float(connect_timeout) if connect_timeout is not None else None
+        self.adaptive = adaptive
+        self.percentile = percentile
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.min_read_timeout = min_read_timeout
+        self.min_samples = min_samples
+        self.deadline = deadline
+        self.connect_latencies = deque(maxlen=window)
+        self.response_latencies = deque(maxlen=window)
+        self.dns_failures = 0
+        self.timed_out_attempts = 0
+        self.deadline_stops = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def enabled(self):
+        """Whether the policy does anything beyond the fixed timeout"""
+        return bool(self.adaptive or self.connect_timeout is not None or self.deadline)
+
+    def _adapted(self, latencies, ceiling, floor):
+        if not self.adaptive or len(latencies) < self.min_samples:
+            return ceiling
+        tuned = self.factor * float(np.percentile(np.asarray(latencies), self.percentile))
+        return min(ceiling, max(floor, tuned))
+
+    def current_timeouts(self):
+        """
+        Timeouts for a request attempt right now: the fixed timeout as a number when only that is
+        configured, otherwise a (connect, read) tuple as requests accepts it
+        """
+        if not self.adaptive and self.connect_timeout is None:
+            return self.timeout
+        with self._lock:
+            connect = self._adapted(self.connect_latencies, self.connect_timeout or self.timeout, self.min_timeout)
+            read = self._adapted(self.response_latencies, self.timeout, self.min_read_timeout)
+        return connect, read
+
+    def attempt_timeouts(self, started):
+        """
+        Timeouts for the next attempt of a probe that started at started (time.monotonic())
+        Raises DeadlineExceeded when the probe's deadline leaves no time for another attempt
+        """
+        timeouts = self.current_timeouts()
+        if not self.deadline:
+            return timeouts
+
+        remaining = self.deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            with self._lock:
+                self.deadline_stops += 1
+                # Without the deadline the attempt could have run for the whole fixed timeout
+                self.saved_seconds += self.timeout
+            raise DeadlineExceeded(f"Probe deadline of {self.deadline:g} seconds exceeded")
+        if isinstance(timeouts, tuple):
+            return tuple(min(value, remaining) for value in timeouts)
+        return min(timeouts, remaining)
+
+    def observe_connect(self, seconds):
+        """Record how long opening a connection took (see PooledSession connect_observer)"""
+        with self._lock:
+            self.connect_latencies.append(seconds)
+
+    def observe_response(self, seconds):
+        """Record how long a response took to arrive"""
+        with self._lock:
+            self.response_latencies.append(seconds)
+
+    def attempt_timed_out(self, timeouts, connecting=False):
+        """
+        Record an attempt that timed out with the given timeouts, while connecting or reading
+        The timeout it had goes into the connect or response latencies as a censored sample
+        """
+        if isinstance(timeouts, tuple):
+            used = timeouts[0] if connecting else timeouts[1]
+        else:
+            used = timeouts
+        with self._lock:
+            (self.connect_latencies if connecting else self.response_latencies).append(used)
+            self.timed_out_attempts += 1
+            self.saved_seconds += max(0.0, self.timeout - used)
+
+    def record_dns_failures(self, count, lookup_seconds):
+        """
+        Record count probes rejected because their host does not resolve
+        Each would have failed both its HEAD and its GET attempt, after a lookup of its own
+        """
+        with self._lock:
+            self.dns_failures += count
+            self.saved_seconds += 2 * count * lookup_seconds
+
+    def report(self, concurrency=1):
+        """One-line summary of the timeouts in use and the time fast-failing saved"""
+        timeouts = self.current_timeouts()
+        if isinstance(timeouts, tuple):
+            timeouts_text = f"connect {timeouts[0]:.1f}s / read {timeouts[1]:.1f}s"
+        else:
+            timeouts_text = f"{timeouts:.1f}s"
+        return (f"Timeouts: {timeouts_text} (from {len(self.connect_latencies)} connect and "
+                f"{len(self.response_latencies)} response latencies), fast-fail: {self.dns_failures} "
+                f"unresolvable hosts, {self.timed_out_attempts} timed-out attempts, {self.deadline_stops} "
+                f"probes stopped at the deadline; ~{self.saved_seconds:.1f} probe-seconds saved against "
+                f"a fixed {self.timeout:g}s timeout (~{self.saved_seconds / max(1, concurrency):.1f}s wall "
+                f"at {concurrency} concurrent)")
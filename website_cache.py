@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+
+def normalize_cache_key(url):
+    """Return the (host, url) pair a website check result is cached under"""
+    url = str(url).strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return url.lower(), url
+
+    host = parsed.netloc.lower()
+    normalized_url = urlunparse((parsed.scheme.lower(), host, parsed.path or '/', parsed.params, parsed.query, ''))
+    return host, normalized_url
+
+def classify_check_error(error_message):
+    """Map a check_website_accessibility error message to a short error class"""
+    if error_message is None:
+        return None
+    if error_message == "Request timed out":
+        return 'timeout'
+    if error_message == "Probe deadline exceeded":
+        return 'deadline'
+    if error_message == "DNS resolution failed":
+        return 'dns'
+    if error_message == "Connection error":
+        return 'connection'
+    if error_message.startswith('SSL'):
+        return 'ssl'
+    if error_message.startswith('Status code'):
+        return 'status'
+    if error_message.startswith('Request exception'):
+        return 'request'
+    return 'unexpected'
+
+class WebsiteCheckCache:
+    """
+    Persistent SQLite cache of website check results
+    Reachable and unreachable results expire after separate TTLs (in seconds)
+    Safe to share between the worker threads of one run
+    """
+
+    def __init__(self, path, ttl=24 * 3600, positive_ttl=None, negative_ttl=None, commit_every=100):
+        self.path = path
+        self.positive_ttl = ttl if positive_ttl is None else positive_ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS website_checks (
+                host TEXT NOT NULL,
+                url TEXT NOT NULL,
+                is_accessible INTEGER NOT NULL,
+                status_code INTEGER,
+                error_class TEXT,
+                error_message TEXT,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (host, url)
+            )"""
+        )
+        self._connection.commit()
+
+    def get(self, url, now=None):
+        """Return the cached (is_accessible, status_code, error_message) for url, or None if missing/expired"""
+        host, normalized_url = normalize_cache_key(url)
+        now = time.time() if now is None else now
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT is_accessible, status_code, error_message, checked_at FROM website_checks WHERE host = ? AND url = ?",
+                (host, normalized_url)
+            ).fetchone()
+
+            if row is not None:
+                is_accessible, status_code, error_message, checked_at = row
+                ttl = self.positive_ttl if is_accessible else self.negative_ttl
+                if now - checked_at <= ttl:
+                    self.hits += 1
+                    return bool(is_accessible), status_code, error_message
+
+            self.misses += 1
+            return None
+
+    def put(self, url, result, now=None):
+        """Store a (is_accessible, status_code, error_message) check result for url"""
+        host, normalized_url = normalize_cache_key(url)
+        is_accessible, status_code, error_message = result
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO website_checks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (host, normalized_url, int(bool(is_accessible)), status_code,
+                 classify_check_error(error_message), error_message, now)
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.commit_every:
+                self._connection.commit()
+                self._pending_writes = 0
+
+    def hit_rate(self):
+        """Fraction of lookups answered from the cache so far"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """Flush pending writes and close the database"""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()